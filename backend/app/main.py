@@ -2,14 +2,37 @@
 CheftAi Backend - FastAPI Application
 Main entry point for the API server
 """
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 from app.routes import recipes, agents
+from app.services import agent_directory, agent_jobs, gemini_service, mcp_client
+from app.services.resilience import CircuitBreaker
+from app.services.metrics import CONTENT_TYPE, METRICS_ENABLED, MetricsMiddleware, metrics
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared, process-wide resources once at startup"""
+    # The Gemini SDK import is slow; warm it off the startup path
+    warmup = asyncio.create_task(asyncio.to_thread(gemini_service.init_models))
+    gemini_service.init_store()
+    gemini_service.init_catalog()
+    mcp_client.init_client()
+    agent_directory.directory.reset()
+    agent_jobs.jobs.start()
+    yield
+    await agent_jobs.jobs.stop()
+    await mcp_client.close_client()
+    await warmup
+    gemini_service.shutdown()
 
 app = FastAPI(
     title="CheftAi API",
     description="AI-Powered Recipe App Backend",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # CORS middleware for Flutter app
@@ -21,6 +44,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route request counts and latencies for /metrics (outermost, so CORS preflights count too)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(recipes.router, prefix="/api", tags=["recipes"])
 app.include_router(agents.router, prefix="/api", tags=["agents"])
@@ -37,3 +64,27 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+def _service_metrics():
+    """Gauges read from the services at scrape time"""
+    usage = gemini_service.token_usage
+    yield "cheftai_llm_tokens_total", "counter", "LLM tokens by kind (reported by the provider, else estimated).", [
+        ((("kind", "prompt"),), usage.prompt_tokens),
+        ((("kind", "output"),), usage.output_tokens),
+    ]
+    yield "cheftai_circuit_open", "gauge", "1 while the Gemini circuit breaker fast-fails.", [
+        ((), int(gemini_service.circuit_breaker.state == CircuitBreaker.OPEN)),
+    ]
+    job_stats = agent_jobs.jobs.stats()
+    yield "cheftai_agent_jobs", "gauge", "Agent message jobs waiting and being delivered.", [
+        ((("state", "queued"),), job_stats["queued"]),
+        ((("state", "running"),), job_stats["running"]),
+    ]
+
+metrics.add_collector(_service_metrics)
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Request, latency and upstream metrics in Prometheus text format"""
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return Response(metrics.render(), media_type=CONTENT_TYPE)
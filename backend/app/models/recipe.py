@@ -2,14 +2,21 @@
 Pydantic models for Recipe data structure
 Based on React app types and Gemini API response schema
 """
-from pydantic import BaseModel, Field
-from typing import List, Literal
+import os
+from pydantic import BaseModel, Field, StringConstraints, field_validator
+from typing import List, Literal, Optional
+from typing_extensions import Annotated
+
+# Caps on what one request can put into a prompt (every ingredient costs prompt tokens)
+RECIPE_MAX_INGREDIENTS = int(os.getenv("RECIPE_MAX_INGREDIENTS", "30"))
+RECIPE_MAX_INGREDIENT_LENGTH = int(os.getenv("RECIPE_MAX_INGREDIENT_LENGTH", "80"))
 
 class RecipeRequest(BaseModel):
     """Request model for recipe generation"""
-    ingredients: List[str] = Field(
+    ingredients: List[Annotated[str, StringConstraints(max_length=RECIPE_MAX_INGREDIENT_LENGTH)]] = Field(
         ...,
         min_items=1,
+        max_length=RECIPE_MAX_INGREDIENTS,
         description="List of ingredients available"
     )
 
@@ -23,6 +30,7 @@ class Recipe(BaseModel):
         description="Recipe difficulty level"
     )
     calories: int = Field(..., ge=0, description="Approximate calories per serving")
+    servings: Optional[int] = Field(None, ge=1, description="Number of servings the recipe makes")
     ingredients: List[str] = Field(
         ...,
         description="List of ingredients with measurements"
@@ -32,6 +40,16 @@ class Recipe(BaseModel):
         description="Step-by-step cooking instructions"
     )
 
+    @field_validator("servings", mode="before")
+    @classmethod
+    def drop_invalid_servings(cls, value):
+        """LLM output like 0, -1 or "4-6" drops the optional field instead of failing the recipe"""
+        try:
+            servings = int(value)
+        except (TypeError, ValueError):
+            return None
+        return servings if servings >= 1 else None
+
     class Config:
         json_schema_extra = {
             "example": {
@@ -53,3 +71,66 @@ class Recipe(BaseModel):
             }
         }
 
+
+class StoredRecipe(Recipe):
+    """Recipe persisted in the local recipe store"""
+    id: int = Field(..., description="Recipe id in the local store")
+    sourceIngredients: List[str] = Field(
+        default_factory=list,
+        description="Normalized ingredients the recipe was generated from"
+    )
+    model: Optional[str] = Field(None, description="Model that generated the recipe")
+    latencyMs: Optional[float] = Field(None, description="Generation time in milliseconds")
+    createdAt: float = Field(..., description="Unix timestamp when the recipe was stored")
+
+class BatchRecipeRequest(BaseModel):
+    """Request model for batch recipe generation"""
+    requests: List[RecipeRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=1000,
+        description="Ingredient sets to generate recipes for"
+    )
+
+class BatchRecipeResult(BaseModel):
+    """Outcome of one item in a batch, in request order"""
+    index: int = Field(..., description="Position of the item in the batch request")
+    success: bool
+    recipe: Optional[Recipe] = None
+    error: Optional[str] = None
+    cache: Optional[str] = Field(None, description="HIT, CATALOG, SIMILAR, MISS or STALE, as for /recipes/generate")
+
+class BatchRecipeResponse(BaseModel):
+    """Response model for batch recipe generation"""
+    total: int
+    unique: int = Field(..., description="Distinct normalized ingredient sets generated")
+    succeeded: int
+    failed: int
+    results: List[BatchRecipeResult]
+
+class RecipeSearchResult(BaseModel):
+    """A stored recipe ranked against the ingredients the user has"""
+    recipe: StoredRecipe
+    matched: int = Field(..., description="How many of the given ingredients the recipe uses")
+    missing: int = Field(..., description="Recipe ingredient lines not covered by the given ingredients")
+    coverage: float = Field(..., description="Fraction of the recipe's ingredient lines covered")
+
+class NutritionFacts(BaseModel):
+    """Calories and macros computed locally from a recipe's ingredient lines"""
+    servings: int = Field(..., description="Servings the totals are divided by")
+    calories: int = Field(..., description="Calories per serving")
+    protein: float = Field(..., description="Protein per serving (g)")
+    fat: float = Field(..., description="Fat per serving (g)")
+    carbs: float = Field(..., description="Carbohydrates per serving (g)")
+    totalCalories: int = Field(..., description="Calories for the whole recipe")
+    coverage: float = Field(..., description="Fraction of ingredient lines found in the nutrient table")
+    unmatched: List[str] = Field(default_factory=list, description="Ingredient lines that could not be resolved")
+
+class NutritionRequest(BaseModel):
+    """Request model for batch nutrition computation"""
+    recipes: List[Recipe] = Field(
+        ...,
+        min_length=1,
+        max_length=1000,
+        description="Recipes to compute nutrition for"
+    )
@@ -2,17 +2,20 @@
 Agent Discovery API Routes
 Backend endpoint để discover và tương tác với agents trong MCP
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from typing import List, Dict, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import httpx
-import os
+import hmac
+import json
+from app.services import agent_directory, mcp_client
+from app.services.agent_directory import directory
+from app.services.agent_jobs import AgentJob, JobQueueFullError, jobs
+from app.services.agent_broadcast import broadcast
 
 router = APIRouter()
 
-# MCP API Server URL
-MCP_API_URL = os.getenv("MCP_API_URL", "http://localhost:8001")
-
 # Pydantic models for request validation
 class SendMessageRequest(BaseModel):
     agent: str
@@ -20,22 +23,27 @@ class SendMessageRequest(BaseModel):
     task_id: Optional[str] = "ADHOC"
     task_title: Optional[str] = None
 
+class DirectoryNotification(BaseModel):
+    active_agents: Optional[List[Dict]] = None
+    count: Optional[int] = None
+
 class BroadcastMessageRequest(BaseModel):
     message: str
+    timeout: Optional[float] = Field(None, gt=0, le=120, description="Per-agent deadline (seconds)")
 
 @router.get("/agents/active")
 async def get_active_agents():
     """
     Lấy danh sách tất cả agents có chat đang mở trong session hiện tại
     
+    Được cache trong agent directory (AGENT_DIRECTORY_TTL giây, hoặc tới
+    khi MCP server báo thay đổi qua `/agents/directory/notify`).
+    
     Returns:
         Dict với danh sách active_agents và metadata
     """
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(f"{MCP_API_URL}/api/active-agents")
-            response.raise_for_status()
-            return response.json()
+        return (await directory.snapshot()).payload
     except httpx.RequestError as e:
         raise HTTPException(
             status_code=503,
@@ -56,36 +64,41 @@ async def get_active_agents_simple():
         List[Dict] với format: [{"agent_name": "...", "worktree_id": "..."}]
     """
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(f"{MCP_API_URL}/api/active-agents")
-            response.raise_for_status()
-            data = response.json()
-            
-            # Simplify response
-            simple_list = []
-            for agent in data.get("active_agents", []):
-                simple_list.append({
-                    "agent_name": agent.get("agent_name"),
-                    "worktree_id": agent.get("worktree_id"),
-                    "model": agent.get("model"),
-                    "status": agent.get("status")
-                })
-            
-            return {
-                "count": len(simple_list),
-                "agents": simple_list
-            }
+        snapshot = await directory.snapshot()
+        
+        # Simplify response
+        simple_list = []
+        for agent in snapshot.agents:
+            simple_list.append({
+                "agent_name": agent.get("agent_name"),
+                "worktree_id": agent.get("worktree_id"),
+                "model": agent.get("model"),
+                "status": agent.get("status")
+            })
+        
+        return {
+            "count": len(simple_list),
+            "agents": simple_list
+        }
     except httpx.RequestError as e:
         raise HTTPException(
             status_code=503,
             detail=f"MCP API server không khả dụng: {str(e)}"
         )
 
-@router.post("/agents/send")
-async def send_message_to_agent(payload: SendMessageRequest):
+@router.post("/agents/send", status_code=202)
+async def send_message_to_agent(
+    payload: SendMessageRequest,
+    wait: bool = Query(False, description="Đợi giao xong (trả về kết quả như trước) thay vì trả job ngay")
+):
     """
     Gửi message cho một agent cụ thể
     
+    Message được đưa vào hàng đợi và giao bởi worker nền (MCP server chạy
+    auto-submit tới ~20s), nên endpoint trả `202` với `job_id` ngay lập tức.
+    Theo dõi bằng `GET /agents/jobs/{job_id}` hoặc SSE `/agents/jobs/{job_id}/events`.
+    Với `?wait=true` endpoint đợi giao xong và trả kết quả (`200`) như trước.
+    
     Body:
         {
             "agent": "Architect",  # Tên agent
@@ -95,59 +108,108 @@ async def send_message_to_agent(payload: SendMessageRequest):
         }
     
     Returns:
-        Dict với kết quả gửi
+        Dict với job (hoặc kết quả gửi nếu wait=true)
     """
     agent_name = payload.agent
     message = payload.message
     
     try:
-        async with httpx.AsyncClient(timeout=20.0) as client:
-            # Lấy thông tin agent để có worktree_id
-            agents_response = await client.get(f"{MCP_API_URL}/api/active-agents")
-            agents_response.raise_for_status()
-            agents_data = agents_response.json()
-            
-            # Tìm agent
-            target_agent = None
-            for agent in agents_data.get("active_agents", []):
-                if agent.get("agent_name") == agent_name:
-                    target_agent = agent
-                    break
-            
-            if not target_agent:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Agent '{agent_name}' không có chat đang mở trong session"
-                )
-            
-            # Gửi message
-            msg_response = await client.post(
-                f"{MCP_API_URL}/api/messages",
-                json={
-                    "agent": agent_name,
-                    "chat_id": target_agent.get("worktree_id"),
-                    "message": message,
-                    "task_id": payload.task_id or "ADHOC",
-                    "task_title": payload.task_title or f"Message to {agent_name}"
-                },
-                timeout=20.0
-            )
-            
-            if msg_response.status_code == 200:
-                result = msg_response.json()
-                return {
-                    "success": True,
-                    "agent": agent_name,
-                    "worktree_id": target_agent.get("worktree_id"),
-                    "auto_submit": result.get("auto_submit", {}),
-                    "message": "Message sent successfully"
-                }
-            else:
-                raise HTTPException(
-                    status_code=msg_response.status_code,
-                    detail=f"Failed to send message: {msg_response.text}"
-                )
-                
+        # Lấy thông tin agent (từ directory) để có worktree_id
+        target_agent = await directory.find(agent_name)
+    except httpx.RequestError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"MCP API server không khả dụng: {str(e)}"
+        )
+    
+    if not target_agent:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Agent '{agent_name}' không có chat đang mở trong session"
+        )
+    
+    try:
+        job = jobs.submit(agent_name, target_agent.get("worktree_id"), {
+            "agent": agent_name,
+            "chat_id": target_agent.get("worktree_id"),
+            "message": message,
+            "task_id": payload.task_id or "ADHOC",
+            "task_title": payload.task_title or f"Message to {agent_name}"
+        })
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    
+    if not wait:
+        return {
+            "success": True,
+            **job.as_dict(),
+            "status_url": f"/api/agents/jobs/{job.id}",
+            "events_url": f"/api/agents/jobs/{job.id}/events"
+        }
+    
+    await job.wait()
+    if job.status == AgentJob.FAILED:
+        raise HTTPException(status_code=job.status_code, detail=job.error)
+    return JSONResponse({
+        "success": True,
+        "agent": agent_name,
+        "worktree_id": target_agent.get("worktree_id"),
+        "auto_submit": job.result.get("auto_submit", {}),
+        "message": "Message sent successfully",
+        "job_id": job.id
+    })
+
+@router.get("/agents/jobs/stats")
+async def get_agent_job_stats():
+    """
+    Thống kê hàng đợi gửi message (workers, queued, running, succeeded, failed)
+    """
+    return jobs.stats()
+
+@router.get("/agents/jobs/{job_id}")
+async def get_agent_job(job_id: str):
+    """
+    Trạng thái của một job gửi message
+    
+    Returns:
+        Dict với status (queued/running/succeeded/failed), thời gian và
+        auto_submit (nếu thành công) hoặc error/status_code (nếu lỗi)
+    """
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' không tồn tại hoặc đã hết hạn")
+    return job.as_dict()
+
+@router.get("/agents/jobs/{job_id}/events")
+async def stream_agent_job(job_id: str):
+    """
+    Theo dõi job dạng Server-Sent Events
+    
+    Mỗi lần đổi trạng thái gửi một event tên là trạng thái mới (`queued`,
+    `running`, `succeeded`, `failed`) với data giống `GET /agents/jobs/{job_id}`;
+    stream kết thúc khi job xong.
+    
+    Returns:
+        text/event-stream response
+    """
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' không tồn tại hoặc đã hết hạn")
+    
+    async def event_stream():
+        async for update in job.updates():
+            yield f"event: {update.status}\ndata: {json.dumps(update.as_dict())}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def _active_agents_for_broadcast() -> List[Dict]:
+    """Lấy danh sách active agents trước khi broadcast (503 nếu MCP không khả dụng)"""
+    try:
+        return (await directory.snapshot()).agents
     except httpx.RequestError as e:
         raise HTTPException(
             status_code=503,
@@ -159,84 +221,104 @@ async def broadcast_to_agents(payload: BroadcastMessageRequest):
     """
     Gửi message cho tất cả agents có chat đang mở
     
+    Gửi song song (tối đa AGENT_BROADCAST_CONCURRENCY agents cùng lúc),
+    mỗi agent có deadline riêng (`timeout`, mặc định AGENT_BROADCAST_TIMEOUT),
+    nên thời gian broadcast xấp xỉ agent chậm nhất thay vì tổng của tất cả.
+    
     Body:
         {
-            "message": "nhat dang test"  # Message cần gửi
+            "message": "nhat dang test",  # Message cần gửi
+            "timeout": 10  # Optional, deadline cho mỗi agent (giây)
         }
         
     Returns:
-        Dict với kết quả gửi cho từng agent
+        Dict với kết quả gửi cho từng agent (theo thứ tự active agents)
     """
-    message = payload.message
-    try:
-        # Lấy danh sách active agents
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            # Get active agents
-            agents_response = await client.get(f"{MCP_API_URL}/api/active-agents")
-            agents_response.raise_for_status()
-            agents_data = agents_response.json()
-            
-            active_agents = agents_data.get("active_agents", [])
-            
-            if not active_agents:
-                return {
-                    "success": False,
-                    "message": "Không có agents nào có chat đang mở",
-                    "sent_count": 0
-                }
-            
-            # Gửi message cho từng agent
-            results = []
-            for agent in active_agents:
-                try:
-                    msg_response = await client.post(
-                        f"{MCP_API_URL}/api/messages",
-                        json={
-                            "agent": agent["agent_name"],
-                            "chat_id": agent["worktree_id"],
-                            "message": message,
-                            "task_id": "BROADCAST",
-                            "task_title": "Broadcast message"
-                        },
-                        timeout=15
-                    )
-                    
-                    if msg_response.status_code == 200:
-                        results.append({
-                            "agent": agent["agent_name"],
-                            "worktree_id": agent["worktree_id"],
-                            "success": True
-                        })
-                    else:
-                        results.append({
-                            "agent": agent["agent_name"],
-                            "worktree_id": agent["worktree_id"],
-                            "success": False,
-                            "error": msg_response.text[:100]
-                        })
-                except Exception as e:
-                    results.append({
-                        "agent": agent["agent_name"],
-                        "worktree_id": agent["worktree_id"],
-                        "success": False,
-                        "error": str(e)
-                    })
-            
-            success_count = sum(1 for r in results if r.get("success"))
-            
-            return {
-                "success": True,
-                "message": f"Đã gửi cho {success_count}/{len(results)} agents",
-                "sent_count": success_count,
-                "total_count": len(results),
-                "results": results
-            }
-            
-    except httpx.RequestError as e:
-        raise HTTPException(
-            status_code=503,
-            detail=f"MCP API server không khả dụng: {str(e)}"
-        )
+    active_agents = await _active_agents_for_broadcast()
+    
+    if not active_agents:
+        return {
+            "success": False,
+            "message": "Không có agents nào có chat đang mở",
+            "sent_count": 0
+        }
+    
+    results = []
+    summary = {}
+    async for event, data in broadcast(mcp_client.get_client(), active_agents, payload.message, timeout=payload.timeout):
+        if event == "result":
+            results.append(data)
+        elif event == "summary":
+            summary = data
+    results.sort(key=lambda r: r["index"])
+    
+    return {**summary, "results": results}
+
+@router.post("/agents/broadcast/stream")
+async def broadcast_to_agents_stream(payload: BroadcastMessageRequest):
+    """
+    Broadcast như `/agents/broadcast`, trả về dạng Server-Sent Events
+    
+    Events: `start` ({"total"}), một `result` cho mỗi agent ngay khi agent đó
+    xong ({"index", "agent", "worktree_id", "success", "latency_ms"}, kèm
+    "error"/"timed_out" nếu lỗi), cuối cùng là `summary`.
+    
+    Returns:
+        text/event-stream response
+    """
+    active_agents = await _active_agents_for_broadcast()
+    
+    async def event_stream():
+        async for event, data in broadcast(mcp_client.get_client(), active_agents, payload.message, timeout=payload.timeout):
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/agents/directory/notify")
+async def notify_agent_directory(
+    payload: Optional[DirectoryNotification] = None,
+    x_mcp_token: Optional[str] = Header(None)
+):
+    """
+    Change-notification hook cho MCP server khi agents mở/đóng chat
+    
+    Body:
+        {"active_agents": [...]}  # Danh sách mới, thay thế cache
+        hoặc không có body        # Chỉ báo thay đổi, lần lookup sau sẽ fetch lại
+    
+    Header `X-MCP-Token` phải khớp AGENT_DIRECTORY_NOTIFY_TOKEN nếu biến này được set.
+    Nếu không set token, chỉ chấp nhận invalidate (không body); push danh sách bị từ chối (403).
+    
+    Returns:
+        Dict với trạng thái directory
+    """
+    token = agent_directory.AGENT_DIRECTORY_NOTIFY_TOKEN
+    if token and not hmac.compare_digest(x_mcp_token or "", token):
+        raise HTTPException(status_code=401, detail="Invalid MCP notification token")
+    
+    if payload is not None and payload.active_agents is not None:
+        # Unauthenticated callers may only force a refetch, never supply the list
+        if not token:
+            raise HTTPException(
+                status_code=403,
+                detail="Pushing the agent list requires AGENT_DIRECTORY_NOTIFY_TOKEN"
+            )
+        directory.update(payload.model_dump(exclude_none=True))
+    else:
+        directory.invalidate()
+    
+    return directory.stats()
+
+@router.get("/agents/directory/stats")
+async def get_agent_directory_stats():
+    """
+    Thống kê agent directory cache (TTL, số agents, tuổi snapshot, hits/refreshes)
+    """
+    return directory.stats()
 
 @router.get("/agents/{agent_name}/info")
 async def get_agent_info(agent_name: str):
@@ -250,20 +332,14 @@ async def get_agent_info(agent_name: str):
         Dict với thông tin agent
     """
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(f"{MCP_API_URL}/api/active-agents")
-            response.raise_for_status()
-            data = response.json()
-            
-            # Tìm agent
-            for agent in data.get("active_agents", []):
-                if agent.get("agent_name") == agent_name:
-                    return agent
-            
-            raise HTTPException(
-                status_code=404,
-                detail=f"Agent '{agent_name}' không có chat đang mở trong session"
-            )
+        agent = await directory.find(agent_name)
+        if agent is not None:
+            return agent
+        
+        raise HTTPException(
+            status_code=404,
+            detail=f"Agent '{agent_name}' không có chat đang mở trong session"
+        )
     except httpx.RequestError as e:
         raise HTTPException(
             status_code=503,
@@ -2,9 +2,45 @@
 Recipe API Routes
 FastAPI endpoints for recipe generation
 """
-from fastapi import APIRouter, HTTPException
-from app.models.recipe import RecipeRequest, Recipe
-from app.services.gemini_service import generate_recipe
+import json
+import math
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.models.recipe import (
+    BatchRecipeRequest,
+    BatchRecipeResponse,
+    NutritionFacts,
+    NutritionRequest,
+    Recipe,
+    RecipeRequest,
+    RecipeSearchResult,
+    StoredRecipe,
+)
+from app.services.gemini_service import (
+    ESTIMATED_OUTPUT_TOKENS,
+    admission_controller,
+    circuit_breaker,
+    generate_recipe_with_status,
+    generate_recipes_batch,
+    stream_recipe,
+    generation_flight,
+    get_recipe_catalog,
+    get_recipe_store,
+    ingredient_index,
+    model_registry,
+    provider,
+    recipe_cache,
+    semantic_index,
+    token_usage,
+)
+from app.services.fast_json import FastJSONResponse
+from app.services.nutrition import get_nutrition_calculator
+from app.services.recipe_cache import RECIPE_CACHE_HEADERS, normalize_ingredients
+from app.services.recipe_catalog import log_ingredient_request
+from app.services.recipe_store import RecipeStore
+from app.services.token_usage import TOKEN_USAGE_WINDOW_MINUTES
+from app.services.resilience import CircuitBreaker, UpstreamUnavailableError
 
 router = APIRouter()
 
@@ -13,6 +49,12 @@ async def create_recipe(request: RecipeRequest):
     """
     Generate a recipe from available ingredients using AI
     
+    Identical ingredient sets (any order/casing) are served from the recipe
+    cache; the `X-Cache` header reports HIT or MISS, CATALOG when served from
+    the pre-generated catalog, SIMILAR when a recipe for a near-identical
+    ingredient set is reused, or STALE when Gemini is unavailable and a
+    previously stored recipe is served instead.
+    
     Args:
         request: RecipeRequest with list of ingredients
         
@@ -22,16 +64,208 @@ async def create_recipe(request: RecipeRequest):
     Raises:
         HTTPException: If recipe generation fails
     """
+    log_ingredient_request(request.ingredients)
     try:
-        recipe = await generate_recipe(request.ingredients)
-        return recipe
+        recipe, cache_status = await generate_recipe_with_status(request.ingredients)
+        headers = None
+        if RECIPE_CACHE_HEADERS:
+            headers = {
+                "X-Cache": cache_status,
+                # A stale fallback must be revalidated once Gemini is back
+                "Cache-Control": "no-cache" if cache_status == "STALE" else f"private, max-age={int(recipe_cache.ttl)}"
+            }
+        # Already validated by the service: serialize once, skip response_model re-validation
+        return FastJSONResponse(recipe, headers=headers)
+    except UpstreamUnavailableError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after or 1))}
+        )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+@router.post("/recipes/generate/stream")
+async def create_recipe_stream(request: RecipeRequest):
+    """
+    Generate a recipe, streaming it as Server-Sent Events
+    
+    Events: `start` ({"cache": "HIT"|"CATALOG"|"SIMILAR"|"STALE"|"MISS"}), `field` ({"name", "value"}),
+    `ingredient` / `instruction` ({"index", "value"}), then a final `recipe`
+    with the full validated recipe, or `error` ({"detail"}).
+    
+    Args:
+        request: RecipeRequest with list of ingredients
+        
+    Returns:
+        text/event-stream response
+    """
+    log_ingredient_request(request.ingredients)
+    
+    async def event_stream():
+        async for event, data in stream_recipe(request.ingredients):
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/recipes/generate-batch", response_model=BatchRecipeResponse)
+async def create_recipes_batch(request: BatchRecipeRequest):
+    """
+    Generate recipes for many ingredient sets in one call
+    
+    Items fan out with bounded concurrency, identical ingredient sets are
+    generated once, and cached recipes are reused. Per-item failures are
+    reported in `results` instead of failing the whole batch.
+    
+    Args:
+        request: BatchRecipeRequest with a list of RecipeRequest items
+        
+    Returns:
+        BatchRecipeResponse with one result per item, in request order
+    """
+    for item in request.requests:
+        log_ingredient_request(item.ingredients)
+    return await generate_recipes_batch([item.ingredients for item in request.requests])
+
+@router.post("/recipes/nutrition", response_model=List[NutritionFacts])
+def compute_nutrition(request: NutritionRequest):
+    """
+    Compute calories and macros per serving from recipes' ingredient lines
+    
+    Uses the bundled nutrient table; no LLM call. All recipes are computed
+    in one vectorized pass. Recipes without `servings` use
+    NUTRITION_DEFAULT_SERVINGS.
+    
+    Args:
+        request: NutritionRequest with a list of recipes
+        
+    Returns:
+        One NutritionFacts per recipe, in request order
+    """
+    return get_nutrition_calculator().compute_batch(request.recipes)
+
 @router.get("/recipes/health")
 async def recipes_health():
-    """Health check for recipes service"""
-    return {"status": "healthy", "service": "recipes"}
+    """Health check for recipes service, including the Gemini circuit breaker"""
+    breaker = circuit_breaker.stats()
+    return {
+        "status": "healthy" if breaker["state"] == CircuitBreaker.CLOSED else "degraded",
+        "service": "recipes",
+        "circuit_breaker": breaker
+    }
+
+@router.get("/recipes/stats")
+async def recipes_stats():
+    """Runtime counters for the recipe generation pipeline"""
+    store = get_recipe_store()
+    catalog = get_recipe_catalog()
+    return {
+        "llm_provider": provider.stats(),
+        "model_registry": model_registry.stats(),
+        "recipe_cache": recipe_cache.stats(),
+        "semantic_index": semantic_index.stats(),
+        "ingredient_index": ingredient_index.stats(),
+        "nutrition": get_nutrition_calculator().stats(),
+        "token_usage": token_usage.stats(),
+        "single_flight": generation_flight.stats(),
+        "circuit_breaker": circuit_breaker.stats(),
+        "admission": admission_controller.stats(),
+        "recipe_store": {"enabled": store is not None, "recipes": store.count() if store else 0},
+        "recipe_catalog": catalog.stats() if catalog else {"recipes": 0, "hits": 0, "misses": 0}
+    }
+
+@router.get("/recipes/tokens")
+async def recipes_token_usage(
+    minutes: int = Query(15, ge=1, le=TOKEN_USAGE_WINDOW_MINUTES, description="Minutes of history, newest last")
+):
+    """
+    LLM token spend per minute, for tuning throughput against quota
+    
+    Prompt and output tokens are the provider's reported usage when
+    available, otherwise local estimates. Compare `tokens_per_minute` with
+    `quota.tpm`, and `observed_output_tokens` with the per-call output
+    reservation (`estimated_output_tokens`, GEMINI_ESTIMATED_OUTPUT_TOKENS).
+    
+    Args:
+        minutes: Length of the per-minute series
+    """
+    totals = token_usage.stats()
+    return {
+        **token_usage.summary(minutes),
+        "totals": totals,
+        "quota": admission_controller.quota(),
+        "estimated_output_tokens": ESTIMATED_OUTPUT_TOKENS,
+        "observed_output_tokens": totals["avg_output_tokens"],
+    }
+
+def _require_store() -> RecipeStore:
+    store = get_recipe_store()
+    if store is None:
+        raise HTTPException(status_code=503, detail="Recipe store is disabled")
+    return store
+
+@router.get("/recipes", response_model=List[StoredRecipe])
+def list_recipes(
+    ingredient: Optional[List[str]] = Query(None, description="Only recipes generated from all of these ingredients"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0)
+):
+    """
+    List stored recipes, newest first, without calling the LLM
+    
+    Args:
+        ingredient: Repeatable ingredient filter (normalized like the cache key)
+        limit: Max results
+        offset: Results to skip
+    """
+    store = _require_store()
+    return store.search(normalize_ingredients(ingredient or []), limit=limit, offset=offset)
+
+@router.get("/recipes/search", response_model=List[RecipeSearchResult])
+def search_recipes(
+    ingredient: List[str] = Query(..., description="Ingredients you have (repeatable)"),
+    min_match: int = Query(1, ge=1, description="Minimum number of your ingredients a recipe must use"),
+    max_missing: Optional[int] = Query(None, ge=0, description="Max recipe ingredients you may lack"),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """
+    "What can I cook": stored recipes ranked by how well they fit your ingredients
+    
+    Served from the in-memory inverted ingredient index; no LLM call.
+    Results are ordered by ingredients used (desc), ingredients missing
+    (asc), then coverage of the recipe's ingredient list (desc).
+    
+    Args:
+        ingredient: Repeatable ingredient list
+        min_match: Minimum overlap
+        max_missing: Optional cap on missing ingredients
+        limit: Max results
+    """
+    store = _require_store()
+    hits = ingredient_index.search(
+        ingredient,
+        min_match=min_match,
+        max_missing=-1 if max_missing is None else max_missing,
+        limit=limit
+    )
+    recipes = store.get_many(hit.recipe_id for hit in hits)
+    return [
+        RecipeSearchResult(recipe=recipes[hit.recipe_id], matched=hit.matched, missing=hit.missing, coverage=hit.coverage)
+        for hit in hits
+        if hit.recipe_id in recipes
+    ]
 
+# Keep last: the path parameter would otherwise shadow the static /recipes/* routes
+@router.get("/recipes/{recipe_id}", response_model=StoredRecipe)
+def get_recipe(recipe_id: int):
+    """Fetch a stored recipe by id"""
+    recipe = _require_store().get(recipe_id)
+    if recipe is None:
+        raise HTTPException(status_code=404, detail=f"Recipe {recipe_id} not found")
+    return FastJSONResponse(recipe)
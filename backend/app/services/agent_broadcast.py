@@ -0,0 +1,115 @@
+"""
+Agent Broadcast
+Concurrent fan-out of one message to many agents through the MCP server
+"""
+import asyncio
+import os
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+
+# Deliveries in flight at once per broadcast
+AGENT_BROADCAST_CONCURRENCY = int(os.getenv("AGENT_BROADCAST_CONCURRENCY", "16"))
+# Deadline for one agent's delivery (seconds); a late agent is reported as timed out
+AGENT_BROADCAST_TIMEOUT = float(os.getenv("AGENT_BROADCAST_TIMEOUT", "15"))
+
+# (event name, payload) pairs, serialized as Server-Sent Events by the route
+BroadcastEvent = Tuple[str, Dict[str, Any]]
+
+
+async def deliver(
+    client: httpx.AsyncClient,
+    index: int,
+    agent: Dict[str, Any],
+    message: str,
+    semaphore: asyncio.Semaphore,
+    timeout: float,
+) -> Dict[str, Any]:
+    """
+    Post the message to one agent; never raises
+
+    The deadline starts once a concurrency slot is free, so agents queued
+    behind slow ones are not penalized for the wait.
+    """
+    result = {"index": index, "agent": agent.get("agent_name"), "worktree_id": agent.get("worktree_id")}
+    async with semaphore:
+        started = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(
+                client.post(
+                    "/api/messages",
+                    json={
+                        "agent": agent.get("agent_name"),
+                        "chat_id": agent.get("worktree_id"),
+                        "message": message,
+                        "task_id": "BROADCAST",
+                        "task_title": "Broadcast message",
+                    },
+                    timeout=timeout,
+                ),
+                timeout,
+            )
+            if response.status_code == 200:
+                result["success"] = True
+            else:
+                result.update(success=False, error=response.text[:100])
+        except (asyncio.TimeoutError, httpx.TimeoutException):
+            result.update(success=False, timed_out=True, error=f"No response within {timeout:g}s")
+        except Exception as e:
+            result.update(success=False, error=str(e))
+        result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+async def broadcast(
+    client: httpx.AsyncClient,
+    agents: List[Dict[str, Any]],
+    message: str,
+    concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> AsyncIterator[BroadcastEvent]:
+    """
+    Send a message to every agent concurrently, reporting results as they land
+
+    Yields `start` ({"total"}), one `result` per agent in completion order
+    ({"index", "agent", "worktree_id", "success", "latency_ms"}, plus "error" and
+    "timed_out" on failure), then a `summary`. Closing the generator early
+    cancels deliveries still in flight.
+
+    Args:
+        client: MCP client
+        agents: Active agents (MCP `active_agents` entries)
+        message: Message to send
+        concurrency: Max deliveries in flight (defaults to AGENT_BROADCAST_CONCURRENCY)
+        timeout: Per-agent deadline in seconds (defaults to AGENT_BROADCAST_TIMEOUT)
+    """
+    timeout = timeout or AGENT_BROADCAST_TIMEOUT
+    semaphore = asyncio.Semaphore(max(1, concurrency or AGENT_BROADCAST_CONCURRENCY))
+    started = time.perf_counter()
+    yield "start", {"total": len(agents)}
+
+    tasks = [
+        asyncio.ensure_future(deliver(client, index, agent, message, semaphore, timeout))
+        for index, agent in enumerate(agents)
+    ]
+    sent = timed_out = 0
+    try:
+        for completed in asyncio.as_completed(tasks):
+            result = await completed
+            sent += result["success"]
+            timed_out += result.get("timed_out", False)
+            yield "result", result
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    yield "summary", {
+        "success": True,
+        "message": f"Đã gửi cho {sent}/{len(agents)} agents",
+        "sent_count": sent,
+        "failed_count": len(agents) - sent,
+        "timed_out_count": timed_out,
+        "total_count": len(agents),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
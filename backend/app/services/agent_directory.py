@@ -0,0 +1,131 @@
+"""
+Agent Directory
+In-process cache of the MCP server's active agents, indexed by name and worktree
+"""
+import asyncio
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from app.services import mcp_client
+
+# Seconds a fetched agent list is served before the next lookup refreshes it (0 = always fetch)
+AGENT_DIRECTORY_TTL = float(os.getenv("AGENT_DIRECTORY_TTL", "5"))
+# Shared secret the MCP server sends as X-MCP-Token on change notifications (unset = only invalidation is accepted)
+AGENT_DIRECTORY_NOTIFY_TOKEN = os.getenv("AGENT_DIRECTORY_NOTIFY_TOKEN")
+
+
+class AgentSnapshot:
+    """One MCP `/api/active-agents` payload plus O(1) indexes over it"""
+
+    __slots__ = ("payload", "agents", "by_name", "by_worktree", "fetched_at")
+
+    def __init__(self, payload: Dict[str, Any], fetched_at: float):
+        self.payload = payload
+        self.agents: List[Dict[str, Any]] = payload.get("active_agents", [])
+        self.by_name: Dict[str, Dict[str, Any]] = {}
+        self.by_worktree: Dict[str, Dict[str, Any]] = {}
+        # First entry wins on duplicates, as the old linear scans did
+        for agent in self.agents:
+            self.by_name.setdefault(agent.get("agent_name"), agent)
+            self.by_worktree.setdefault(agent.get("worktree_id"), agent)
+        self.fetched_at = fetched_at
+
+
+class AgentDirectory:
+    """
+    TTL cache of the active-agent list
+
+    Lookups are served from the last snapshot while it is younger than
+    `ttl`; after that the next lookup refetches it. Concurrent lookups on
+    an expired snapshot share one fetch. The MCP server can also push the
+    new list (`update`) or just signal a change (`invalidate`) so chats
+    opened or closed show up before the TTL runs out; a fetch already in
+    flight when they do never overwrites the notified state.
+
+    Args:
+        ttl: Seconds a snapshot is served (0 = fetch on every lookup)
+    """
+
+    def __init__(self, ttl: float = AGENT_DIRECTORY_TTL, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._snapshot: Optional[AgentSnapshot] = None
+        self._refreshing: Optional[asyncio.Task] = None
+        # Bumped by update/invalidate; a fetch started before a bump doesn't overwrite what it brought
+        self._generation = 0
+        self.hits = 0
+        self.refreshes = 0
+        self.notifications = 0
+
+    def _fresh(self) -> bool:
+        return self._snapshot is not None and self._clock() - self._snapshot.fetched_at < self.ttl
+
+    async def _fetch(self) -> AgentSnapshot:
+        generation = self._generation
+        response = await mcp_client.get_client().get("/api/active-agents")
+        response.raise_for_status()
+        self.refreshes += 1
+        snapshot = AgentSnapshot(response.json(), self._clock())
+        if generation != self._generation:
+            # The MCP server notified us mid-fetch: prefer its pushed list, never cache ours
+            return self._snapshot or snapshot
+        self._snapshot = snapshot
+        return snapshot
+
+    async def snapshot(self) -> AgentSnapshot:
+        """
+        The current agent list, refetched from the MCP server if expired
+
+        Raises:
+            httpx.RequestError / httpx.HTTPStatusError: the MCP server could not be reached or failed
+        """
+        if self._fresh():
+            self.hits += 1
+            return self._snapshot
+        task = self._refreshing
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = self._refreshing = asyncio.ensure_future(self._fetch())
+        # Shielded so one caller going away doesn't cancel the fetch for the others
+        return await asyncio.shield(task)
+
+    async def find(self, agent_name: str) -> Optional[Dict[str, Any]]:
+        """Agent entry by name, or None if it has no open chat"""
+        return (await self.snapshot()).by_name.get(agent_name)
+
+    async def find_by_worktree(self, worktree_id: str) -> Optional[Dict[str, Any]]:
+        """Agent entry by worktree id, or None"""
+        return (await self.snapshot()).by_worktree.get(worktree_id)
+
+    def update(self, payload: Dict[str, Any]) -> None:
+        """Replace the list with one pushed by the MCP server"""
+        self.notifications += 1
+        self._generation += 1
+        self._snapshot = AgentSnapshot(payload, self._clock())
+
+    def invalidate(self) -> None:
+        """Drop the cached list; the next lookup refetches it"""
+        self.notifications += 1
+        self._generation += 1
+        self._snapshot = None
+        # Lookups from now on start a new fetch instead of joining one that began before the change
+        self._refreshing = None
+
+    def reset(self) -> None:
+        self._snapshot = None
+        self._refreshing = None
+        self.hits = self.refreshes = self.notifications = 0
+
+    def stats(self) -> Dict[str, object]:
+        snapshot = self._snapshot
+        return {
+            "ttl_seconds": self.ttl,
+            "agents": len(snapshot.agents) if snapshot else 0,
+            "age_seconds": round(self._clock() - snapshot.fetched_at, 2) if snapshot else None,
+            "hits": self.hits,
+            "refreshes": self.refreshes,
+            "notifications": self.notifications,
+        }
+
+
+directory = AgentDirectory()
@@ -0,0 +1,257 @@
+"""
+Agent Jobs
+Background delivery of agent messages: enqueue now, deliver in a worker, poll or stream status
+"""
+import asyncio
+import os
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+
+import httpx
+
+from app.services import mcp_client
+
+# Workers delivering messages concurrently (messages to one agent are still delivered in order)
+AGENT_JOB_WORKERS = int(os.getenv("AGENT_JOB_WORKERS", "4"))
+# Jobs waiting for a worker before new sends are refused with 503
+AGENT_JOB_QUEUE_SIZE = int(os.getenv("AGENT_JOB_QUEUE_SIZE", "1000"))
+# Seconds a finished job stays queryable, and how many jobs are kept at most
+AGENT_JOB_TTL = float(os.getenv("AGENT_JOB_TTL", "3600"))
+AGENT_JOB_MAX_RETAINED = int(os.getenv("AGENT_JOB_MAX_RETAINED", "10000"))
+# Deadline for one delivery (the MCP server runs the whole auto-submit before answering)
+AGENT_JOB_TIMEOUT = float(os.getenv("AGENT_JOB_TIMEOUT", "20"))
+
+
+class JobQueueFullError(Exception):
+    """Too many messages are waiting for delivery"""
+
+
+class AgentJob:
+    """One message delivery and its progress"""
+
+    QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+
+    __slots__ = (
+        "id", "agent", "worktree_id", "body", "status", "result", "error", "status_code",
+        "created_at", "started_at", "finished_at", "_changed",
+    )
+
+    def __init__(self, agent: str, worktree_id: str, body: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.agent = agent
+        self.worktree_id = worktree_id
+        self.body = body
+        self.status = self.QUEUED
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.status_code: Optional[int] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._changed = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status in (self.SUCCEEDED, self.FAILED)
+
+    def _set(self, status: str, **fields: Any) -> None:
+        self.status = status
+        for name, value in fields.items():
+            setattr(self, name, value)
+        # Wake everyone waiting on this version, then start a new one
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def wait(self) -> "AgentJob":
+        """Wait until the job has succeeded or failed"""
+        while not self.done:
+            await self._changed.wait()
+        return self
+
+    async def updates(self) -> AsyncIterator["AgentJob"]:
+        """The job now and after every status change, until it is done"""
+        while True:
+            changed = self._changed
+            yield self
+            if self.done:
+                return
+            await changed.wait()
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = {
+            "job_id": self.id,
+            "status": self.status,
+            "agent": self.agent,
+            "worktree_id": self.worktree_id,
+            "created_at": round(self.created_at, 3),
+            "started_at": round(self.started_at, 3) if self.started_at else None,
+            "finished_at": round(self.finished_at, 3) if self.finished_at else None,
+        }
+        if self.started_at:
+            data["queued_ms"] = round((self.started_at - self.created_at) * 1000, 1)
+        if self.finished_at:
+            data["delivery_ms"] = round((self.finished_at - self.started_at) * 1000, 1)
+        if self.result is not None:
+            data["auto_submit"] = self.result.get("auto_submit", {})
+        if self.error is not None:
+            data["error"] = self.error
+            data["status_code"] = self.status_code
+        return data
+
+
+class AgentJobQueue:
+    """
+    Bounded queue of message deliveries drained by a pool of workers
+
+    `submit` returns as soon as the job is queued; workers post it to the
+    MCP server. Jobs for the same worktree are delivered one at a time in
+    submission order (the MCP server drives that chat's UI), jobs for
+    different agents in parallel. Finished jobs are kept for `ttl`
+    seconds (and at most `max_retained` jobs) so clients can poll them.
+
+    Args:
+        workers: Concurrent deliveries
+        max_queued: Waiting jobs before submit raises JobQueueFullError
+        ttl: Seconds a finished job is retained
+        max_retained: Jobs retained at most, oldest finished dropped first
+        timeout: Per-delivery deadline in seconds
+    """
+
+    def __init__(
+        self,
+        workers: int = AGENT_JOB_WORKERS,
+        max_queued: int = AGENT_JOB_QUEUE_SIZE,
+        ttl: float = AGENT_JOB_TTL,
+        max_retained: int = AGENT_JOB_MAX_RETAINED,
+        timeout: float = AGENT_JOB_TIMEOUT,
+    ):
+        self.workers = max(1, workers)
+        self.max_queued = max_queued
+        self.ttl = ttl
+        self.max_retained = max_retained
+        self.timeout = timeout
+        self._jobs: "OrderedDict[str, AgentJob]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        # Worktrees being delivered to, with jobs waiting behind the current one
+        self._busy: Dict[str, Deque[AgentJob]] = {}
+        # Jobs in those per-worktree backlogs; they count against max_queued too
+        self._backlog = 0
+        self.succeeded = 0
+        self.failed = 0
+
+    def start(self) -> None:
+        """Start the workers (called from the FastAPI lifespan, inside the serving loop)"""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(self.max_queued)
+        self._busy = {}
+        self._backlog = 0
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Stop the workers; jobs not delivered yet are failed"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for job in self._jobs.values():
+            if not job.done:
+                job._set(AgentJob.FAILED, error="Server shutting down", status_code=503, finished_at=time.time())
+        self._queue = None
+
+    def submit(self, agent: str, worktree_id: str, body: Dict[str, Any]) -> AgentJob:
+        """
+        Queue a message for delivery
+
+        Args:
+            agent: Agent name
+            worktree_id: The agent's chat (worktree) id
+            body: JSON body for the MCP `/api/messages` call
+
+        Raises:
+            JobQueueFullError: max_queued jobs are already waiting
+        """
+        if self._queue is None:
+            self.start()
+        self._prune()
+        if self._queue.qsize() + self._backlog >= self.max_queued:
+            raise JobQueueFullError(f"{self.max_queued} messages are already waiting for delivery")
+        job = AgentJob(agent, worktree_id, body)
+        self._queue.put_nowait(job)
+        self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[AgentJob]:
+        return self._jobs.get(job_id)
+
+    def _prune(self) -> None:
+        expired = time.time() - self.ttl
+        for job_id, job in list(self._jobs.items()):
+            if len(self._jobs) < self.max_retained and job.created_at > expired:
+                break
+            if job.done and (job.finished_at < expired or len(self._jobs) >= self.max_retained):
+                del self._jobs[job_id]
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            waiting = self._busy.get(job.worktree_id)
+            if waiting is not None:
+                # Another worker is delivering to this agent; it takes this job next
+                waiting.append(job)
+                self._backlog += 1
+                continue
+            worktree_id = job.worktree_id
+            self._busy[worktree_id] = waiting = deque()
+            try:
+                while job is not None:
+                    await self._deliver(job)
+                    job = None
+                    if waiting:
+                        job = waiting.popleft()
+                        self._backlog -= 1
+            finally:
+                del self._busy[worktree_id]
+
+    async def _deliver(self, job: AgentJob) -> None:
+        job._set(AgentJob.RUNNING, started_at=time.time())
+        try:
+            response = await mcp_client.get_client().post("/api/messages", json=job.body, timeout=self.timeout)
+            if response.status_code == 200:
+                job._set(AgentJob.SUCCEEDED, result=response.json(), finished_at=time.time())
+            else:
+                job._set(
+                    AgentJob.FAILED,
+                    error=f"Failed to send message: {response.text}",
+                    status_code=response.status_code,
+                    finished_at=time.time(),
+                )
+        except httpx.RequestError as e:
+            job._set(
+                AgentJob.FAILED,
+                error=f"MCP API server không khả dụng: {str(e)}",
+                status_code=503,
+                finished_at=time.time(),
+            )
+        except Exception as e:
+            job._set(AgentJob.FAILED, error=str(e), status_code=500, finished_at=time.time())
+        if job.status == AgentJob.SUCCEEDED:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "workers": len(self._tasks),
+            "queued": (self._queue.qsize() if self._queue is not None else 0) + self._backlog,
+            "running": sum(1 for job in self._jobs.values() if job.status == AgentJob.RUNNING),
+            "retained": len(self._jobs),
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+        }
+
+
+jobs = AgentJobQueue()
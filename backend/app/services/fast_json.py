@@ -0,0 +1,52 @@
+"""
+Fast JSON
+orjson-backed (de)serialization and a pre-serialized JSON response class, with a stdlib json fallback
+"""
+import json
+from typing import Any, Union
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json is used instead
+    orjson = None
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """
+    Parse JSON text
+
+    Raises:
+        json.JSONDecodeError: On invalid JSON (orjson's error is a subclass)
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON bytes, matching FastAPI's JSONResponse output for plain data"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response that skips FastAPI's response_model pass
+
+    Returning a Response from a route bypasses `response_model`
+    re-validation and `jsonable_encoder`. Pydantic models are serialized
+    once by pydantic-core; bytes are sent as-is, so a recipe serialized
+    earlier can be reused; anything else goes through `dumps`. Keep
+    `response_model` on the route for the OpenAPI schema.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        return dumps(content)
@@ -4,17 +4,52 @@ Migrated from React app: chefai/services/geminiService.ts
 """
 import os
 import json
-from typing import List
-import google.generativeai as genai
-from app.models.recipe import Recipe
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+from app.models.recipe import BatchRecipeResponse, BatchRecipeResult, Recipe
+from app.services import fast_json
+from app.services.ingredient_index import InvertedIngredientIndex
+from app.services.llm_provider import LLM_PROVIDER, LLMProvider, create_provider
+from app.services.metrics import metrics
+from app.services.model_registry import ModelRegistry
+from app.services.nutrition import get_nutrition_calculator
+from app.services.recipe_cache import RecipeCache, ingredient_key, normalize_ingredients
+from app.services.recipe_catalog import RECIPE_CATALOG_PATH, RecipeCatalog, close_request_log, configure_request_log
+from app.services.recipe_store import RECIPE_STORE_PATH, RecipeStore
+from app.services.singleflight import SingleFlight
+from app.services.token_usage import TokenUsageTracker
+from app.services.recipe_stream import RecipeEvent, RecipeStreamAssembler, recipe_events
+from app.services.rate_limiter import (
+    PRIORITY_BATCH,
+    PRIORITY_INTERACTIVE,
+    AdmissionController,
+)
+from app.services.vector_index import RECIPE_SIMILARITY_THRESHOLD, SemanticRecipeIndex
+from app.services.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    UpstreamUnavailableError,
+    is_transient,
+    retry_async,
+)
 
-# Load API key from environment
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Load API key from environment; checked when the first model is built, not at import
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
-    raise ValueError("GEMINI_API_KEY environment variable is required")
 
-# Configure Gemini
-genai.configure(api_key=GEMINI_API_KEY)
+# Max Gemini calls in flight at once, and threads for models without an async API
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "16"))
+GEMINI_EXECUTOR_WORKERS = int(os.getenv("GEMINI_EXECUTOR_WORKERS", "16"))
+
+# Unique ingredient sets generated at once by a batch (defaults to the Gemini limit)
+RECIPE_BATCH_CONCURRENCY = int(os.getenv("RECIPE_BATCH_CONCURRENCY", str(GEMINI_MAX_CONCURRENCY)))
 
 # Recipe schema for structured output (matching React app)
 RECIPE_SCHEMA = {
@@ -29,6 +64,7 @@ RECIPE_SCHEMA = {
             "description": "Recipe difficulty level"
         },
         "calories": {"type": "number", "description": "Approximate calories per serving."},
+        "servings": {"type": "integer", "description": "Number of servings the recipe makes."},
         "ingredients": {
             "type": "array",
             "items": {"type": "string"},
@@ -43,38 +79,532 @@ RECIPE_SCHEMA = {
     "required": ["title", "description", "cookTime", "difficulty", "calories", "ingredients", "instructions"]
 }
 
-async def generate_recipe(ingredients: List[str]) -> Recipe:
+MODEL_NAME = "gemini-2.0-flash-exp"
+
+GENERATION_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": RECIPE_SCHEMA,
+    "temperature": 0.7,
+}
+
+SYSTEM_INSTRUCTION = (
+    "You are a world-class chef assistant. "
+    "You create mouth-watering, easy-to-follow recipes based on limited ingredients."
+)
+
+# Text generation backend (LLM_PROVIDER): Gemini, or the offline fake for load tests
+provider: LLMProvider = create_provider(LLM_PROVIDER, api_key=GEMINI_API_KEY, executor=lambda: _get_executor())
+
+def is_configured() -> bool:
+    """Whether the LLM provider can make calls (the SDK itself may not be loaded yet)"""
+    return provider.configured
+
+def _build_gemini_model(model_name, generation_config, system_instruction):
+    """Model factory used by the registry in production (builds through the active provider)"""
+    return provider.build_model(model_name, generation_config, system_instruction)
+
+# Models are built once per (name, config) and reused across requests
+model_registry = ModelRegistry(factory=_build_gemini_model)
+
+def get_model(model_name: str = MODEL_NAME):
+    """Return the pooled recipe model for `model_name`"""
+    return model_registry.get(model_name, GENERATION_CONFIG, SYSTEM_INSTRUCTION)
+
+# Generated recipes keyed by normalized ingredient set
+recipe_cache = RecipeCache()
+
+# Concurrent generations for the same ingredient set share one Gemini call
+generation_flight = SingleFlight()
+# Most urgent priority among the callers waiting on each in-flight generation
+_flight_priorities: Dict[str, int] = {}
+
+# Upstream protection: jittered retries for transient errors, fast-fail when Gemini is down
+retry_policy = RetryPolicy()
+circuit_breaker = CircuitBreaker()
+
+# Outbound quota (GEMINI_RPM / GEMINI_TPM); interactive calls are admitted before batch work
+admission_controller = AdmissionController()
+
+# Rough output size of one recipe, used to reserve TPM quota before the call
+ESTIMATED_OUTPUT_TOKENS = int(os.getenv("GEMINI_ESTIMATED_OUTPUT_TOKENS", "800"))
+
+# Prompt/output tokens and latency of every LLM call, per minute
+token_usage = TokenUsageTracker()
+
+# Near-duplicate ingredient sets ("basil" vs "thai basil, chili") reuse an existing recipe
+semantic_index: SemanticRecipeIndex[Recipe] = SemanticRecipeIndex()
+SEMANTIC_WARM_LIMIT = int(os.getenv("SEMANTIC_WARM_LIMIT", "100000"))
+
+# Durable recipe log, opened by init_store() at startup
+recipe_store: Optional[RecipeStore] = None
+
+# "What can I cook" search over every stored recipe's ingredient lines
+ingredient_index = InvertedIngredientIndex()
+
+# Pre-generated recipes for popular ingredient sets, opened by init_catalog() at startup
+recipe_catalog: Optional[RecipeCatalog] = None
+
+def init_models() -> None:
+    """
+    Warm the model registry (run in the background from the FastAPI lifespan)
+    
+    Without GEMINI_API_KEY the app still starts; only generation fails.
+    """
+    if not is_configured():
+        logger.warning("[gemini_service] GEMINI_API_KEY is not set; recipe generation is disabled")
+        return
+    try:
+        get_model()
+    except Exception as e:
+        logger.warning(f"[gemini_service] Model warm-up failed, retrying on first use: {e}")
+
+def init_store(path: Optional[str] = None) -> None:
+    """
+    Open the recipe store and warm the cache from it (called from the FastAPI lifespan)
+    
+    Args:
+        path: SQLite database path (defaults to RECIPE_STORE_PATH); empty disables persistence
+    """
+    global recipe_store
+    path = RECIPE_STORE_PATH if path is None else path
+    if not path:
+        return
+    recipe_store = RecipeStore(path)
+    # The semantic index is only filled (and embedded) when similarity reuse is on
+    semantic = RECIPE_SIMILARITY_THRESHOLD > 0
+    limit = max(recipe_cache.max_size, SEMANTIC_WARM_LIMIT) if semantic else recipe_cache.max_size
+    entries = recipe_store.recent_entries(limit)
+    # Oldest first so the newest recipes end up most recently used
+    for position, (key, ingredients, recipe) in enumerate(reversed(entries)):
+        if position >= len(entries) - recipe_cache.max_size:
+            recipe_cache.put(key, recipe)
+        if semantic:
+            semantic_index.add(key, ingredients, recipe)
+    for recipe_id, lines in recipe_store.ingredient_lines():
+        ingredient_index.add(recipe_id, lines)
+
+def init_catalog(path: Optional[str] = None) -> None:
+    """
+    Memory-map the pre-generated recipe catalog and open the request log (called from the FastAPI lifespan)
+    
+    Args:
+        path: Catalog file (defaults to RECIPE_CATALOG_PATH); a missing file just means no catalog
+    """
+    global recipe_catalog
+    configure_request_log()
+    path = RECIPE_CATALOG_PATH if path is None else path
+    if not path or not os.path.exists(path):
+        return
+    try:
+        recipe_catalog = RecipeCatalog(path)
+        logger.info(f"[gemini_service] Loaded recipe catalog with {len(recipe_catalog)} recipes")
+    except (OSError, ValueError) as e:
+        logger.warning(f"[gemini_service] Ignoring recipe catalog {path}: {e}")
+
+def get_recipe_catalog() -> Optional[RecipeCatalog]:
+    """The open recipe catalog, if any"""
+    return recipe_catalog
+
+_executor: Optional[ThreadPoolExecutor] = None
+_limiter: Optional[asyncio.Semaphore] = None
+_limiter_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Bounded pool for blocking SDK calls, created on first use"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=GEMINI_EXECUTOR_WORKERS,
+            thread_name_prefix="gemini"
+        )
+    return _executor
+
+def _get_limiter() -> asyncio.Semaphore:
+    """Concurrency limiter bound to the running event loop"""
+    global _limiter, _limiter_loop
+    loop = asyncio.get_running_loop()
+    if _limiter is None or _limiter_loop is not loop:
+        _limiter = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+        _limiter_loop = loop
+    return _limiter
+
+async def _generate_content(model, prompt: str) -> str:
+    """Call the provider without blocking the event loop (the caller holds a limiter slot)"""
+    started = time.perf_counter()
+    try:
+        completion = await provider.generate(model, prompt)
+    except BaseException:
+        # Timeouts arrive as cancellation from retry_async's deadline
+        token_usage.record_error()
+        metrics.observe_upstream(provider.name, "generate", time.perf_counter() - started, "error")
+        raise
+    metrics.observe_upstream(provider.name, "generate", time.perf_counter() - started)
+    _record_usage(prompt, completion.text, started, completion.prompt_tokens, completion.output_tokens)
+    return completion.text
+
+def _record_usage(
+    prompt: str,
+    text: str,
+    started: float,
+    prompt_tokens: Optional[int] = None,
+    output_tokens: Optional[int] = None
+) -> None:
+    """Account one finished call, estimating the token counts the provider didn't report"""
+    token_usage.record(
+        prompt_tokens if prompt_tokens is not None else provider.count_tokens(prompt),
+        output_tokens if output_tokens is not None else provider.count_tokens(text or ""),
+        (time.perf_counter() - started) * 1000
+    )
+
+def get_recipe_store() -> Optional[RecipeStore]:
+    """The open recipe store, or None when persistence is disabled"""
+    return recipe_store
+
+async def _call_upstream(call: Callable[[], Awaitable[T]]) -> T:
+    """
+    One upstream attempt through the concurrency limit and the circuit breaker
+    
+    The limiter slot is taken before the breaker is consulted, so a call
+    cancelled while queued locally records nothing. Transient failures (and
+    timeouts) count against the breaker; permanent errors mean Gemini
+    answered, so they count as healthy responses.
+    """
+    async with _get_limiter():
+        if not circuit_breaker.allow():
+            raise CircuitOpenError(
+                "Gemini API is unavailable (circuit open)",
+                retry_after=circuit_breaker.retry_after()
+            )
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            circuit_breaker.record_failure()
+            raise
+        except Exception as e:
+            if is_transient(e):
+                circuit_breaker.record_failure()
+            else:
+                circuit_breaker.record_success()
+            raise
+        circuit_breaker.record_success()
+        return result
+
+async def _stream_content(model, prompt: str) -> AsyncIterator[str]:
+    """
+    Stream model output text without blocking the event loop
+    
+    Same limits as `_call_upstream`; the provider decides how chunks
+    are produced.
+    """
+    async with _get_limiter():
+        if not circuit_breaker.allow():
+            raise CircuitOpenError(
+                "Gemini API is unavailable (circuit open)",
+                retry_after=circuit_breaker.retry_after()
+            )
+        started = time.perf_counter()
+        chunks: List[str] = []
+        healthy: Optional[bool] = None
+        try:
+            async for text in provider.generate_stream(model, prompt):
+                chunks.append(text)
+                yield text
+            metrics.observe_upstream(provider.name, "stream", time.perf_counter() - started)
+            _record_usage(prompt, "".join(chunks), started)
+            healthy = True
+        except Exception as e:
+            token_usage.record_error()
+            metrics.observe_upstream(provider.name, "stream", time.perf_counter() - started, "error")
+            healthy = not is_transient(e)
+            if not healthy:
+                raise UpstreamUnavailableError(f"Gemini API stream failed: {e}", retry_after=retry_policy.base_delay)
+            raise
+        finally:
+            # Cancelled or closed mid-stream (client gone, GeneratorExit): the call failed,
+            # but the upstream was healthy if it already sent text. Always record the
+            # breaker outcome, or a half-open probe never ends.
+            if healthy is None:
+                token_usage.record_error()
+                metrics.observe_upstream(provider.name, "stream", time.perf_counter() - started, "error")
+                healthy = bool(chunks)
+            if healthy:
+                circuit_breaker.record_success()
+            else:
+                circuit_breaker.record_failure()
+
+def shutdown() -> None:
+    """Release the executor, the recipe store and catalog, and the request log (called from the FastAPI lifespan)"""
+    global _executor, recipe_store, recipe_catalog
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+    if recipe_store is not None:
+        recipe_store.close()
+        recipe_store = None
+        # Ids belong to the closed store
+        ingredient_index.clear()
+    if recipe_catalog is not None:
+        recipe_catalog.close()
+        recipe_catalog = None
+    close_request_log()
+
+async def generate_recipe(ingredients: List[str], priority: int = PRIORITY_INTERACTIVE) -> Recipe:
     """
     Generate a recipe using Google Gemini API
     
     Args:
         ingredients: List of available ingredients
+        priority: Outbound admission priority for a generation
         
     Returns:
         Recipe object with generated recipe data
         
     Raises:
-        ValueError: If API key is missing or API call fails
+        ProviderNotConfiguredError: If GEMINI_API_KEY is not set
+        ValueError: If the API call fails
+    """
+    recipe, _ = await generate_recipe_with_status(ingredients, priority)
+    return recipe
+
+async def generate_recipe_with_status(
+    ingredients: List[str],
+    priority: int = PRIORITY_INTERACTIVE
+) -> Tuple[Recipe, str]:
+    """
+    Serve a recipe from the cache, generating it on a miss
+    
+    Args:
+        ingredients: List of available ingredients
+        priority: Outbound admission priority for a generation
+        
+    Returns:
+        (recipe, cache_status): "HIT", "CATALOG", "SIMILAR", "MISS" or "STALE"
+        
+    Raises:
+        ValueError: If no ingredients are given or generation fails
     """
     if not ingredients:
         raise ValueError("At least one ingredient is required")
     
-    # Initialize model
-    model = genai.GenerativeModel(
-        model_name="gemini-2.0-flash-exp",
-        generation_config={
-            "response_mime_type": "application/json",
-            "response_schema": RECIPE_SCHEMA,
-            "temperature": 0.7,
-        },
-        system_instruction=(
-            "You are a world-class chef assistant. "
-            "You create mouth-watering, easy-to-follow recipes based on limited ingredients."
-        )
+    key = ingredient_key(ingredients)
+    cached = recipe_cache.get(key)
+    if cached is not None:
+        return cached, "HIT"
+    
+    pregenerated = _catalog_recipe(key)
+    if pregenerated is not None:
+        return pregenerated, "CATALOG"
+    
+    similar = _find_similar(key, ingredients)
+    if similar is not None:
+        return similar, "SIMILAR"
+    
+    _join_flight(key, priority)
+    try:
+        recipe = await generation_flight.do(key, lambda: _generate_and_store(key, ingredients, priority))
+    except UpstreamUnavailableError:
+        stale = await _fallback_recipe(key)
+        if stale is None:
+            raise
+        return stale, "STALE"
+    return recipe, "MISS"
+
+def _join_flight(key: str, priority: int) -> None:
+    """Record a caller's priority for `key`'s generation, promoting its queued admission if more urgent"""
+    current = _flight_priorities.get(key) if generation_flight.in_flight(key) else None
+    if current is None or priority < current:
+        _flight_priorities[key] = priority
+    if current is not None and priority < current:
+        # e.g. an interactive request joining a batch item's generation
+        admission_controller.promote(key, priority)
+
+def _catalog_recipe(key: str) -> Optional[Recipe]:
+    """Pre-generated recipe for `key`; cached on the way out so the next hit skips decoding"""
+    if recipe_catalog is None:
+        return None
+    recipe = recipe_catalog.get(key)
+    if recipe is not None:
+        recipe_cache.put(key, recipe)
+    return recipe
+
+def _find_similar(key: str, ingredients: List[str]) -> Optional[Recipe]:
+    """Previously generated recipe for this or a near-identical ingredient set, if any"""
+    if RECIPE_SIMILARITY_THRESHOLD <= 0 or not len(semantic_index):
+        return None
+    match = semantic_index.lookup(ingredients, RECIPE_SIMILARITY_THRESHOLD, key=key)
+    return match[0] if match else None
+
+async def _fallback_recipe(key: str) -> Optional[Recipe]:
+    """Last stored recipe for `key`, served while Gemini is unavailable"""
+    if recipe_store is None:
+        return None
+    try:
+        return await asyncio.to_thread(recipe_store.find_by_key, key)
+    except Exception as e:
+        logger.warning(f"[gemini_service] Fallback lookup failed: {e}")
+        return None
+
+async def generate_recipes_batch(
+    ingredient_sets: List[List[str]],
+    concurrency: Optional[int] = None
+) -> BatchRecipeResponse:
+    """
+    Generate recipes for many ingredient sets with bounded concurrency
+    
+    Sets that normalize to the same key are generated once; every item goes
+    through the cache like a single /recipes/generate call.
+    
+    Args:
+        ingredient_sets: One ingredient list per batch item
+        concurrency: Max unique sets in flight (defaults to RECIPE_BATCH_CONCURRENCY)
+        
+    Returns:
+        BatchRecipeResponse with one result per item, in input order
+    """
+    semaphore = asyncio.Semaphore(concurrency or RECIPE_BATCH_CONCURRENCY)
+    
+    async def run(ingredients: List[str]) -> Tuple[Optional[Recipe], Optional[str], Optional[str]]:
+        async with semaphore:
+            try:
+                recipe, cache_status = await generate_recipe_with_status(ingredients, PRIORITY_BATCH)
+                return recipe, cache_status, None
+            except Exception as e:
+                return None, None, str(e)
+    
+    # First item per key runs the generation; duplicates reuse its outcome
+    unique: dict = {}
+    keys: List[Optional[str]] = []
+    for ingredients in ingredient_sets:
+        key = ingredient_key(ingredients) if ingredients else None
+        keys.append(key)
+        if key is not None and key not in unique:
+            unique[key] = ingredients
+    
+    outcomes = dict(zip(unique, await asyncio.gather(*(run(i) for i in unique.values()))))
+    
+    results = []
+    for index, key in enumerate(keys):
+        if key is None:
+            results.append(BatchRecipeResult(
+                index=index, success=False, error="At least one ingredient is required"
+            ))
+            continue
+        recipe, cache_status, error = outcomes[key]
+        results.append(BatchRecipeResult(
+            index=index, success=error is None, recipe=recipe, error=error, cache=cache_status
+        ))
+    
+    succeeded = sum(1 for r in results if r.success)
+    return BatchRecipeResponse(
+        total=len(results),
+        unique=len(unique),
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        results=results
     )
+
+async def _generate_and_store(key: str, ingredients: List[str], priority: int) -> Recipe:
+    """Generate a recipe, then cache and persist it (runs once per in-flight key)"""
+    started = time.perf_counter()
+    try:
+        recipe = _check_nutrition(await _generate_uncached(ingredients, priority, key))
+    finally:
+        _flight_priorities.pop(key, None)
+    latency_ms = (time.perf_counter() - started) * 1000
+    _remember(key, ingredients, recipe)
+    await _persist(key, ingredients, recipe, latency_ms)
+    return recipe
+
+def _check_nutrition(recipe: Recipe) -> Recipe:
+    """Validate (or, with NUTRITION_MODE=override, replace) the model's calories; never fails the request"""
+    try:
+        return get_nutrition_calculator().reconcile(recipe)
+    except Exception as e:
+        logger.warning(f"[gemini_service] Nutrition check failed: {e}")
+        return recipe
+
+def _remember(key: str, ingredients: List[str], recipe: Recipe) -> None:
+    """Make a freshly generated recipe servable by exact and near-duplicate lookups"""
+    recipe_cache.put(key, recipe)
+    if RECIPE_SIMILARITY_THRESHOLD > 0:
+        semantic_index.add(key, ingredients, recipe)
+
+async def _persist(key: str, ingredients: List[str], recipe: Recipe, latency_ms: float) -> None:
+    """Write a generated recipe to the store; failures never fail the request"""
+    if recipe_store is None:
+        return
+    store = recipe_store
+    
+    def save_and_index() -> None:
+        recipe_id = store.save(key, normalize_ingredients(ingredients), recipe, MODEL_NAME, latency_ms)
+        # Off the event loop: the index lock may be held by a search in the threadpool
+        ingredient_index.add(recipe_id, recipe.ingredients)
+    
+    try:
+        await asyncio.to_thread(save_and_index)
+    except Exception as e:
+        logger.warning(f"[gemini_service] Failed to persist recipe: {e}")
+
+async def stream_recipe(ingredients: List[str]) -> AsyncIterator[RecipeEvent]:
+    """
+    Generate a recipe as a stream of incremental events
+    
+    Yields a `start` event with the cache status, then `field`,
+    `ingredient` and `instruction` events as each value completes, and a
+    final `recipe` event with the validated recipe. Failures are reported
+    as an `error` event. Cache hits replay the cached recipe immediately;
+    streamed generations are cached and persisted but not coalesced.
     
-    # Create prompt
-    prompt = f"""
+    Args:
+        ingredients: List of available ingredients
+    """
+    try:
+        if not ingredients:
+            raise ValueError("At least one ingredient is required")
+        
+        key = ingredient_key(ingredients)
+        cached = recipe_cache.get(key)
+        cache_status = "HIT"
+        if cached is None:
+            cached = _catalog_recipe(key)
+            cache_status = "CATALOG"
+        if cached is None:
+            cached = _find_similar(key, ingredients)
+            cache_status = "SIMILAR"
+        if cached is None and circuit_breaker.state == CircuitBreaker.OPEN:
+            cached = await _fallback_recipe(key)
+            cache_status = "STALE"
+        if cached is not None:
+            yield "start", {"cache": cache_status}
+            for event in recipe_events(cached):
+                yield event
+            yield "recipe", cached.model_dump()
+            return
+        
+        yield "start", {"cache": "MISS"}
+        started = time.perf_counter()
+        model = get_model()
+        prompt = _build_prompt(ingredients)
+        await admission_controller.acquire(_estimate_tokens(prompt), PRIORITY_INTERACTIVE)
+        assembler = RecipeStreamAssembler()
+        async for text in _stream_content(model, prompt):
+            for event in assembler.feed(text):
+                yield event
+        events, recipe = assembler.finish()
+        for event in events:
+            yield event
+        recipe = _check_nutrition(recipe)
+        
+        latency_ms = (time.perf_counter() - started) * 1000
+        _remember(key, ingredients, recipe)
+        await _persist(key, ingredients, recipe, latency_ms)
+        yield "recipe", recipe.model_dump()
+    except Exception as e:
+        yield "error", {"detail": str(e)}
+
+def _build_prompt(ingredients: List[str]) -> str:
+    """Recipe prompt for the given ingredients"""
+    return f"""
     I have the following ingredients in my fridge: {', '.join(ingredients)}.
     
     Please create a delicious, creative, and practical recipe using some or all of these ingredients. 
@@ -82,22 +612,52 @@ async def generate_recipe(ingredients: List[str]) -> Recipe:
     
     The recipe should be formatted perfectly for a cooking app.
     """
+
+def _estimate_tokens(prompt: str) -> int:
+    """Rough prompt + output token estimate, from the provider's local count"""
+    return provider.count_tokens(prompt) + ESTIMATED_OUTPUT_TOKENS
+
+async def _generate_uncached(
+    ingredients: List[str],
+    priority: int = PRIORITY_INTERACTIVE,
+    key: Optional[str] = None
+) -> Recipe:
+    """
+    Call Gemini and validate its JSON output
+    
+    With `key`, every attempt is admitted at the most urgent priority of the
+    callers sharing that generation (see `_join_flight`).
+    """
+    # Reuse the pooled model instead of constructing one per request
+    model = get_model()
+    prompt = _build_prompt(ingredients)
+    estimated_tokens = _estimate_tokens(prompt)
     
     try:
-        # Generate content
-        response = model.generate_content(prompt)
+        # Generate content, retrying transient failures within the deadline budget.
+        # Every attempt, retries included, first waits for outbound quota; that wait
+        # is bounded by GEMINI_QUEUE_TIMEOUT and doesn't eat into GEMINI_DEADLINE.
+        text = await retry_async(
+            lambda: _call_upstream(lambda: _generate_content(model, prompt)),
+            retry_policy,
+            admit=lambda: admission_controller.acquire(
+                estimated_tokens, _flight_priorities.get(key, priority), group=key
+            )
+        )
         
         # Parse JSON response
-        if not response.text:
+        if not text:
             raise ValueError("No response from Gemini API")
         
-        recipe_data = json.loads(response.text)
+        recipe_data = fast_json.loads(text)
         
-        # Validate and return Recipe model
-        return Recipe(**recipe_data)
+        # Validate once; routes serialize this instance directly
+        return Recipe.model_validate(recipe_data)
         
     except json.JSONDecodeError as e:
         raise ValueError(f"Failed to parse Gemini API response: {e}")
+    except UpstreamUnavailableError:
+        raise
     except Exception as e:
         raise ValueError(f"Error generating recipe: {str(e)}")
 
@@ -0,0 +1,224 @@
+"""
+Ingredient Index
+Inverted index from ingredient tokens to stored recipes for "what can I cook" search
+"""
+import threading
+from array import array
+from typing import Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+from app.services.ingredient_parser import canonical_name
+
+
+def ingredient_tokens(text: str) -> Tuple[str, ...]:
+    """Name tokens of an ingredient line or query ("2 chicken breasts" -> ("chicken", "breast"))"""
+    return tuple(dict.fromkeys(canonical_name(text).split()))
+
+
+def _distinct_sorted(values: np.ndarray) -> np.ndarray:
+    """np.unique for an already sorted array, without re-sorting"""
+    if values.size < 2:
+        return values
+    keep = np.empty(values.size, dtype=bool)
+    keep[0] = True
+    np.not_equal(values[1:], values[:-1], out=keep[1:])
+    return values[keep]
+
+
+def _intersect_sorted(small: np.ndarray, large: np.ndarray) -> np.ndarray:
+    """Intersection of two sorted id arrays without duplicates (`small` is the shorter)"""
+    if small.size * 32 < large.size:
+        # Much shorter: binary-search its ids in the longer one
+        found = np.minimum(np.searchsorted(large, small), large.size - 1)
+        return small[large[found] == small]
+    # Comparable sizes: merge the two runs (stable sort = timsort merge) and keep pairs
+    merged = np.sort(np.concatenate((small, large)), kind="stable")
+    return merged[1:][merged[1:] == merged[:-1]]
+
+
+class SearchHit(NamedTuple):
+    recipe_id: int
+    matched: int      # query ingredients found in the recipe
+    missing: int      # recipe ingredient lines not covered by the query
+    coverage: float   # covered lines / recipe lines
+
+
+class InvertedIngredientIndex:
+    """
+    Token -> posting list index over recipe ingredient lines
+
+    Every ingredient line of every recipe gets a line id; each name token
+    maps to an `array('I')` of line ids (appended in order, so sorted).
+    Parallel arrays map line -> document and document -> recipe id /
+    line count. A query ingredient matches the lines containing all of
+    its tokens (sorted posting intersection by binary search); per-recipe counts are then
+    computed with NumPy over those line ids, so no per-recipe Python work
+    is done at query time.
+
+    Searches read the arrays through zero-copy NumPy views, and an array
+    can't grow while a view of it exists, so `add` and `search` (which
+    runs in the threadpool) are serialized by a lock.
+    """
+
+    def __init__(self):
+        self._token_ids: Dict[str, int] = {}
+        self._postings: List[array] = []
+        self._line_doc = array("I")
+        self._doc_recipe = array("q")
+        self._doc_lines = array("H")
+        self._doc_of_recipe: Dict[int, int] = {}
+        self._tokens_cache: Dict[str, Tuple[str, ...]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._doc_recipe)
+
+    @property
+    def line_count(self) -> int:
+        return len(self._line_doc)
+
+    def _line_tokens(self, line: str) -> Tuple[str, ...]:
+        tokens = self._tokens_cache.get(line)
+        if tokens is None:
+            tokens = ingredient_tokens(line)
+            if len(self._tokens_cache) < 100_000:
+                self._tokens_cache[line] = tokens
+        return tokens
+
+    def add(self, recipe_id: int, ingredient_lines: Sequence[str]) -> None:
+        """Index one recipe's ingredient lines, all or nothing (re-adding an id is ignored)"""
+        line_tokens = [self._line_tokens(line) for line in ingredient_lines]
+        with self._lock:
+            if recipe_id in self._doc_of_recipe:
+                return
+            doc = len(self._doc_recipe)
+            first_line = len(self._line_doc)
+            token_count = len(self._postings)
+            posting_lengths: Dict[int, int] = {}
+            try:
+                for offset, tokens in enumerate(line_tokens):
+                    self._line_doc.append(doc)
+                    for token in tokens:
+                        token_id = self._token_ids.get(token)
+                        if token_id is None:
+                            token_id = len(self._postings)
+                            self._token_ids[token] = token_id
+                            self._postings.append(array("I"))
+                        posting = self._postings[token_id]
+                        posting_lengths.setdefault(token_id, len(posting))
+                        posting.append(first_line + offset)
+                self._doc_lines.append(min(len(line_tokens), 0xFFFF))
+                self._doc_recipe.append(recipe_id)
+            except BaseException:
+                # Undo the partial insert so the parallel arrays stay aligned
+                for token in [t for t, i in self._token_ids.items() if i >= token_count]:
+                    del self._token_ids[token]
+                del self._postings[token_count:]
+                for token_id, length in posting_lengths.items():
+                    if token_id < token_count:
+                        del self._postings[token_id][length:]
+                del self._line_doc[first_line:]
+                del self._doc_lines[doc:]
+                del self._doc_recipe[doc:]
+                raise
+            self._doc_of_recipe[recipe_id] = doc
+
+    def _posting(self, token: str) -> np.ndarray:
+        token_id = self._token_ids.get(token)
+        if token_id is None:
+            return np.empty(0, dtype=np.uint32)
+        return np.frombuffer(self._postings[token_id], dtype=np.uint32)
+
+    def _matching_lines(self, tokens: Tuple[str, ...]) -> np.ndarray:
+        postings = sorted((self._posting(t) for t in tokens), key=len)
+        if not postings:
+            return np.empty(0, dtype=np.uint32)
+        lines = postings[0]
+        for posting in postings[1:]:
+            if lines.size == 0:
+                break
+            lines = _intersect_sorted(lines, posting)
+        return lines
+
+    def search(
+        self,
+        ingredients: Iterable[str],
+        min_match: int = 1,
+        max_missing: int = -1,
+        limit: int = 20,
+    ) -> List[SearchHit]:
+        """
+        Rank recipes by how well they fit the given ingredients
+
+        Args:
+            ingredients: What the user has (free text, canonicalized here)
+            min_match: Minimum number of the user's ingredients a recipe must use
+            max_missing: Max ingredient lines the user lacks (-1 = no limit)
+            limit: Max results
+
+        Returns:
+            Hits ordered by matched desc, missing asc, coverage desc
+        """
+        queries = {ingredient_tokens(i) for i in ingredients}
+        queries.discard(())
+        if not queries:
+            return []
+        with self._lock:
+            # The views made by _search are gone once it returns, before the lock is released
+            return self._search(queries, min_match, max_missing, limit)
+
+    def _search(self, queries, min_match: int, max_missing: int, limit: int) -> List[SearchHit]:
+        if not len(self._doc_recipe):
+            return []
+        line_doc = np.frombuffer(self._line_doc, dtype=np.uint32)
+        doc_lines = np.frombuffer(self._doc_lines, dtype=np.uint16)
+        n_docs = len(self._doc_recipe)
+        matched = np.zeros(n_docs, dtype=np.int32)
+        covered_lines = []
+        for tokens in queries:
+            lines = self._matching_lines(tokens)
+            if lines.size:
+                matched[_distinct_sorted(line_doc[lines])] += 1
+                covered_lines.append(lines)
+        if not covered_lines:
+            return []
+
+        candidates = np.nonzero(matched >= max(1, min_match))[0]
+        if candidates.size == 0:
+            return []
+        # Each list is sorted, so a stable (merge-based) sort of the runs is near linear
+        union = _distinct_sorted(np.sort(np.concatenate(covered_lines), kind="stable"))
+        covered = np.bincount(line_doc[union], minlength=n_docs)[candidates]
+        lines_total = doc_lines[candidates].astype(np.int32)
+        missing = lines_total - covered
+        if max_missing >= 0:
+            keep = missing <= max_missing
+            candidates, covered, lines_total, missing = (
+                candidates[keep], covered[keep], lines_total[keep], missing[keep]
+            )
+        if candidates.size == 0:
+            return []
+
+        coverage = covered / np.maximum(lines_total, 1)
+        order = np.lexsort((-coverage, missing, -matched[candidates]))[:limit]
+        return [
+            SearchHit(
+                recipe_id=int(self._doc_recipe[int(candidates[i])]),
+                matched=int(matched[candidates[i]]),
+                missing=int(missing[i]),
+                coverage=round(float(coverage[i]), 4),
+            )
+            for i in order
+        ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self.__init__()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "recipes": len(self._doc_recipe),
+            "lines": len(self._line_doc),
+            "tokens": len(self._token_ids),
+        }
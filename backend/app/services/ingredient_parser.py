@@ -0,0 +1,248 @@
+"""
+Ingredient Parser
+Splits free-text ingredient lines into quantity / unit / name and maps names to a canonical vocabulary
+"""
+import json
+import os
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, Mapping, NamedTuple, Optional, Tuple
+
+INGREDIENT_VOCABULARY_PATH = os.getenv(
+    "INGREDIENT_VOCABULARY_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resources", "ingredients.json")
+)
+
+_PARENTHETICAL = re.compile(r"\([^)]*\)")
+# "200g" -> "200 g", "1½" -> "1 ½"
+_ATTACHED_UNIT = re.compile(r"(?<=\d)(?=[^\d\s./\-–])")
+# Dropped anywhere; "." only at the end (it's also a decimal point)
+_PUNCTUATION = str.maketrans("", "", ";:!*\"'")
+
+_UNICODE_FRACTIONS = {
+    "½": 0.5, "⅓": 1 / 3, "⅔": 2 / 3, "¼": 0.25, "¾": 0.75,
+    "⅕": 0.2, "⅛": 0.125, "⅜": 0.375, "⅝": 0.625, "⅞": 0.875,
+}
+_NUMBER_START = frozenset("0123456789.").union(_UNICODE_FRACTIONS)
+
+# Alias -> canonical unit
+UNITS: Dict[str, str] = {}
+for _unit, _aliases in {
+    "g": "g gr gram grams gramme grammes",
+    "kg": "kg kgs kilo kilos kilogram kilograms",
+    "ml": "ml milliliter milliliters millilitre millilitres",
+    "l": "l liter liters litre litres",
+    "tsp": "tsp tsps teaspoon teaspoons",
+    "tbsp": "tbsp tbsps tbs tbl tablespoon tablespoons",
+    "cup": "cup cups",
+    "oz": "oz ounce ounces",
+    "lb": "lb lbs pound pounds",
+    "pint": "pint pints",
+    "quart": "quart quarts",
+    "pinch": "pinch pinches",
+    "dash": "dash dashes",
+    "clove": "clove cloves",
+    "can": "can cans tin tins",
+    "slice": "slice slices",
+    "piece": "piece pieces pc pcs",
+    "bunch": "bunch bunches",
+    "handful": "handful handfuls",
+    "stalk": "stalk stalks",
+    "sprig": "sprig sprigs",
+    "head": "head heads",
+    "stick": "stick sticks",
+    "package": "package packages pack packs packet packets",
+}.items():
+    for _alias in _aliases.split():
+        UNITS[_alias] = _unit
+
+# Preparation notes and sizes that don't change what the ingredient is
+DESCRIPTORS = frozenset("""
+a an of the for to about approximately plus optional taste serving garnish
+large medium small big extra whole fresh freshly frozen dried raw ripe
+chopped diced minced sliced grated crushed ground shredded cubed peeled halved quartered julienned
+finely roughly thinly coarsely lightly
+boneless skinless lean organic
+""".split())
+
+
+@lru_cache(maxsize=16384)
+def singularize(word: str) -> str:
+    """Strip simple English plural endings ("tomatoes" -> "tomato", "berries" -> "berry")"""
+    if len(word) <= 3:
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("oes", "ches", "shes", "sses", "xes", "zes")):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+@lru_cache(maxsize=4096)
+def _parse_number(word: str) -> Optional[float]:
+    """"2", "1.5", "1/2", "½", "2-3" (mean of the range); None if not a number"""
+    if word in _UNICODE_FRACTIONS:
+        return _UNICODE_FRACTIONS[word]
+    if word[0] not in _NUMBER_START:
+        return None
+    for dash in ("-", "–"):
+        if dash in word:
+            low, _, high = word.partition(dash)
+            low_value, high_value = _parse_number(low) if low else None, _parse_number(high) if high else None
+            if low_value is None or high_value is None:
+                return low_value if high_value is None else high_value
+            return (low_value + high_value) / 2
+    if "/" in word:
+        numerator, _, denominator = word.partition("/")
+        try:
+            return float(numerator) / float(denominator)
+        except (ValueError, ZeroDivisionError):
+            return None
+    try:
+        return float(word)
+    except ValueError:
+        return None
+
+
+def _join_name(words) -> str:
+    if not words:
+        return ""
+    if len(words) == 1:
+        return singularize(words[0])
+    return " ".join(words[:-1]) + " " + singularize(words[-1])
+
+
+class ParsedIngredient(NamedTuple):
+    quantity: Optional[float]  # None when the line has no amount ("salt to taste")
+    unit: Optional[str]        # Canonical unit ("tbsp", "g", "clove", ...)
+    name: str                  # Canonical name when known, else the cleaned-up name
+    known: bool                # Whether `name` is in the vocabulary
+
+
+class IngredientParser:
+    """
+    Free-text ingredient parser with a precompiled alias table
+
+    The vocabulary (canonical name -> aliases) is compiled once into a
+    single dict from normalized alias phrase to canonical name; canonical
+    strings are shared, not copied per alias. Parsing is a few string
+    operations and dict lookups per line:
+
+        "1 ½ cups chopped scallions, divided" -> (1.5, "cup", "green onion", True)
+
+    Names are looked up as written first ("ground beef"), then with
+    preparation words and sizes removed ("2 large eggs" -> "egg").
+    Unknown names are kept in their cleaned-up form, never guessed.
+    """
+
+    def __init__(self, vocabulary: Mapping[str, Iterable[str]]):
+        self._aliases: Dict[str, str] = {}
+        for canonical, aliases in vocabulary.items():
+            if canonical.startswith("_"):
+                continue
+            canonical = canonical.strip().lower()
+            for alias in (canonical, *aliases):
+                key = _join_name(self._words(alias))
+                existing = self._aliases.setdefault(key, canonical)
+                if existing != canonical:
+                    raise ValueError(f"Alias {alias!r} maps to both {existing!r} and {canonical!r}")
+        self.canonical_names: Tuple[str, ...] = tuple(sorted(set(self._aliases.values())))
+
+    @classmethod
+    def from_file(cls, path: str) -> "IngredientParser":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def __len__(self) -> int:
+        return len(self._aliases)
+
+    @staticmethod
+    def _words(text: str):
+        text = text.lower().translate(_PUNCTUATION)
+        if "(" in text:
+            text = _PARENTHETICAL.sub(" ", text)
+        return text.replace(". ", " ").rstrip(".").split()
+
+    def parse(self, line: str) -> ParsedIngredient:
+        """
+        Parse one ingredient line
+
+        Args:
+            line: e.g. "2 tbsp soy sauce", "3 cloves garlic, minced", "Salt to taste"
+
+        Returns:
+            ParsedIngredient; `name` is empty only if the line names nothing
+        """
+        line = line.split(",", 1)[0]
+        if " or " in line:
+            # "butter or oil" -> the first option
+            line = line.split(" or ", 1)[0]
+        words = self._words(_ATTACHED_UNIT.sub(" ", line))
+
+        count = len(words)
+        quantity = None
+        i = 0
+        if count > 1 and words[0] in ("a", "an"):
+            quantity, i = 1.0, 1
+        while i < count:
+            word = words[i]
+            value = _parse_number(word) if word[0] in _NUMBER_START else None
+            if value is None:
+                if word == "to" and quantity is not None and i + 1 < count:
+                    # "2 to 3 cups" -> 2.5
+                    upper = _parse_number(words[i + 1])
+                    if upper is not None:
+                        quantity = (quantity + upper) / 2
+                        i += 2
+                        continue
+                break
+            quantity = value if quantity is None else quantity + value
+            i += 1
+
+        unit = None
+        if i + 1 < count:
+            unit = UNITS.get(words[i])
+            if unit is not None:
+                i += 1
+        name, known = self._canonical(words[i:] if i else words)
+        return ParsedIngredient(quantity, unit, name, known)
+
+    def _canonical(self, words) -> Tuple[str, bool]:
+        phrase = _join_name(words)
+        canonical = self._aliases.get(phrase)
+        if canonical is not None:
+            return canonical, True
+        stripped = [w for w in words if w not in DESCRIPTORS]
+        if len(stripped) != len(words):
+            reduced = _join_name(stripped)
+            canonical = self._aliases.get(reduced)
+            if canonical is not None:
+                return canonical, True
+            if reduced:
+                return reduced, False
+        return phrase, False
+
+    def canonical_name(self, text: str) -> str:
+        """Canonical ingredient name for user input or a recipe line ("Scallions" -> "green onion")"""
+        return self.parse(text).name
+
+    def is_known(self, name: str) -> bool:
+        return name in self._aliases
+
+
+@lru_cache(maxsize=1)
+def get_parser() -> IngredientParser:
+    """Parser over the bundled vocabulary (INGREDIENT_VOCABULARY_PATH), compiled on first use"""
+    return IngredientParser.from_file(INGREDIENT_VOCABULARY_PATH)
+
+
+def parse_ingredient(line: str) -> ParsedIngredient:
+    """Parse one line with the default vocabulary"""
+    return get_parser().parse(line)
+
+
+def canonical_name(text: str) -> str:
+    """Canonical ingredient name with the default vocabulary"""
+    return get_parser().parse(text).name
@@ -0,0 +1,208 @@
+"""
+Incremental JSON Parser
+Parses JSON text as it arrives, reporting each value the moment it closes
+"""
+import json
+import re
+from typing import Any, List, Optional, Tuple, Union
+
+Path = Tuple[Union[str, int], ...]
+ParseEvent = Tuple[Path, Any]
+
+# Runs of characters that need no attention inside a string / a number or literal
+_STRING_RUN = re.compile(r'[^"\\]+')
+_SCALAR_RUN = re.compile(r"[-+.0-9A-Za-z]+")
+_WHITESPACE_RUN = re.compile(r"[ \t\r\n]+")
+
+# Parser states
+_VALUE = 0        # expecting a value
+_KEY = 1          # expecting an object key or "}"
+_COLON = 2        # expecting ":" after a key
+_COMMA = 3        # expecting "," or the container's closing bracket
+_DONE = 4         # root value complete
+
+_MISSING = object()
+
+
+class JSONStreamError(ValueError):
+    """Raised when the streamed text is not valid JSON"""
+
+
+class IncrementalJSONParser:
+    """
+    Push parser for a single JSON document
+
+    Feed text chunks with `feed()`; each call returns `(path, value)` pairs
+    for values that completed within that chunk, where `path` is the tuple
+    of object keys / array indexes leading to the value (the root value has
+    path `()`). Containers are built as they stream, so every character is
+    examined once: total work is O(total bytes) regardless of chunking.
+
+    Args:
+        max_depth: Only report values whose path is at most this long
+            (None reports every value)
+    """
+
+    def __init__(self, max_depth: Optional[int] = None):
+        self.max_depth = max_depth
+        # Open containers: [container, current key (objects only)]
+        self._stack: List[list] = []
+        self._state = _VALUE
+        self._string: Optional[List[str]] = None
+        self._escape = False
+        self._scalar: Optional[List[str]] = None
+        self._root: Any = _MISSING
+
+    def feed(self, chunk: str) -> List[ParseEvent]:
+        """Consume a chunk of text and return the values it completed"""
+        events: List[ParseEvent] = []
+        pos = 0
+        end = len(chunk)
+        while pos < end:
+            if self._string is not None:
+                pos = self._consume_string(chunk, pos, events)
+                continue
+            if self._scalar is not None:
+                match = _SCALAR_RUN.match(chunk, pos)
+                if match:
+                    self._scalar.append(match.group())
+                    pos = match.end()
+                    if pos == end:
+                        break
+                self._finish_scalar(events)
+                continue
+
+            ch = chunk[pos]
+            if ch in " \t\r\n":
+                pos = _WHITESPACE_RUN.match(chunk, pos).end()
+                continue
+
+            state = self._state
+            if ch == '"' and state in (_VALUE, _KEY):
+                self._string = []
+                pos += 1
+            elif state == _VALUE:
+                if ch == "{":
+                    self._stack.append([{}, None])
+                    self._state = _KEY
+                elif ch == "[":
+                    self._stack.append([[], None])
+                    self._state = _VALUE
+                elif ch == "]" and self._stack and isinstance(self._stack[-1][0], list) \
+                        and not self._stack[-1][0]:
+                    self._close_container(events)
+                else:
+                    self._scalar = []
+                    continue
+                pos += 1
+            elif state == _KEY:
+                if ch != "}" or self._stack[-1][0]:
+                    raise JSONStreamError(f"Expected object key, got {ch!r}")
+                self._close_container(events)
+                pos += 1
+            elif state == _COLON:
+                if ch != ":":
+                    raise JSONStreamError(f"Expected ':', got {ch!r}")
+                self._state = _VALUE
+                pos += 1
+            elif state == _COMMA:
+                container = self._stack[-1][0]
+                if ch == ",":
+                    self._state = _KEY if isinstance(container, dict) else _VALUE
+                elif ch == ("}" if isinstance(container, dict) else "]"):
+                    self._close_container(events)
+                else:
+                    raise JSONStreamError(f"Unexpected {ch!r}")
+                pos += 1
+            else:
+                raise JSONStreamError(f"Unexpected {ch!r} after end of document")
+        return events
+
+    def finish(self) -> Any:
+        """
+        Signal end of input and return the parsed document
+
+        Raises:
+            JSONStreamError: If the document is incomplete
+        """
+        events: List[ParseEvent] = []
+        if self._scalar is not None and not self._stack:
+            self._finish_scalar(events)
+        if self._root is _MISSING or self._string is not None or self._stack:
+            raise JSONStreamError("Incomplete JSON document")
+        return self._root
+
+    @property
+    def done(self) -> bool:
+        """True once the root value has closed"""
+        return self._state == _DONE
+
+    def _consume_string(self, chunk: str, pos: int, events: List[ParseEvent]) -> int:
+        end = len(chunk)
+        while pos < end:
+            if self._escape:
+                # Keep the escape raw; json.loads decodes it (incl. \uXXXX) at the end
+                self._string.append(chunk[pos])
+                self._escape = False
+                pos += 1
+                continue
+            match = _STRING_RUN.match(chunk, pos)
+            if match:
+                self._string.append(match.group())
+                pos = match.end()
+                continue
+            if chunk[pos] == "\\":
+                self._string.append("\\")
+                self._escape = True
+                pos += 1
+                continue
+            # Closing quote
+            raw = "".join(self._string)
+            self._string = None
+            try:
+                text = json.loads(f'"{raw}"') if "\\" in raw else raw
+            except json.JSONDecodeError as e:
+                raise JSONStreamError(f"Invalid string escape: {e}")
+            if self._state == _KEY:
+                self._stack[-1][1] = text
+                self._state = _COLON
+            else:
+                self._complete(text, events)
+            return pos + 1
+        return pos
+
+    def _finish_scalar(self, events: List[ParseEvent]) -> None:
+        token = "".join(self._scalar)
+        self._scalar = None
+        try:
+            value = json.loads(token)
+        except json.JSONDecodeError:
+            raise JSONStreamError(f"Invalid literal {token!r}")
+        self._complete(value, events)
+
+    def _close_container(self, events: List[ParseEvent]) -> None:
+        container, _ = self._stack.pop()
+        self._complete(container, events)
+
+    def _complete(self, value: Any, events: List[ParseEvent]) -> None:
+        if not self._stack:
+            self._root = value
+            self._state = _DONE
+            if self.max_depth is None or self.max_depth >= 0:
+                events.append(((), value))
+            return
+
+        depth = len(self._stack)
+        if self.max_depth is None or depth <= self.max_depth:
+            path = tuple(
+                frame[1] if isinstance(frame[0], dict) else len(frame[0])
+                for frame in self._stack
+            )
+            events.append((path, value))
+
+        container, key = self._stack[-1]
+        if isinstance(container, dict):
+            container[key] = value
+        else:
+            container.append(value)
+        self._state = _COMMA
@@ -0,0 +1,288 @@
+"""
+LLM Provider
+Pluggable text-generation backends: Google Gemini, and a deterministic local fake for offline load tests
+"""
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+from concurrent.futures import Executor
+from typing import Any, AsyncIterator, Callable, Dict, List, NamedTuple, Optional
+
+from app.services.resilience import ProviderNotConfiguredError
+
+# "gemini" (default) or "fake"
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini")
+
+# Fake provider: median latency, log-normal spread, share of calls failing with a 503, RNG seed
+LLM_FAKE_LATENCY_MS = float(os.getenv("LLM_FAKE_LATENCY_MS", "50"))
+LLM_FAKE_LATENCY_SIGMA = float(os.getenv("LLM_FAKE_LATENCY_SIGMA", "0.5"))
+LLM_FAKE_ERROR_RATE = float(os.getenv("LLM_FAKE_ERROR_RATE", "0"))
+LLM_FAKE_SEED = int(os.getenv("LLM_FAKE_SEED", "0"))
+
+
+class Completion(NamedTuple):
+    text: str
+    prompt_tokens: Optional[int] = None  # As billed by the provider; None if it doesn't report usage
+    output_tokens: Optional[int] = None
+
+
+class LLMProvider:
+    """
+    Backend that turns a prompt into text
+
+    `build_model` is the model registry's factory, so each provider keeps
+    its own pooled clients; `generate` / `generate_stream` take one of
+    those models. Concurrency limits, retries and the circuit breaker live
+    in gemini_service and apply to every provider alike.
+    """
+
+    name = "base"
+
+    @property
+    def configured(self) -> bool:
+        """Whether the provider has what it needs to make calls"""
+        return True
+
+    def build_model(self, model_name: str, generation_config: Dict[str, Any], system_instruction: Optional[str]) -> Any:
+        raise NotImplementedError
+
+    async def generate(self, model: Any, prompt: str) -> Completion:
+        """Full response for `prompt`, with token usage when the provider reports it"""
+        raise NotImplementedError
+
+    def generate_stream(self, model: Any, prompt: str) -> AsyncIterator[str]:
+        """Response text for `prompt`, chunk by chunk"""
+        raise NotImplementedError
+
+    def count_tokens(self, text: str) -> int:
+        """Local token estimate (~4 characters per token); never a network call"""
+        return len(text) // 4
+
+    def stats(self) -> Dict[str, Any]:
+        return {"name": self.name, "configured": self.configured}
+
+
+def _chunk_text(chunk) -> str:
+    """Text of a streamed chunk; chunks without parts (e.g. safety metadata) have none"""
+    try:
+        return chunk.text or ""
+    except ValueError:
+        return ""
+
+
+class GeminiProvider(LLMProvider):
+    """
+    Google Gemini via google.generativeai
+
+    The SDK is imported and configured on the first model build, not at
+    import. Models with an async API are awaited directly; the blocking
+    SDK calls otherwise run in the executor from `executor()`.
+    """
+
+    name = "gemini"
+
+    def __init__(self, api_key: Optional[str], executor: Callable[[], Executor]):
+        self.api_key = api_key
+        self._executor = executor
+        self._genai: Any = None
+        self._lock = threading.Lock()
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_key)
+
+    def _get_genai(self):
+        """
+        Import and configure the Gemini SDK once, on first use
+
+        Raises:
+            ProviderNotConfiguredError: If no API key is set
+        """
+        if self._genai is not None:
+            return self._genai
+        if not self.api_key:
+            raise ProviderNotConfiguredError("GEMINI_API_KEY environment variable is required")
+        with self._lock:
+            if self._genai is None:
+                import google.generativeai as genai
+                genai.configure(api_key=self.api_key)
+                self._genai = genai
+        return self._genai
+
+    def build_model(self, model_name, generation_config, system_instruction):
+        return self._get_genai().GenerativeModel(
+            model_name=model_name,
+            generation_config=generation_config,
+            system_instruction=system_instruction
+        )
+
+    async def generate(self, model, prompt: str) -> Completion:
+        generate_async = getattr(model, "generate_content_async", None)
+        if generate_async is not None:
+            response = await generate_async(prompt)
+        else:
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(self._executor(), model.generate_content, prompt)
+        usage = getattr(response, "usage_metadata", None)
+        return Completion(
+            response.text,
+            getattr(usage, "prompt_token_count", None) or None,
+            getattr(usage, "candidates_token_count", None) or None,
+        )
+
+    async def generate_stream(self, model, prompt: str) -> AsyncIterator[str]:
+        generate_async = getattr(model, "generate_content_async", None)
+        if generate_async is not None:
+            response = await generate_async(prompt, stream=True)
+            async for chunk in response:
+                yield _chunk_text(chunk)
+            return
+        loop = asyncio.get_running_loop()
+        executor = self._executor()
+        chunks = await loop.run_in_executor(executor, lambda: iter(model.generate_content(prompt, stream=True)))
+        done = object()
+        while True:
+            chunk = await loop.run_in_executor(executor, next, chunks, done)
+            if chunk is done:
+                break
+            yield _chunk_text(chunk)
+
+
+class FakeProviderError(Exception):
+    """Injected upstream failure; `code` makes resilience.is_transient treat it like a Gemini 503"""
+
+    code = 503
+
+
+_INGREDIENTS_IN_PROMPT = re.compile(r"ingredients in my fridge: (.*?)\.\s*$", re.MULTILINE)
+_DISHES = ("Stir-Fry", "Skillet", "Soup", "Salad", "Curry", "Bake", "Noodle Bowl", "Fried Rice")
+_AMOUNTS = ("200 g", "1 cup", "2 tbsp", "2", "1 tsp", "150 g", "3 cloves", "1/2 cup")
+
+
+class FakeProvider(LLMProvider):
+    """
+    Offline provider returning schema-valid recipe JSON after a simulated delay
+
+    The recipe is a pure function of the prompt, so repeated runs produce
+    the same responses. Latency is log-normal around `latency_ms` (sigma
+    `latency_sigma`; 0 for a fixed delay) and a seeded `error_rate` share
+    of calls raises FakeProviderError, which the retry and circuit breaker
+    logic treats as a transient 503. Nothing is imported or sent anywhere.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        latency_ms: float = LLM_FAKE_LATENCY_MS,
+        latency_sigma: float = LLM_FAKE_LATENCY_SIGMA,
+        error_rate: float = LLM_FAKE_ERROR_RATE,
+        seed: int = LLM_FAKE_SEED,
+        chunk_size: int = 64,
+    ):
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.chunk_size = chunk_size
+        self._random = random.Random(seed)
+        self.calls = 0
+        self.errors = 0
+
+    def build_model(self, model_name, generation_config, system_instruction):
+        # Nothing to pool; the name is enough to tell models apart in stats
+        return model_name
+
+    def sample_latency(self) -> float:
+        """Seconds for one call"""
+        if self.latency_ms <= 0:
+            return 0.0
+        if self.latency_sigma <= 0:
+            return self.latency_ms / 1000
+        return self._random.lognormvariate(0.0, self.latency_sigma) * self.latency_ms / 1000
+
+    def _fail(self) -> bool:
+        self.calls += 1
+        if self.error_rate > 0 and self._random.random() < self.error_rate:
+            self.errors += 1
+            return True
+        return False
+
+    async def generate(self, model, prompt: str) -> Completion:
+        delay, fail = self.sample_latency(), self._fail()
+        await asyncio.sleep(delay)
+        if fail:
+            raise FakeProviderError("Fake provider: injected 503")
+        text = self.recipe_json(prompt)
+        return Completion(text, self.count_tokens(prompt), self.count_tokens(text))
+
+    async def generate_stream(self, model, prompt: str) -> AsyncIterator[str]:
+        delay, fail = self.sample_latency(), self._fail()
+        text = self.recipe_json(prompt)
+        chunks = [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)]
+        # Time to first chunk is a third of the call, the rest is spread over the chunks
+        await asyncio.sleep(delay / 3)
+        if fail:
+            raise FakeProviderError("Fake provider: injected 503")
+        for chunk in chunks:
+            await asyncio.sleep(delay * 2 / 3 / len(chunks))
+            yield chunk
+
+    @staticmethod
+    def recipe(prompt: str) -> Dict[str, Any]:
+        """Deterministic recipe for the ingredients named in `prompt`"""
+        match = _INGREDIENTS_IN_PROMPT.search(prompt)
+        ingredients: List[str] = [i.strip() for i in match.group(1).split(",") if i.strip()] if match else []
+        ingredients = ingredients or ["rice"]
+        digest = hashlib.sha1(prompt.encode("utf-8")).digest()
+        main = ingredients[0].title()
+        return {
+            "title": f"{main} {_DISHES[digest[0] % len(_DISHES)]}",
+            "description": f"A quick home-style dish with {', '.join(ingredients)}.",
+            "cookTime": f"{15 + digest[1] % 46} mins",
+            "difficulty": ("Easy", "Medium", "Hard")[digest[2] % 3],
+            "calories": 250 + digest[3] * 2,
+            "servings": 1 + digest[4] % 4,
+            "ingredients": [
+                f"{_AMOUNTS[(digest[5] + i) % len(_AMOUNTS)]} {name}" for i, name in enumerate(ingredients)
+            ],
+            "instructions": [
+                "Prepare and chop the ingredients.",
+                f"Cook the {ingredients[0]} over medium heat until done.",
+                "Add the remaining ingredients, season to taste and serve.",
+            ],
+        }
+
+    def recipe_json(self, prompt: str) -> str:
+        return json.dumps(self.recipe(prompt))
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "calls": self.calls, "errors": self.errors}
+
+
+def create_provider(
+    name: str = LLM_PROVIDER,
+    api_key: Optional[str] = None,
+    executor: Optional[Callable[[], Executor]] = None,
+) -> LLMProvider:
+    """
+    Provider selected by name (LLM_PROVIDER)
+
+    Args:
+        name: "gemini" or "fake"
+        api_key: Gemini API key
+        executor: Returns the executor for blocking SDK calls (Gemini only)
+
+    Raises:
+        ValueError: If the name is unknown
+    """
+    if name == "gemini":
+        if executor is None:
+            raise ValueError("The Gemini provider needs an executor")
+        return GeminiProvider(api_key, executor)
+    if name == "fake":
+        return FakeProvider()
+    raise ValueError(f"Unknown LLM_PROVIDER {name!r} (expected 'gemini' or 'fake')")
@@ -0,0 +1,108 @@
+"""
+MCP Client
+Shared, pooled HTTP client for the MCP API server used by the agents routes
+"""
+import asyncio
+import os
+from typing import Optional, Set
+
+import httpx
+
+from app.services.metrics import METRICS_ENABLED, TimedTransport
+
+# MCP API Server URL
+MCP_API_URL = os.getenv("MCP_API_URL", "http://localhost:8001")
+# Connection pool: open connections at most, idle keep-alive connections kept, idle expiry (seconds).
+# Keep-alive defaults to the pool size: with fewer, every burst above it reconnects per request.
+MCP_MAX_CONNECTIONS = int(os.getenv("MCP_MAX_CONNECTIONS", "100"))
+MCP_MAX_KEEPALIVE = int(os.getenv("MCP_MAX_KEEPALIVE", str(MCP_MAX_CONNECTIONS)))
+MCP_KEEPALIVE_EXPIRY = float(os.getenv("MCP_KEEPALIVE_EXPIRY", "30"))
+# Default per-request timeout; slow endpoints (message delivery) pass their own
+MCP_TIMEOUT = float(os.getenv("MCP_TIMEOUT", "5"))
+# Longest a request waits for a free pooled connection
+MCP_POOL_TIMEOUT = float(os.getenv("MCP_POOL_TIMEOUT", "5"))
+
+# Transport override for the shared client (tests install an httpx.MockTransport)
+transport: Optional[httpx.AsyncBaseTransport] = None
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+# Closes of clients replaced after their loop stopped, kept referenced until done
+_closing: Set["asyncio.Future[None]"] = set()
+
+
+def create_client(base_url: Optional[str] = None) -> httpx.AsyncClient:
+    """
+    Pooled keep-alive client for the MCP server
+
+    httpx doesn't pipeline HTTP/1.1: each in-flight request holds one
+    connection, so MCP_MAX_CONNECTIONS bounds concurrency towards the MCP
+    server and callers beyond it queue for up to MCP_POOL_TIMEOUT.
+
+    Args:
+        base_url: MCP server URL (defaults to MCP_API_URL)
+    """
+    pool = transport or httpx.AsyncHTTPTransport(
+        limits=httpx.Limits(
+            max_connections=MCP_MAX_CONNECTIONS,
+            max_keepalive_connections=MCP_MAX_KEEPALIVE,
+            keepalive_expiry=MCP_KEEPALIVE_EXPIRY,
+        )
+    )
+    return httpx.AsyncClient(
+        base_url=base_url or MCP_API_URL,
+        timeout=httpx.Timeout(MCP_TIMEOUT, pool=MCP_POOL_TIMEOUT),
+        transport=TimedTransport(pool, "mcp") if METRICS_ENABLED else pool,
+    )
+
+
+def init_client(base_url: Optional[str] = None) -> httpx.AsyncClient:
+    """Create the shared client (called from the FastAPI lifespan, inside the serving loop)"""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        if _client is not None:
+            _discard(_client, _client_loop)
+        _client = create_client(base_url)
+        _client_loop = loop
+    return _client
+
+
+def _discard(client: httpx.AsyncClient, loop: asyncio.AbstractEventLoop) -> None:
+    """Close a client replaced because it belongs to another event loop"""
+    if loop.is_running():
+        # Its connections are that loop's; close them there
+        asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+        return
+    # The loop has stopped: close from this one, best effort (its sockets may be gone already)
+    closing = asyncio.ensure_future(_close_quietly(client))
+    _closing.add(closing)
+    closing.add_done_callback(_closing.discard)
+
+
+async def _close_quietly(client: httpx.AsyncClient) -> None:
+    try:
+        await client.aclose()
+    except Exception:
+        pass
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    The shared client for the running event loop
+
+    Pooled connections belong to the loop that opened them; if the
+    lifespan didn't run (or ran on another loop) a client is created for
+    this one.
+    """
+    if _client is not None and _client_loop is asyncio.get_running_loop():
+        return _client
+    return init_client()
+
+
+async def close_client() -> None:
+    """Close pooled connections (called from the FastAPI lifespan)"""
+    global _client, _client_loop
+    if _client is not None:
+        client, _client, _client_loop = _client, None, None
+        await client.aclose()
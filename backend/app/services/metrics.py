@@ -0,0 +1,243 @@
+"""
+Metrics
+Request, latency and upstream-call metrics exported in Prometheus text format
+"""
+import os
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+# Record metrics and serve /metrics
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+
+# Histogram bucket upper bounds (seconds) for HTTP and upstream latencies
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Tuple[Tuple[str, str], ...]
+# (metric name, type, help, [(labels, value)]) produced by a collector at scrape time
+Sample = Tuple[str, str, str, List[Tuple[Labels, float]]]
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram
+
+    `observe` bisects into a preallocated list of per-bucket counts
+    (cumulated only when exported) and adds to the sum; no allocation and
+    no lock. Updates come from the event loop thread, so they never race.
+    """
+
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        # Last slot is +Inf
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        total = 0
+        buckets = []
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            total += count
+            buckets.append(("+Inf" if bound == float("inf") else repr(bound), total))
+        return buckets
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """
+    HTTP request and upstream call metrics for the process
+
+    Counters are plain dict entries keyed by label tuples and histograms
+    are `Histogram`s, created on first use; label values are bounded (route
+    templates, not raw paths) so the key space stays small. Collectors
+    registered with `add_collector` contribute gauges computed at scrape
+    time (queue depths, token totals).
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._requests: Dict[Tuple[str, str, int], int] = {}
+        self._request_latency: Dict[Tuple[str, str], Histogram] = {}
+        self._upstream_calls: Dict[Tuple[str, str, str], int] = {}
+        self._upstream_latency: Dict[Tuple[str, str], Histogram] = {}
+        self._in_flight = 0
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float) -> None:
+        key = (method, route, status)
+        self._requests[key] = self._requests.get(key, 0) + 1
+        histogram = self._request_latency.get((method, route))
+        if histogram is None:
+            histogram = self._request_latency[(method, route)] = Histogram(self.buckets)
+        histogram.observe(seconds)
+
+    def observe_upstream(self, upstream: str, operation: str, seconds: float, outcome: str = "ok") -> None:
+        """
+        Account one call to an upstream service
+
+        Args:
+            upstream: Service name ("gemini", "mcp")
+            operation: What was called (model call kind, MCP path)
+            seconds: Time until the upstream answered or failed
+            outcome: "ok" or "error"
+        """
+        key = (upstream, operation, outcome)
+        self._upstream_calls[key] = self._upstream_calls.get(key, 0) + 1
+        histogram = self._upstream_latency.get((upstream, operation))
+        if histogram is None:
+            histogram = self._upstream_latency[(upstream, operation)] = Histogram(self.buckets)
+        histogram.observe(seconds)
+
+    def add_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        self._collectors.append(collector)
+
+    def reset(self) -> None:
+        self._requests.clear()
+        self._request_latency.clear()
+        self._upstream_calls.clear()
+        self._upstream_latency.clear()
+        self._in_flight = 0
+
+    def _counter_lines(self, name: str, help_text: str, label_names: Tuple[str, ...], values: Dict) -> List[str]:
+        lines = [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        for key, value in sorted(values.items()):
+            labels = tuple((label, str(part)) for label, part in zip(label_names, key))
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+        return lines
+
+    def _histogram_lines(
+        self, name: str, help_text: str, label_names: Tuple[str, ...], histograms: Dict
+    ) -> List[str]:
+        lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for key, histogram in sorted(histograms.items()):
+            # Escape the labels once per series, not once per bucket line
+            labels = _format_labels(tuple(zip(label_names, key)))
+            bucket_prefix = f"{name}_bucket{labels[:-1]}," if labels else f"{name}_bucket{{"
+            buckets = histogram.cumulative()
+            for bound, count in buckets:
+                lines.append(f'{bucket_prefix}le="{bound}"}} {count}')
+            lines.append(f"{name}_sum{labels} {histogram.sum!r}")
+            lines.append(f"{name}_count{labels} {buckets[-1][1]}")
+        return lines
+
+    def render(self) -> str:
+        """All metrics in Prometheus text exposition format (0.0.4)"""
+        lines = self._counter_lines(
+            "cheftai_http_requests_total", "HTTP requests by route template and status code.",
+            ("method", "route", "status"), self._requests,
+        )
+        lines += self._histogram_lines(
+            "cheftai_http_request_duration_seconds", "HTTP request latency, until the response body is sent.",
+            ("method", "route"), self._request_latency,
+        )
+        lines += [
+            "# HELP cheftai_http_requests_in_flight HTTP requests being served.",
+            "# TYPE cheftai_http_requests_in_flight gauge",
+            f"cheftai_http_requests_in_flight {self._in_flight}",
+        ]
+        lines += self._counter_lines(
+            "cheftai_upstream_calls_total", "Calls to upstream services (Gemini, MCP) by outcome.",
+            ("upstream", "operation", "outcome"), self._upstream_calls,
+        )
+        lines += self._histogram_lines(
+            "cheftai_upstream_call_duration_seconds", "Upstream call latency, until the upstream answered or failed.",
+            ("upstream", "operation"), self._upstream_latency,
+        )
+        for collector in self._collectors:
+            for name, kind, help_text, samples in collector():
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+                lines += [f"{name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples]
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request
+
+    Labels requests with the matched route template (`/api/recipes/{recipe_id}`,
+    not the raw path; "unmatched" for 404s outside any route) and the
+    response status. Latency runs until the last body chunk is sent, so
+    streamed responses count their whole stream. Plain ASGI rather than
+    BaseHTTPMiddleware, which buffers streaming responses.
+    """
+
+    def __init__(self, app, registry: Optional[MetricsRegistry] = None):
+        self.app = app
+        self.registry = registry or metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        registry = self.registry
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        registry._in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            registry._in_flight -= 1
+            route = scope.get("route")
+            registry.observe_request(
+                scope["method"], getattr(route, "path", "unmatched"), status, time.perf_counter() - started
+            )
+
+
+class TimedTransport(httpx.AsyncBaseTransport):
+    """httpx transport wrapper recording each request as an upstream call (time to response headers)"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, upstream: str, registry: Optional[MetricsRegistry] = None):
+        self.transport = transport
+        self.upstream = upstream
+        self.registry = registry or metrics
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await self.transport.handle_async_request(request)
+            outcome = "ok" if response.status_code < 500 else "error"
+            return response
+        finally:
+            self.registry.observe_upstream(self.upstream, request.url.path, time.perf_counter() - started, outcome)
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,92 @@
+"""
+Model Registry
+Process-wide pool of LLM model clients, keyed by model name + generation config
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+# factory(model_name, generation_config, system_instruction) -> model client
+ModelFactory = Callable[[str, Dict[str, Any], Optional[str]], Any]
+
+
+def _freeze(value: Any) -> Hashable:
+    """Convert nested dicts/lists (e.g. a response schema) into a hashable key"""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class ModelRegistry:
+    """
+    Cache of constructed model clients so each (model, config) pair is built once
+
+    The factory is pluggable: the Gemini service installs one that builds
+    `genai.GenerativeModel`, tests install one that returns fakes.
+    """
+
+    def __init__(self, factory: ModelFactory):
+        self._factory = factory
+        self._models: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self,
+        model_name: str,
+        generation_config: Optional[Dict[str, Any]] = None,
+        system_instruction: Optional[str] = None,
+    ) -> Any:
+        """
+        Return the pooled model for this configuration, building it on first use
+
+        Args:
+            model_name: Model identifier (e.g. "gemini-2.0-flash-exp")
+            generation_config: Generation config passed to the factory
+            system_instruction: Optional system prompt
+
+        Returns:
+            Model client created by the registry's factory
+        """
+        generation_config = generation_config or {}
+        key = (model_name, _freeze(generation_config), system_instruction)
+
+        model = self._models.get(key)
+        if model is not None:
+            self.hits += 1
+            return model
+
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self.hits += 1
+                return model
+            model = self._factory(model_name, generation_config, system_instruction)
+            self._models[key] = model
+            self.misses += 1
+            return model
+
+    def set_factory(self, factory: ModelFactory) -> None:
+        """Swap the model factory and drop every model built by the old one"""
+        with self._lock:
+            self._factory = factory
+            self._models.clear()
+
+    def clear(self) -> None:
+        """Drop all pooled models and reset counters"""
+        with self._lock:
+            self._models.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Registry size and hit/miss counters for monitoring"""
+        total = self.hits + self.misses
+        return {
+            "models": len(self._models),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
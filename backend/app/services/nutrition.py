@@ -0,0 +1,267 @@
+"""
+Nutrition
+Local calorie and macro computation from parsed recipe ingredients and a bundled nutrient table
+"""
+import csv
+import logging
+import os
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.models.recipe import NutritionFacts, Recipe
+from app.services.ingredient_parser import IngredientParser, get_parser
+
+logger = logging.getLogger(__name__)
+
+NUTRITION_TABLE_PATH = os.getenv(
+    "NUTRITION_TABLE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resources", "nutrients.csv")
+)
+# Servings assumed when a recipe doesn't state them
+NUTRITION_DEFAULT_SERVINGS = int(os.getenv("NUTRITION_DEFAULT_SERVINGS", "2"))
+# "off", "validate" (log disagreements) or "override" (replace the model's calories)
+NUTRITION_MODE = os.getenv("NUTRITION_MODE", "validate")
+# Share of ingredient lines that must be resolved before the computed value is trusted
+NUTRITION_MIN_COVERAGE = float(os.getenv("NUTRITION_MIN_COVERAGE", "0.8"))
+# Relative difference at which validate mode reports a disagreement
+NUTRITION_TOLERANCE = float(os.getenv("NUTRITION_TOLERANCE", "0.35"))
+
+# Columns of NutrientTable.values, per 100 g
+KCAL, PROTEIN, FAT, CARBS = range(4)
+
+_PIECE, _MASS, _VOLUME, _COUNT = range(4)
+
+# Canonical unit -> (kind, factor): grams for mass, ml for volume, grams per
+# unit for fixed-weight counts. Piece units use the ingredient's own weight.
+_UNITS: Dict[Optional[str], tuple] = {
+    None: (_PIECE, 1.0),
+    "piece": (_PIECE, 1.0),
+    "head": (_PIECE, 1.0),
+    "clove": (_PIECE, 1.0),
+    "g": (_MASS, 1.0),
+    "kg": (_MASS, 1000.0),
+    "oz": (_MASS, 28.35),
+    "lb": (_MASS, 453.6),
+    "ml": (_VOLUME, 1.0),
+    "l": (_VOLUME, 1000.0),
+    "tsp": (_VOLUME, 4.93),
+    "tbsp": (_VOLUME, 14.79),
+    "cup": (_VOLUME, 236.6),
+    "pint": (_VOLUME, 473.2),
+    "quart": (_VOLUME, 946.4),
+    "pinch": (_COUNT, 0.4),
+    "dash": (_COUNT, 0.6),
+    "can": (_COUNT, 400.0),
+    "slice": (_COUNT, 25.0),
+    "bunch": (_COUNT, 100.0),
+    "handful": (_COUNT, 30.0),
+    "stalk": (_COUNT, 40.0),
+    "sprig": (_COUNT, 1.0),
+    "stick": (_COUNT, 113.0),
+    "package": (_COUNT, 400.0),
+}
+# Lines that are a trace by nature when they carry no amount ("salt to taste")
+_TRACE_NAMES = frozenset({"salt", "black pepper", "water"})
+_TRACE_PHRASES = ("to taste", "pinch", "dash", "for garnish", "for serving")
+
+_UNIT_CODES = {unit: code for code, unit in enumerate(_UNITS)}
+_UNIT_KIND = np.array([kind for kind, _ in _UNITS.values()], dtype=np.int8)
+_UNIT_FACTOR = np.array([factor for _, factor in _UNITS.values()], dtype=np.float64)
+
+
+class NutrientTable:
+    """
+    Nutrient values as NumPy arrays, one row per canonical ingredient
+
+    `values` is an (n, 4) float64 matrix of kcal / protein / fat / carbs per
+    100 g; `piece_g` and `density` hold NaN where unknown.
+    """
+
+    def __init__(self, names: Sequence[str], values: np.ndarray, piece_g: np.ndarray, density: np.ndarray):
+        self.names = tuple(names)
+        self.index = {name: row for row, name in enumerate(self.names)}
+        self.values = values
+        self.piece_g = piece_g
+        self.density = density
+
+    @classmethod
+    def from_csv(cls, path: str) -> "NutrientTable":
+        with open(path, encoding="utf-8") as f:
+            rows = list(csv.DictReader(line for line in f if not line.startswith("#")))
+
+        def column(name: str) -> np.ndarray:
+            return np.array([float(row[name]) if row[name] else np.nan for row in rows], dtype=np.float64)
+
+        values = np.stack([column("kcal"), column("protein"), column("fat"), column("carbs")], axis=1)
+        return cls([row["name"] for row in rows], values, column("piece_g"), column("density"))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+class NutritionCalculator:
+    """
+    Per-serving calories and macros for recipes, computed locally
+
+    Ingredient lines are parsed (quantity, unit, canonical name) and looked
+    up in the nutrient table. Unit conversion and the per-recipe sums run as
+    NumPy array operations over every line of every recipe in the batch, so
+    a batch costs one pass regardless of how many recipes it holds.
+    Lines without an amount count as resolved with 0 g only when they are
+    a trace ("salt to taste", "pinch of nutmeg"); other amountless lines
+    ("chicken breast") count as one piece, or stay unresolved when the
+    ingredient has no piece weight.
+    """
+
+    def __init__(
+        self,
+        table: NutrientTable,
+        parser: IngredientParser,
+        default_servings: int = NUTRITION_DEFAULT_SERVINGS,
+    ):
+        self.table = table
+        self.parser = parser
+        self.default_servings = default_servings
+        self.checked = 0
+        self.disagreements = 0
+        self.overridden = 0
+
+    def compute(self, recipe: Recipe) -> NutritionFacts:
+        return self.compute_batch([recipe])[0]
+
+    def compute_batch(self, recipes: Sequence[Recipe]) -> List[NutritionFacts]:
+        """
+        Nutrition facts for many recipes in one vectorized pass
+
+        Args:
+            recipes: Recipes whose `ingredients` lines carry amounts
+
+        Returns:
+            One NutritionFacts per recipe, in order
+        """
+        recipe_idx, rows, unit_codes, quantities, lines = [], [], [], [], []
+        for i, recipe in enumerate(recipes):
+            for line in recipe.ingredients:
+                parsed = self.parser.parse(line)
+                recipe_idx.append(i)
+                rows.append(self.table.index.get(parsed.name, -1))
+                unit_codes.append(_UNIT_CODES.get(parsed.unit, -1))
+                quantity = parsed.quantity
+                if quantity is None:
+                    # NaN marks a 0 g trace; anything else counts as one item
+                    quantity = np.nan if self._is_trace(line, parsed.name) else 1.0
+                quantities.append(quantity)
+                lines.append(line)
+
+        n = len(recipes)
+        recipe_idx = np.array(recipe_idx, dtype=np.intp)
+        rows = np.array(rows, dtype=np.intp)
+        unit_codes = np.array(unit_codes, dtype=np.intp)
+        quantities = np.array(quantities, dtype=np.float64)
+
+        known = (rows >= 0) & (unit_codes >= 0)
+        safe_rows = np.where(known, rows, 0)
+        safe_units = np.where(known, unit_codes, 0)
+        kind = _UNIT_KIND[safe_units]
+        factor = _UNIT_FACTOR[safe_units]
+        grams_per_unit = np.select(
+            [kind == _MASS, kind == _VOLUME, kind == _COUNT],
+            [factor, factor * self.table.density[safe_rows], factor],
+            default=self.table.piece_g[safe_rows],
+        )
+        trace = np.isnan(quantities)
+        resolved = known & (trace | ~np.isnan(grams_per_unit))
+        grams = np.where(resolved & ~trace, quantities * grams_per_unit, 0.0)
+        # NaN * 0 is NaN: zero unresolved lines explicitly
+        grams = np.nan_to_num(grams, nan=0.0)
+
+        per_line = self.table.values[safe_rows] * (grams / 100.0)[:, None]
+        totals = np.stack(
+            [np.bincount(recipe_idx, weights=per_line[:, c], minlength=n) for c in range(per_line.shape[1])],
+            axis=1
+        )
+        line_counts = np.bincount(recipe_idx, minlength=n)
+        resolved_counts = np.bincount(recipe_idx, weights=resolved, minlength=n)
+
+        unmatched: List[List[str]] = [[] for _ in range(n)]
+        for line_no in np.flatnonzero(~resolved):
+            unmatched[recipe_idx[line_no]].append(lines[line_no])
+
+        facts = []
+        for i, recipe in enumerate(recipes):
+            servings = recipe.servings or self.default_servings
+            per_serving = totals[i] / servings
+            facts.append(NutritionFacts(
+                servings=servings,
+                calories=int(round(per_serving[KCAL])),
+                protein=round(float(per_serving[PROTEIN]), 1),
+                fat=round(float(per_serving[FAT]), 1),
+                carbs=round(float(per_serving[CARBS]), 1),
+                totalCalories=int(round(totals[i, KCAL])),
+                coverage=round(float(resolved_counts[i] / line_counts[i]), 4) if line_counts[i] else 0.0,
+                unmatched=unmatched[i],
+            ))
+        return facts
+
+    @staticmethod
+    def _is_trace(line: str, name: str) -> bool:
+        lowered = line.lower()
+        return name in _TRACE_NAMES or any(phrase in lowered for phrase in _TRACE_PHRASES)
+
+    def reconcile(
+        self,
+        recipe: Recipe,
+        mode: str = NUTRITION_MODE,
+        min_coverage: float = NUTRITION_MIN_COVERAGE,
+        tolerance: float = NUTRITION_TOLERANCE,
+    ) -> Recipe:
+        """
+        Check the model's calorie estimate against the computed one
+
+        Args:
+            recipe: Freshly generated recipe
+            mode: "off", "validate" (count and log disagreements) or "override"
+            min_coverage: Below this share of resolved lines the recipe is left alone
+            tolerance: Relative difference counted as a disagreement
+
+        Returns:
+            The recipe, with `calories` replaced in override mode
+        """
+        if mode == "off":
+            return recipe
+        facts = self.compute(recipe)
+        if facts.coverage < min_coverage:
+            return recipe
+        self.checked += 1
+        if abs(facts.calories - recipe.calories) > tolerance * max(facts.calories, 1):
+            self.disagreements += 1
+            logger.info(
+                f"[nutrition] '{recipe.title}': model says {recipe.calories} kcal/serving, "
+                f"computed {facts.calories} (coverage {facts.coverage:.0%})"
+            )
+        if mode == "override" and facts.calories != recipe.calories:
+            self.overridden += 1
+            return recipe.model_copy(update={"calories": facts.calories})
+        return recipe
+
+    def reset(self) -> None:
+        self.checked = 0
+        self.disagreements = 0
+        self.overridden = 0
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "mode": NUTRITION_MODE,
+            "ingredients": len(self.table),
+            "checked": self.checked,
+            "disagreements": self.disagreements,
+            "overridden": self.overridden,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_nutrition_calculator() -> NutritionCalculator:
+    """Calculator over the bundled nutrient table (NUTRITION_TABLE_PATH), loaded on first use"""
+    return NutritionCalculator(NutrientTable.from_csv(NUTRITION_TABLE_PATH), get_parser())
@@ -0,0 +1,327 @@
+"""
+Outbound Rate Limiter
+Token buckets for request and token quotas with a priority admission queue
+"""
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from app.services.resilience import UpstreamUnavailableError
+
+# Gemini key quota; 0 disables the corresponding bucket
+GEMINI_RPM = float(os.getenv("GEMINI_RPM", "0"))
+GEMINI_TPM = float(os.getenv("GEMINI_TPM", "0"))
+# Longest a call may queue for quota before failing with 503
+GEMINI_QUEUE_TIMEOUT = float(os.getenv("GEMINI_QUEUE_TIMEOUT", "30"))
+
+# Lower value = admitted first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+PRIORITY_BACKGROUND = 2
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_BATCH: "batch",
+    PRIORITY_BACKGROUND: "background",
+}
+
+
+class RateLimitedError(UpstreamUnavailableError):
+    """A call waited longer than the queue timeout for outbound quota"""
+
+    retryable = False
+
+
+class TokenBucket:
+    """
+    Classic token bucket
+
+    Holds up to `capacity` tokens and refills at `rate` tokens/second.
+    A rate of 0 means unlimited. A request larger than the bucket waits
+    for a full bucket, is then charged its whole amount, and leaves the
+    bucket in debt: later requests wait until the debt has refilled, so
+    over any period at most `capacity + rate * seconds` tokens go out.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate <= 0
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def available(self) -> float:
+        if self.unlimited:
+            return float("inf")
+        self._refill()
+        return self._tokens
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if now)"""
+        if self.unlimited:
+            return 0.0
+        self._refill()
+        # Requests larger than the bucket only wait for a full bucket (debt included)
+        amount = min(amount, self.capacity)
+        # Tolerance so a waiter woken exactly on time isn't rescheduled by float rounding
+        if self._tokens + 1e-9 >= amount:
+            return 0.0
+        return (amount - self._tokens) / self.rate
+
+    def consume(self, amount: float) -> None:
+        if not self.unlimited:
+            self._refill()
+            # The full amount, possibly going negative; never just the capacity
+            self._tokens -= amount
+
+
+class QuotaWindow:
+    """
+    Sliding-window cap: at most `limit` admitted in any `window` seconds
+
+    The token bucket paces calls but lets its burst (and a large call's
+    debt) put up to one call over the quota within a fixed minute; the
+    provider counts per minute, so this window enforces the hard limit.
+    A limit of 0 means unlimited; a single request above the limit waits
+    for an empty window.
+    """
+
+    def __init__(self, limit: float, window: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        self.limit = limit
+        self.window = window
+        self._clock = clock
+        self._entries: Deque[Tuple[float, float]] = deque()
+        self._total = 0.0
+
+    def _expire(self, now: float) -> None:
+        # Same float tolerance as TokenBucket.wait_time
+        while self._entries and self._entries[0][0] + self.window <= now + 1e-9:
+            _, amount = self._entries.popleft()
+            self._total -= amount
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` fits in the window (0 if now)"""
+        if self.limit <= 0:
+            return 0.0
+        now = self._clock()
+        self._expire(now)
+        excess = self._total + min(amount, self.limit) - self.limit
+        freed, wait = 0.0, 0.0
+        # The oldest entries expire first; wait until enough of them have
+        for admitted_at, spent in self._entries:
+            if freed >= excess:
+                break
+            freed += spent
+            wait = admitted_at + self.window - now
+        return max(0.0, wait)
+
+    def consume(self, amount: float) -> None:
+        if self.limit > 0:
+            self._entries.append((self._clock(), amount))
+            self._total += amount
+
+
+class _Waiter:
+    __slots__ = ("priority", "tokens", "future", "enqueued", "group")
+
+    def __init__(
+        self, priority: int, tokens: float, future: asyncio.Future, enqueued: float, group: Optional[str] = None
+    ):
+        self.priority = priority
+        self.tokens = tokens
+        self.future = future
+        self.enqueued = enqueued
+        self.group = group
+
+
+class AdmissionController:
+    """
+    Admits outbound LLM calls within request/token quotas, by priority
+
+    Calls are admitted in (priority, arrival) order: while a higher
+    priority call is waiting for quota, lower priority calls queue behind
+    it, so interactive requests jump ahead of batch/background work. The
+    queue is drained by a timer scheduled for when the head can proceed;
+    no background task is needed. A queued call can be promoted when a
+    more urgent caller starts waiting on its result (`promote`).
+
+    Args:
+        requests_per_minute: Request quota (0 = unlimited)
+        tokens_per_minute: Estimated-token quota (0 = unlimited)
+        queue_timeout: Max seconds a call may wait before RateLimitedError
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = GEMINI_RPM,
+        tokens_per_minute: float = GEMINI_TPM,
+        queue_timeout: float = GEMINI_QUEUE_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.queue_timeout = queue_timeout
+        self._clock = clock
+        self._configure(requests_per_minute, tokens_per_minute)
+        self._queue: List[tuple] = []
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._stats: Dict[int, Dict[str, float]] = {}
+
+    def configure(self, requests_per_minute: float, tokens_per_minute: float) -> None:
+        """Replace the quotas (e.g. after a plan change); queued calls keep their place"""
+        self._configure(requests_per_minute, tokens_per_minute)
+
+    def _configure(self, requests_per_minute: float, tokens_per_minute: float) -> None:
+        clock = self._clock
+        # Buckets pace calls through the minute; windows hold every minute to the quota
+        self._requests = TokenBucket(requests_per_minute / 60, max(1.0, requests_per_minute / 60), clock)
+        self._tokens = TokenBucket(tokens_per_minute / 60, tokens_per_minute / 60, clock)
+        self._request_window = QuotaWindow(requests_per_minute, clock=clock)
+        self._token_window = QuotaWindow(tokens_per_minute, clock=clock)
+
+    async def acquire(
+        self,
+        tokens: float = 0,
+        priority: int = PRIORITY_INTERACTIVE,
+        group: Optional[str] = None
+    ) -> float:
+        """
+        Wait until the call fits the quotas
+
+        Args:
+            tokens: Estimated tokens the call will consume
+            priority: PRIORITY_INTERACTIVE, PRIORITY_BATCH or PRIORITY_BACKGROUND
+            group: Name `promote` can refer to (e.g. the single-flight key)
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            RateLimitedError: If not admitted within `queue_timeout`
+        """
+        enqueued = self._clock()
+        stats = self._priority_stats(priority)
+
+        if not self._queue and self._fits(tokens):
+            self._admit(tokens, stats, 0.0)
+            return 0.0
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = _Waiter(priority, tokens, future, enqueued, group)
+        heapq.heappush(self._queue, (priority, next(self._sequence), waiter))
+        self._drain()
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            stats["timeouts"] += 1
+            raise RateLimitedError(
+                f"Outbound Gemini quota exhausted; waited {self.queue_timeout:.0f}s",
+                retry_after=self._next_wait(tokens)
+            )
+        finally:
+            if not future.done():
+                # Timed out or cancelled: give up our place in the queue
+                future.cancel()
+                self._drain()
+
+    def promote(self, group: str, priority: int) -> None:
+        """Move queued calls of `group` up to `priority` if that is more urgent"""
+        promoted = False
+        for i, (queued, sequence, waiter) in enumerate(self._queue):
+            if waiter.group == group and priority < queued and not waiter.future.done():
+                waiter.priority = priority
+                self._queue[i] = (priority, sequence, waiter)
+                promoted = True
+        if promoted:
+            heapq.heapify(self._queue)
+            self._drain()
+
+    def _fits(self, tokens: float) -> bool:
+        return self._next_wait(tokens) == 0
+
+    def _next_wait(self, tokens: float) -> float:
+        return max(
+            self._requests.wait_time(1),
+            self._tokens.wait_time(tokens),
+            self._request_window.wait_time(1),
+            self._token_window.wait_time(tokens),
+        )
+
+    def _admit(self, tokens: float, stats: Dict[str, float], waited: float) -> None:
+        self._requests.consume(1)
+        self._tokens.consume(tokens)
+        self._request_window.consume(1)
+        self._token_window.consume(tokens)
+        stats["admitted"] += 1
+        stats["wait_total"] += waited
+        stats["wait_max"] = max(stats["wait_max"], waited)
+
+    def _drain(self) -> None:
+        """Admit queued calls from the head while quota allows; re-arm the timer"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._queue:
+            _, _, waiter = self._queue[0]
+            if waiter.future.done():
+                heapq.heappop(self._queue)
+                continue
+            wait = self._next_wait(waiter.tokens)
+            if wait > 0:
+                loop = waiter.future.get_loop()
+                self._timer = loop.call_later(wait, self._drain)
+                return
+            heapq.heappop(self._queue)
+            waited = self._clock() - waiter.enqueued
+            self._admit(waiter.tokens, self._priority_stats(waiter.priority), waited)
+            waiter.future.set_result(waited)
+
+    def _priority_stats(self, priority: int) -> Dict[str, float]:
+        stats = self._stats.get(priority)
+        if stats is None:
+            stats = {"admitted": 0, "timeouts": 0, "wait_total": 0.0, "wait_max": 0.0}
+            self._stats[priority] = stats
+        return stats
+
+    def quota(self) -> Dict[str, float]:
+        """Current per-minute quotas (0 = unlimited)"""
+        return {"rpm": round(self._requests.rate * 60, 3), "tpm": round(self._tokens.rate * 60, 3)}
+
+    def reset(self) -> None:
+        """Drop counters (queued calls are left alone)"""
+        self._stats.clear()
+
+    def stats(self) -> Dict[str, object]:
+        """Queue depth, per-priority admissions and wait times, bucket levels"""
+        depth: Dict[str, int] = {}
+        for priority, _, waiter in self._queue:
+            if not waiter.future.done():
+                name = PRIORITY_NAMES.get(priority, str(priority))
+                depth[name] = depth.get(name, 0) + 1
+        by_priority = {}
+        for priority, stats in sorted(self._stats.items()):
+            admitted = stats["admitted"]
+            by_priority[PRIORITY_NAMES.get(priority, str(priority))] = {
+                "admitted": int(admitted),
+                "timeouts": int(stats["timeouts"]),
+                "avg_wait_ms": round(stats["wait_total"] / admitted * 1000, 2) if admitted else 0.0,
+                "max_wait_ms": round(stats["wait_max"] * 1000, 2),
+            }
+        return {
+            "queue_depth": sum(depth.values()),
+            "queue_depth_by_priority": depth,
+            "priorities": by_priority,
+            "requests_available": None if self._requests.unlimited else round(self._requests.available(), 2),
+            "tokens_available": None if self._tokens.unlimited else round(self._tokens.available(), 2),
+        }
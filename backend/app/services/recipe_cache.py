@@ -0,0 +1,113 @@
+"""
+Recipe Cache
+Content-addressed in-memory cache of generated recipes, keyed by normalized ingredient set
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.models.recipe import Recipe
+from app.services.ingredient_parser import canonical_name
+
+RECIPE_CACHE_TTL = float(os.getenv("RECIPE_CACHE_TTL", "3600"))
+RECIPE_CACHE_MAX_SIZE = int(os.getenv("RECIPE_CACHE_MAX_SIZE", "1024"))
+RECIPE_CACHE_HEADERS = os.getenv("RECIPE_CACHE_HEADERS", "1") not in ("0", "false", "False")
+
+
+def normalize_ingredient(name: str) -> str:
+    """Canonical ingredient name: quantities, units and prep words dropped, aliases resolved"""
+    return canonical_name(name)
+
+
+def normalize_ingredients(ingredients: Iterable[str]) -> List[str]:
+    """
+    Canonical form of a user's ingredient list
+
+    Entries may themselves be comma-separated ("Chicken, basil"); the result
+    is deduplicated and sorted so ordering and casing don't matter.
+    """
+    names = set()
+    for entry in ingredients:
+        for part in entry.split(","):
+            name = normalize_ingredient(part)
+            if name:
+                names.add(name)
+    return sorted(names)
+
+
+def ingredient_key(ingredients: Iterable[str]) -> str:
+    """Stable content hash of the normalized ingredient set"""
+    canonical = "\n".join(normalize_ingredients(ingredients))
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+class RecipeCache:
+    """
+    LRU cache with per-entry TTL
+
+    Entries expire `ttl` seconds after insertion; once `max_size` is
+    reached the least recently used entry is evicted.
+    """
+
+    def __init__(self, max_size: int = RECIPE_CACHE_MAX_SIZE, ttl: float = RECIPE_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Recipe]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Recipe]:
+        """Return the cached recipe for `key`, or None if absent/expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, recipe = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return recipe
+
+    def put(self, key: str, recipe: Recipe) -> None:
+        """Insert or refresh `key`, evicting the LRU entry when full"""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, recipe)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all entries and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, float]:
+        """Cache size and hit/miss/eviction counters for monitoring"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
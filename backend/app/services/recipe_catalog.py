@@ -0,0 +1,215 @@
+"""
+Recipe Catalog
+Memory-mapped file of pre-generated recipes for popular ingredient sets, plus the demand log it is mined from
+"""
+import json
+import logging
+import logging.handlers
+import mmap
+import os
+import queue
+import struct
+import time
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from app.models.recipe import Recipe
+from app.services.recipe_cache import ingredient_key, normalize_ingredients
+
+_DATA_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "data"
+)
+
+# Missing file = no catalog; empty string disables it
+RECIPE_CATALOG_PATH = os.getenv("RECIPE_CATALOG_PATH", os.path.join(_DATA_DIR, "catalog.bin"))
+# JSON-lines log of requested ingredient sets for `scripts.build_catalog`; empty disables it
+RECIPE_REQUEST_LOG = os.getenv("RECIPE_REQUEST_LOG", "")
+
+# magic, entry count, reserved
+_HEADER = struct.Struct("<8sII")
+_MAGIC = b"CHEFCAT1"
+_KEY_SIZE = 20
+
+request_log = logging.getLogger("cheftai.requests")
+# Writes queued request records to the log file on its own thread, off the event loop
+_request_log_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class RecipeCatalog:
+    """
+    Read-only recipe catalog backed by a memory-mapped file
+
+    Layout (little endian):
+
+        header   8s magic, u32 count, u32 reserved
+        keys     count x 20-byte SHA-1 ingredient keys, sorted
+        offsets  (count + 1) x u64 byte offsets into the blob
+        blob     compact recipe JSON, back to back
+
+    Lookups binary-search the key array in place and decode one recipe;
+    nothing is read into memory up front, so opening is O(1) and pages
+    are shared between worker processes by the OS.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, _ = _HEADER.unpack_from(self._mmap, 0)
+        if magic != _MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a recipe catalog")
+        self._count = count
+        self._keys_at = _HEADER.size
+        self._offsets_at = self._keys_at + count * _KEY_SIZE
+        self._blob_at = self._offsets_at + (count + 1) * 8
+        self._keys = np.frombuffer(self._mmap, dtype=f"S{_KEY_SIZE}", count=count, offset=self._keys_at)
+        self._offsets = np.frombuffer(self._mmap, dtype="<u8", count=count + 1, offset=self._offsets_at)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _find(self, key: str) -> int:
+        digest = bytes.fromhex(key)
+        i = int(np.searchsorted(self._keys, digest))
+        if i < self._count:
+            start = self._keys_at + i * _KEY_SIZE
+            if self._mmap[start:start + _KEY_SIZE] == digest:
+                return i
+        return -1
+
+    def _recipe(self, i: int) -> Recipe:
+        start = self._blob_at + int(self._offsets[i])
+        end = self._blob_at + int(self._offsets[i + 1])
+        return Recipe.model_validate_json(self._mmap[start:end])
+
+    def get(self, key: str) -> Optional[Recipe]:
+        """Catalog recipe for an ingredient key (see recipe_cache.ingredient_key), or None"""
+        i = self._find(key)
+        if i < 0:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._recipe(i)
+
+    def __contains__(self, key: str) -> bool:
+        return self._find(key) >= 0
+
+    def items(self) -> Iterator[Tuple[str, Recipe]]:
+        for i in range(self._count):
+            start = self._keys_at + i * _KEY_SIZE
+            yield self._mmap[start:start + _KEY_SIZE].hex(), self._recipe(i)
+
+    def close(self) -> None:
+        # Drop the array views first; an mmap with exported buffers can't close
+        self._keys = self._offsets = None
+        self._mmap.close()
+
+    def stats(self) -> Dict[str, int]:
+        return {"recipes": self._count, "hits": self.hits, "misses": self.misses}
+
+
+def write_catalog(path: str, entries: Mapping[str, Recipe]) -> int:
+    """
+    Write a catalog file atomically (readers keep their old mapping)
+
+    Args:
+        path: Destination file
+        entries: Ingredient key (hex SHA-1) -> recipe
+
+    Returns:
+        Number of recipes written
+    """
+    items = sorted((bytes.fromhex(key), recipe) for key, recipe in entries.items())
+    blobs = [recipe.model_dump_json(exclude_none=True).encode("utf-8") for _, recipe in items]
+    offsets = np.zeros(len(blobs) + 1, dtype="<u8")
+    np.cumsum([len(blob) for blob in blobs], out=offsets[1:])
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, len(items), 0))
+        f.write(b"".join(digest for digest, _ in items))
+        f.write(offsets.tobytes())
+        f.write(b"".join(blobs))
+    os.replace(tmp_path, path)
+    return len(items)
+
+
+def configure_request_log(path: str = RECIPE_REQUEST_LOG) -> None:
+    """
+    Append requested ingredient sets to `path` (no-op if empty or already configured)
+
+    Request handlers only enqueue the record (QueueHandler); a
+    QueueListener thread does the file writes.
+    """
+    global _request_log_listener
+    if not path or request_log.handlers:
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    handler = logging.FileHandler(path, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    _request_log_listener = logging.handlers.QueueListener(records, handler)
+    _request_log_listener.start()
+    request_log.addHandler(logging.handlers.QueueHandler(records))
+    request_log.setLevel(logging.INFO)
+    request_log.propagate = False
+
+
+def close_request_log() -> None:
+    """Flush queued records and close the request log (called from the FastAPI lifespan)"""
+    global _request_log_listener
+    for handler in list(request_log.handlers):
+        request_log.removeHandler(handler)
+        handler.close()
+    if _request_log_listener is not None:
+        # Drains the queue before returning
+        _request_log_listener.stop()
+        for handler in _request_log_listener.handlers:
+            handler.close()
+        _request_log_listener = None
+
+
+def log_ingredient_request(ingredients: Iterable[str]) -> None:
+    """Record one requested ingredient set for catalog mining"""
+    if request_log.handlers:
+        request_log.info(json.dumps({"ts": round(time.time(), 3), "ingredients": normalize_ingredients(ingredients)}))
+
+
+def mine_popular_sets(
+    lines: Iterable[str],
+    top: int = 300,
+    min_count: int = 2
+) -> List[Tuple[List[str], int]]:
+    """
+    Most requested ingredient sets in a JSON-lines request log
+
+    Any line with an "ingredients" list counts; other lines are skipped.
+    Sets are normalized, so ordering, casing and aliases don't split counts.
+
+    Returns:
+        [(normalized ingredients, request count)], most requested first
+    """
+    counts: Counter = Counter()
+    names: Dict[str, List[str]] = {}
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        ingredients = record.get("ingredients") if isinstance(record, dict) else None
+        if not isinstance(ingredients, list) or not all(isinstance(i, str) for i in ingredients):
+            continue
+        normalized = normalize_ingredients(ingredients)
+        if not normalized:
+            continue
+        key = ingredient_key(normalized)
+        counts[key] += 1
+        names.setdefault(key, normalized)
+    return [(names[key], count) for key, count in counts.most_common(top) if count >= min_count]
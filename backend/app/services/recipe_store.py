@@ -0,0 +1,213 @@
+"""
+Recipe Store
+SQLite-backed (WAL mode) persistence for generated recipes
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.models.recipe import Recipe, StoredRecipe
+
+_DEFAULT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "data",
+    "recipes.db"
+)
+
+# Empty string disables persistence; ":memory:" keeps it in-process
+RECIPE_STORE_PATH = os.getenv("RECIPE_STORE_PATH", _DEFAULT_PATH)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS recipes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ingredient_key TEXT NOT NULL,
+    ingredients TEXT NOT NULL,
+    recipe TEXT NOT NULL,
+    model_name TEXT,
+    latency_ms REAL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_recipes_key ON recipes (ingredient_key);
+CREATE TABLE IF NOT EXISTS recipe_ingredients (
+    ingredient TEXT NOT NULL,
+    recipe_id INTEGER NOT NULL REFERENCES recipes (id),
+    PRIMARY KEY (ingredient, recipe_id)
+) WITHOUT ROWID;
+"""
+
+_COLUMNS = "id, ingredients, recipe, model_name, latency_ms, created_at"
+
+
+class RecipeStore:
+    """
+    Durable recipe log
+
+    Each row keeps the generated recipe with its normalized ingredient key,
+    the model that produced it and how long generation took. A side table
+    maps each normalized ingredient to recipe ids for ingredient queries.
+    """
+
+    def __init__(self, path: str = RECIPE_STORE_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def save(
+        self,
+        ingredient_key: str,
+        ingredients: Iterable[str],
+        recipe: Recipe,
+        model_name: Optional[str] = None,
+        latency_ms: Optional[float] = None,
+    ) -> int:
+        """
+        Persist a generated recipe
+
+        Args:
+            ingredient_key: Content hash of the normalized ingredient set
+            ingredients: Normalized ingredient names
+            recipe: Validated recipe
+            model_name: Model that generated it
+            latency_ms: Generation time in milliseconds
+
+        Returns:
+            The new recipe id
+        """
+        ingredients = list(ingredients)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                cursor = self._conn.execute(
+                    "INSERT INTO recipes (ingredient_key, ingredients, recipe, model_name, latency_ms, created_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        ingredient_key,
+                        json.dumps(ingredients),
+                        recipe.model_dump_json(),
+                        model_name,
+                        latency_ms,
+                        time.time(),
+                    )
+                )
+                recipe_id = cursor.lastrowid
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO recipe_ingredients (ingredient, recipe_id) VALUES (?, ?)",
+                    [(name, recipe_id) for name in ingredients]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return recipe_id
+
+    def get(self, recipe_id: int) -> Optional[StoredRecipe]:
+        """Fetch one stored recipe by id"""
+        rows = self._query(f"SELECT {_COLUMNS} FROM recipes WHERE id = ?", (recipe_id,))
+        return rows[0] if rows else None
+
+    def find_by_key(self, ingredient_key: str) -> Optional[Recipe]:
+        """Most recent recipe generated for this normalized ingredient set"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT recipe FROM recipes WHERE ingredient_key = ? ORDER BY id DESC LIMIT 1",
+                (ingredient_key,)
+            ).fetchone()
+        return Recipe.model_validate_json(row[0]) if row else None
+
+    def recent(self, limit: int = 100) -> List[StoredRecipe]:
+        """Most recently stored recipes, newest first"""
+        return self._query(
+            f"SELECT {_COLUMNS} FROM recipes ORDER BY id DESC LIMIT ?", (limit,)
+        )
+
+    def recent_entries(self, limit: int = 100) -> List[tuple]:
+        """(ingredient_key, normalized ingredients, recipe) for warming caches, newest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT ingredient_key, ingredients, recipe FROM recipes ORDER BY id DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [
+            (key, json.loads(ingredients), Recipe.model_validate_json(recipe))
+            for key, ingredients, recipe in rows
+        ]
+
+    def get_many(self, recipe_ids: Iterable[int]) -> Dict[int, StoredRecipe]:
+        """Fetch stored recipes by id (missing ids are left out)"""
+        ids = list(recipe_ids)
+        if not ids:
+            return {}
+        placeholders = ", ".join("?" for _ in ids)
+        rows = self._query(f"SELECT {_COLUMNS} FROM recipes WHERE id IN ({placeholders})", tuple(ids))
+        return {recipe.id: recipe for recipe in rows}
+
+    def ingredient_lines(self, batch_size: int = 5000) -> Iterator[Tuple[int, List[str]]]:
+        """(recipe id, recipe ingredient lines) for every stored recipe, oldest first"""
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, recipe FROM recipes WHERE id > ? ORDER BY id LIMIT ?", (last_id, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for recipe_id, recipe in rows:
+                yield recipe_id, json.loads(recipe).get("ingredients", [])
+            last_id = rows[-1][0]
+
+    def search(self, ingredients: Iterable[str], limit: int = 20, offset: int = 0) -> List[StoredRecipe]:
+        """
+        Stored recipes whose source ingredients include every given name
+
+        Args:
+            ingredients: Normalized ingredient names (all must match)
+            limit: Max results
+            offset: Results to skip
+
+        Returns:
+            Matching recipes, newest first
+        """
+        names = sorted(set(ingredients))
+        if not names:
+            return self._query(
+                f"SELECT {_COLUMNS} FROM recipes ORDER BY id DESC LIMIT ? OFFSET ?", (limit, offset)
+            )
+        placeholders = ", ".join("?" for _ in names)
+        return self._query(
+            f"SELECT {_COLUMNS} FROM recipes WHERE id IN ("
+            f" SELECT recipe_id FROM recipe_ingredients WHERE ingredient IN ({placeholders})"
+            f" GROUP BY recipe_id HAVING COUNT(*) = ?"
+            f") ORDER BY id DESC LIMIT ? OFFSET ?",
+            (*names, len(names), limit, offset)
+        )
+
+    def count(self) -> int:
+        """Number of stored recipes"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM recipes").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _query(self, sql: str, params: tuple) -> List[StoredRecipe]:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            StoredRecipe(
+                **json.loads(recipe),
+                id=recipe_id,
+                sourceIngredients=json.loads(ingredients),
+                model=model_name,
+                latencyMs=latency_ms,
+                createdAt=created_at
+            )
+            for recipe_id, ingredients, recipe, model_name, latency_ms, created_at in rows
+        ]
@@ -0,0 +1,110 @@
+"""
+Recipe Stream Assembler
+Turns streamed Gemini JSON text into incremental, validated recipe events
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+
+from app.models.recipe import Recipe
+from app.services.json_stream import IncrementalJSONParser, JSONStreamError, ParseEvent
+
+# (event name, payload) pairs, serialized as Server-Sent Events by the route
+RecipeEvent = Tuple[str, Dict[str, Any]]
+
+SCALAR_FIELDS = ("title", "description", "cookTime", "difficulty", "calories", "servings")
+LIST_EVENTS = {"ingredients": "ingredient", "instructions": "instruction"}
+
+_FIELD_ADAPTERS = {name: TypeAdapter(Recipe.model_fields[name].annotation) for name in SCALAR_FIELDS}
+_ITEM_ADAPTER = TypeAdapter(str)
+
+
+class RecipeStreamAssembler:
+    """
+    Feeds streamed text to an incremental JSON parser and turns completed
+    values into recipe events
+
+    A scalar field is emitted as a `field` event as soon as its value
+    closes; list items as `ingredient` / `instruction` events as soon as
+    each item's string closes. Values that fail validation against the
+    Recipe model are skipped here and reported by `finish()`, which
+    validates the whole recipe.
+    """
+
+    def __init__(self):
+        # Top-level fields (depth 1) and list items (depth 2) are all we report
+        self._parser = IncrementalJSONParser(max_depth=2)
+
+    def feed(self, chunk: str) -> List[RecipeEvent]:
+        """Add a chunk of model output and return newly completed events"""
+        try:
+            parsed = self._parser.feed(chunk)
+        except JSONStreamError as e:
+            raise ValueError(f"Failed to parse Gemini API response: {e}")
+        return _to_events(parsed)
+
+    def finish(self) -> Tuple[List[RecipeEvent], Recipe]:
+        """
+        Complete the document
+
+        Returns:
+            (remaining events, validated Recipe)
+
+        Raises:
+            ValueError: If the output is not a valid recipe
+        """
+        try:
+            data = self._parser.finish()
+        except JSONStreamError as e:
+            raise ValueError(f"Failed to parse Gemini API response: {e}")
+        if not isinstance(data, dict):
+            raise ValueError("Gemini API response is not a JSON object")
+        try:
+            return [], Recipe(**data)
+        except ValidationError as e:
+            raise ValueError(f"Invalid recipe from Gemini API: {e}")
+
+
+def _to_events(parsed: List[ParseEvent]) -> List[RecipeEvent]:
+    events: List[RecipeEvent] = []
+    for path, value in parsed:
+        if len(path) == 1 and path[0] in _FIELD_ADAPTERS:
+            event = _field_event(path[0], value)
+        elif len(path) == 2 and path[0] in LIST_EVENTS:
+            event = _item_event(path[0], path[1], value)
+        else:
+            continue
+        if event is not None:
+            events.append(event)
+    return events
+
+
+def _field_event(name: str, value: Any) -> Optional[RecipeEvent]:
+    try:
+        value = _FIELD_ADAPTERS[name].validate_python(value)
+    except ValidationError:
+        return None
+    return "field", {"name": name, "value": value}
+
+
+def _item_event(name: str, index: int, value: Any) -> Optional[RecipeEvent]:
+    try:
+        value = _ITEM_ADAPTER.validate_python(value)
+    except ValidationError:
+        return None
+    return LIST_EVENTS[name], {"index": index, "value": value}
+
+
+def recipe_events(recipe: Recipe) -> List[RecipeEvent]:
+    """Every field/item event for an already complete recipe (e.g. a cache hit)"""
+    data = recipe.model_dump()
+    parsed: List[ParseEvent] = []
+    for name, value in data.items():
+        if value is None:
+            # Optional field the model left out: nothing was streamed for it either
+            continue
+        if name in LIST_EVENTS:
+            parsed.extend(((name, index), item) for index, item in enumerate(value))
+        else:
+            parsed.append(((name,), value))
+    return _to_events(parsed)
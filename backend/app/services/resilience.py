@@ -0,0 +1,265 @@
+"""
+Resilience
+Retry with jittered exponential backoff and a circuit breaker for upstream LLM calls
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, Optional, TypeVar, Union
+
+T = TypeVar("T")
+
+GEMINI_RETRY_ATTEMPTS = int(os.getenv("GEMINI_RETRY_ATTEMPTS", "3"))
+GEMINI_RETRY_BASE_DELAY = float(os.getenv("GEMINI_RETRY_BASE_DELAY", "0.5"))
+GEMINI_RETRY_MAX_DELAY = float(os.getenv("GEMINI_RETRY_MAX_DELAY", "8"))
+GEMINI_DEADLINE = float(os.getenv("GEMINI_DEADLINE", "30"))
+
+CIRCUIT_FAILURE_RATE = float(os.getenv("CIRCUIT_FAILURE_RATE", "0.5"))
+CIRCUIT_WINDOW = int(os.getenv("CIRCUIT_WINDOW", "20"))
+CIRCUIT_MIN_CALLS = int(os.getenv("CIRCUIT_MIN_CALLS", "10"))
+CIRCUIT_OPEN_SECONDS = float(os.getenv("CIRCUIT_OPEN_SECONDS", "30"))
+
+# HTTP status codes worth retrying (google.api_core exceptions expose `.code`)
+TRANSIENT_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class UpstreamUnavailableError(Exception):
+    """The LLM backend is failing transiently; the request may succeed later"""
+
+    # Whether retry_async should try again immediately (vs. surface a 503)
+    retryable = True
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(UpstreamUnavailableError):
+    """The circuit breaker is open and the call was not attempted"""
+
+    retryable = False
+
+
+class ProviderNotConfiguredError(UpstreamUnavailableError):
+    """No LLM credentials are configured, so generation can't be attempted"""
+
+    retryable = False
+
+
+def is_transient(exc: BaseException) -> bool:
+    """
+    Classify an upstream exception
+
+    Timeouts, connection failures and rate-limit / 5xx API errors are
+    transient; everything else (bad request, auth, invalid output) is
+    permanent and not retried.
+    """
+    if isinstance(exc, UpstreamUnavailableError):
+        return exc.retryable
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    code = getattr(exc, "code", None)
+    if isinstance(code, int):
+        return code in TRANSIENT_STATUS_CODES
+    # grpc-style status codes are enums whose name says it all
+    name = getattr(code, "name", "")
+    return name in ("RESOURCE_EXHAUSTED", "UNAVAILABLE", "DEADLINE_EXCEEDED", "INTERNAL", "ABORTED")
+
+
+class RetryPolicy:
+    """
+    Retry schedule: full-jitter exponential backoff within a deadline budget
+
+    Attempt n (0-based) waits a random delay in [0, min(max_delay,
+    base_delay * 2**n)], so clients that failed together don't retry in
+    lockstep. No retry is started if it can't finish before the deadline.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = GEMINI_RETRY_ATTEMPTS,
+        base_delay: float = GEMINI_RETRY_BASE_DELAY,
+        max_delay: float = GEMINI_RETRY_MAX_DELAY,
+        deadline: float = GEMINI_DEADLINE,
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+async def retry_async(
+    fn: Callable[[], Awaitable[T]],
+    policy: RetryPolicy,
+    classify: Callable[[BaseException], bool] = is_transient,
+    sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    admit: Optional[Callable[[], Awaitable[object]]] = None,
+) -> T:
+    """
+    Call `fn` until it succeeds, fails permanently, or the budget runs out
+
+    Args:
+        fn: Zero-argument coroutine function making one attempt
+        policy: Attempts, backoff and deadline
+        classify: Returns True for exceptions worth retrying
+        sleep: Injected for tests
+        admit: Awaited before every attempt (e.g. quota admission); it has
+            its own timeout, so time spent in it is not charged to the
+            deadline and its exceptions propagate as-is
+
+    Returns:
+        Result of the first successful attempt
+
+    Raises:
+        The permanent exception as-is, or UpstreamUnavailableError once
+        transient failures exhaust the attempts or the deadline
+    """
+    started = time.monotonic()
+    admitting = 0.0
+
+    def elapsed() -> float:
+        return time.monotonic() - started - admitting
+
+    last_error: Optional[BaseException] = None
+    for attempt in range(policy.max_attempts):
+        if policy.deadline - elapsed() <= 0:
+            break
+        if admit is not None:
+            admit_started = time.monotonic()
+            await admit()
+            admitting += time.monotonic() - admit_started
+        try:
+            return await asyncio.wait_for(fn(), timeout=policy.deadline - elapsed())
+        except Exception as e:
+            if not classify(e):
+                raise
+            last_error = e
+        if attempt + 1 < policy.max_attempts:
+            delay = policy.backoff(attempt)
+            if elapsed() + delay >= policy.deadline:
+                break
+            await sleep(delay)
+    raise UpstreamUnavailableError(
+        f"Upstream unavailable after retries: {last_error or 'deadline exceeded'}",
+        retry_after=policy.base_delay
+    )
+
+
+class CircuitBreaker:
+    """
+    Error-rate circuit breaker
+
+    Tracks the outcome of the last `window` calls. Once at least
+    `min_calls` are recorded and the failure rate reaches `failure_rate`,
+    the circuit opens and calls fast-fail for `open_seconds`. It then goes
+    half-open and lets a single probe through: success closes it, failure
+    re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_rate: float = CIRCUIT_FAILURE_RATE,
+        window: int = CIRCUIT_WINDOW,
+        min_calls: int = CIRCUIT_MIN_CALLS,
+        open_seconds: float = CIRCUIT_OPEN_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self._clock = clock
+        self._outcomes: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.rejected = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.open_seconds:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def allow(self) -> bool:
+        """True if a call may proceed now; counts a rejection otherwise"""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def retry_after(self) -> float:
+        """Seconds until the circuit will let a probe through"""
+        with self._lock:
+            if self._current_state() != self.OPEN:
+                return 0.0
+            return max(0.0, self.open_seconds - (self._clock() - self._opened_at))
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._current_state() == self.HALF_OPEN:
+                self._state = self.CLOSED
+                self._outcomes.clear()
+                self._probe_in_flight = False
+            self._outcomes.append(True)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            state = self._current_state()
+            self._outcomes.append(False)
+            if state == self.HALF_OPEN:
+                self._open()
+            elif state == self.CLOSED and len(self._outcomes) >= self.min_calls:
+                failures = self._outcomes.count(False)
+                if failures / len(self._outcomes) >= self.failure_rate:
+                    self._open()
+
+    def _open(self) -> None:
+        self._state = self.OPEN
+        self._opened_at = self._clock()
+        self._probe_in_flight = False
+        self.times_opened += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._outcomes.clear()
+            self._probe_in_flight = False
+            self.rejected = 0
+            self.times_opened = 0
+
+    def stats(self) -> Dict[str, Union[str, int, float]]:
+        """Breaker state and counters for health/monitoring endpoints"""
+        with self._lock:
+            state = self._current_state()
+            calls = len(self._outcomes)
+            failures = self._outcomes.count(False)
+        return {
+            "state": state,
+            "window_calls": calls,
+            "window_failure_rate": round(failures / calls, 4) if calls else 0.0,
+            "rejected": self.rejected,
+            "times_opened": self.times_opened,
+            "retry_after": round(self.retry_after(), 2),
+        }
@@ -0,0 +1,70 @@
+"""
+Single-flight
+Coalesce concurrent identical async calls into one in-flight execution
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Deduplicate concurrent work by key
+
+    The first caller for a key starts the work as a task; callers arriving
+    while it is in flight await the same task and share its result (or
+    exception). The task is shielded so a disconnecting caller doesn't
+    cancel the work for everyone else.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, "asyncio.Task[Any]"] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `fn` once per key among concurrent callers
+
+        Args:
+            key: Deduplication key
+            fn: Zero-argument coroutine function doing the work
+
+        Returns:
+            The shared result of `fn()`
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def in_flight(self, key: str) -> bool:
+        """True while work for `key` is running (a `do` call would join it)"""
+        task = self._inflight.get(key)
+        return task is not None and not task.done()
+
+    def _forget(self, key: str, task: "asyncio.Task[Any]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every caller went away
+            task.exception()
+
+    def reset(self) -> None:
+        """Reset counters (in-flight work is left alone)"""
+        self.calls = 0
+        self.coalesced = 0
+
+    def stats(self) -> Dict[str, int]:
+        """In-flight keys and call/coalesced counters for monitoring"""
+        return {
+            "in_flight": len(self._inflight),
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+        }
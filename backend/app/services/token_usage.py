@@ -0,0 +1,129 @@
+"""
+Token Usage
+Per-call token and latency accounting for LLM calls, bucketed per minute
+"""
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional
+
+# Minutes of per-minute history kept for /api/recipes/tokens
+TOKEN_USAGE_WINDOW_MINUTES = int(os.getenv("TOKEN_USAGE_WINDOW_MINUTES", "60"))
+
+
+class _Minute:
+    __slots__ = ("start", "calls", "errors", "prompt_tokens", "output_tokens", "latency_ms")
+
+    def __init__(self, start: int):
+        self.start = start
+        self.calls = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self.latency_ms = 0.0
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "minute": time.strftime("%Y-%m-%dT%H:%M:00Z", time.gmtime(self.start * 60)),
+            "calls": self.calls,
+            "errors": self.errors,
+            "prompt_tokens": self.prompt_tokens,
+            "output_tokens": self.output_tokens,
+            "total_tokens": self.prompt_tokens + self.output_tokens,
+            "avg_latency_ms": round(self.latency_ms / self.calls, 1) if self.calls else 0.0,
+        }
+
+
+class TokenUsageTracker:
+    """
+    Running totals plus a ring of per-minute buckets
+
+    Each completed LLM call records its prompt and output tokens (as
+    reported by the provider, else estimated) and its latency; failed
+    calls only count as errors. Recording is O(1); old minutes fall off
+    the ring once it holds `window_minutes`.
+    """
+
+    def __init__(self, window_minutes: int = TOKEN_USAGE_WINDOW_MINUTES, clock: Callable[[], float] = time.time):
+        self.window_minutes = max(1, window_minutes)
+        self._clock = clock
+        self._minutes: Deque[_Minute] = deque(maxlen=self.window_minutes)
+        self._lock = threading.Lock()
+        self._reset_totals()
+
+    def _reset_totals(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self.latency_ms = 0.0
+
+    def _bucket(self) -> _Minute:
+        minute = int(self._clock() // 60)
+        if not self._minutes or self._minutes[-1].start != minute:
+            self._minutes.append(_Minute(minute))
+        return self._minutes[-1]
+
+    def record(self, prompt_tokens: int, output_tokens: int, latency_ms: float) -> None:
+        """Account one successful call"""
+        with self._lock:
+            bucket = self._bucket()
+            bucket.calls += 1
+            bucket.prompt_tokens += prompt_tokens
+            bucket.output_tokens += output_tokens
+            bucket.latency_ms += latency_ms
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+            self.output_tokens += output_tokens
+            self.latency_ms += latency_ms
+
+    def record_error(self) -> None:
+        """Account one failed call (no tokens are counted)"""
+        with self._lock:
+            self._bucket().errors += 1
+            self.errors += 1
+
+    def per_minute(self, minutes: Optional[int] = None) -> List[Dict[str, object]]:
+        """
+        The last `minutes` minutes, oldest first, including idle ones
+
+        Args:
+            minutes: How far back to go (defaults to, and is capped at, the window)
+        """
+        minutes = min(minutes or self.window_minutes, self.window_minutes)
+        with self._lock:
+            current = int(self._clock() // 60)
+            recorded = {bucket.start: bucket for bucket in self._minutes}
+            return [
+                (recorded.get(minute) or _Minute(minute)).as_dict()
+                for minute in range(current - minutes + 1, current + 1)
+            ]
+
+    def summary(self, minutes: Optional[int] = None) -> Dict[str, object]:
+        """Per-minute series plus averages and peaks over it"""
+        series = self.per_minute(minutes)
+        tokens = [m["total_tokens"] for m in series]
+        calls = [m["calls"] for m in series]
+        return {
+            "window_minutes": len(series),
+            "tokens_per_minute": {"avg": round(sum(tokens) / len(series), 1), "peak": max(tokens)},
+            "requests_per_minute": {"avg": round(sum(calls) / len(series), 2), "peak": max(calls)},
+            "minutes": series,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._minutes.clear()
+            self._reset_totals()
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "prompt_tokens": self.prompt_tokens,
+            "output_tokens": self.output_tokens,
+            "avg_prompt_tokens": round(self.prompt_tokens / self.calls, 1) if self.calls else 0.0,
+            "avg_output_tokens": round(self.output_tokens / self.calls, 1) if self.calls else 0.0,
+            "avg_latency_ms": round(self.latency_ms / self.calls, 1) if self.calls else 0.0,
+        }
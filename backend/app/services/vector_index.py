@@ -0,0 +1,308 @@
+"""
+Vector Index
+Offline ingredient-set embeddings and a NumPy cosine-similarity index for near-duplicate recipe lookup
+"""
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Generic, Iterable, List, Optional, Tuple, TypeVar
+
+import numpy as np
+
+from app.services.recipe_cache import normalize_ingredients
+
+T = TypeVar("T")
+
+# Opt-in: 0 (the default) disables near-duplicate lookup
+RECIPE_SIMILARITY_THRESHOLD = float(os.getenv("RECIPE_SIMILARITY_THRESHOLD", "0"))
+# Nearest rows checked for one whose ingredients the request covers
+SEMANTIC_LOOKUP_CANDIDATES = 8
+SEMANTIC_INDEX_DIM = int(os.getenv("SEMANTIC_INDEX_DIM", "512"))
+# "flat" (brute force) or "ivf" (k-means buckets, probes the closest few)
+SEMANTIC_INDEX_MODE = os.getenv("SEMANTIC_INDEX_MODE", "flat")
+SEMANTIC_INDEX_LISTS = int(os.getenv("SEMANTIC_INDEX_LISTS", "64"))
+SEMANTIC_INDEX_NPROBE = int(os.getenv("SEMANTIC_INDEX_NPROBE", "4"))
+# Ingredient sets kept at most, least recently used replaced first
+SEMANTIC_INDEX_MAX_SIZE = int(os.getenv("SEMANTIC_INDEX_MAX_SIZE", "100000"))
+# Hashed features remembered by the embedder
+SEMANTIC_FEATURE_CACHE_SIZE = int(os.getenv("SEMANTIC_FEATURE_CACHE_SIZE", "65536"))
+
+
+class HashingEmbedder:
+    """
+    Bag-of-words embedding via the hashing trick; no model, no network
+
+    Each normalized ingredient contributes its words ("thai basil" ->
+    "thai", "basil") plus, for multi-word names, the whole name, so
+    "basil" and "thai basil" overlap without being identical. Features are
+    hashed with a stable digest into `dim` signed buckets and the vector
+    is L2-normalized, making dot product = cosine similarity. Bucket
+    lookups are memoized in an LRU of `cache_size` features.
+    """
+
+    def __init__(self, dim: int = SEMANTIC_INDEX_DIM, cache_size: int = SEMANTIC_FEATURE_CACHE_SIZE):
+        self.dim = dim
+        self.cache_size = cache_size
+        self._feature_cache: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+
+    def features(self, ingredients: Iterable[str]) -> List[str]:
+        features = set()
+        for name in normalize_ingredients(ingredients):
+            words = name.split(" ")
+            features.update(words)
+            if len(words) > 1:
+                features.add(name)
+        return sorted(features)
+
+    def _bucket(self, feature: str) -> Tuple[int, float]:
+        cached = self._feature_cache.get(feature)
+        if cached is not None:
+            self._feature_cache.move_to_end(feature)
+            return cached
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        cached = (value % self.dim, 1.0 if (value >> 63) & 1 else -1.0)
+        if self.cache_size > 0:
+            self._feature_cache[feature] = cached
+            while len(self._feature_cache) > self.cache_size:
+                self._feature_cache.popitem(last=False)
+        return cached
+
+    def embed(self, ingredients: Iterable[str]) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in self.features(ingredients):
+            index, sign = self._bucket(feature)
+            vector[index] += sign
+        norm = float(np.linalg.norm(vector))
+        if norm > 0:
+            vector /= norm
+        return vector
+
+
+class VectorIndex:
+    """
+    Cosine-similarity index over unit vectors
+
+    Vectors live in one contiguous float32 matrix that grows by doubling.
+    "flat" mode scores every row with a single matrix-vector product.
+    "ivf" mode clusters rows with k-means into `n_lists` buckets once
+    enough rows exist and only scores the `nprobe` closest buckets.
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        mode: str = SEMANTIC_INDEX_MODE,
+        n_lists: int = SEMANTIC_INDEX_LISTS,
+        nprobe: int = SEMANTIC_INDEX_NPROBE,
+    ):
+        if mode not in ("flat", "ivf"):
+            raise ValueError(f"Unknown index mode: {mode}")
+        self.dim = dim
+        self.mode = mode
+        self.n_lists = n_lists
+        self.nprobe = nprobe
+        self._vectors = np.zeros((16, dim), dtype=np.float32)
+        self._size = 0
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[List[int]] = []
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def trained(self) -> bool:
+        return self._centroids is not None
+
+    def add(self, vector: np.ndarray) -> int:
+        """Append a unit vector and return its row id"""
+        if self._size == len(self._vectors):
+            grown = np.zeros((len(self._vectors) * 2, self.dim), dtype=np.float32)
+            grown[:self._size] = self._vectors[:self._size]
+            self._vectors = grown
+        row = self._size
+        self._vectors[row] = vector
+        self._size += 1
+
+        if self.mode == "ivf":
+            if self.trained:
+                self._lists[int(np.argmax(self._centroids @ vector))].append(row)
+            elif self._size >= self.n_lists * 8:
+                self.train()
+        return row
+
+    def replace(self, row: int, vector: np.ndarray) -> None:
+        """Overwrite an existing row, moving it to its new IVF bucket"""
+        if self.mode == "ivf" and self.trained:
+            self._lists[int(np.argmax(self._centroids @ self._vectors[row]))].remove(row)
+            self._lists[int(np.argmax(self._centroids @ vector))].append(row)
+        self._vectors[row] = vector
+
+    def train(self, iterations: int = 10, seed: int = 0) -> None:
+        """Cluster current rows into `n_lists` buckets with spherical k-means"""
+        data = self._vectors[:self._size]
+        k = min(self.n_lists, self._size)
+        if k == 0:
+            return
+        rng = np.random.default_rng(seed)
+        centroids = data[rng.choice(self._size, size=k, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = np.argmax(data @ centroids.T, axis=1)
+            for c in range(k):
+                members = data[assignment == c]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    norm = np.linalg.norm(centroid)
+                    if norm > 0:
+                        centroids[c] = centroid / norm
+        assignment = np.argmax(data @ centroids.T, axis=1)
+        self._centroids = centroids
+        self._lists = [[] for _ in range(k)]
+        for row, c in enumerate(assignment):
+            self._lists[int(c)].append(row)
+
+    def search(self, vector: np.ndarray, k: int = 1) -> List[Tuple[int, float]]:
+        """
+        Top-k rows by cosine similarity
+
+        Returns:
+            [(row id, similarity)] best first
+        """
+        if self._size == 0:
+            return []
+        if self.mode == "ivf" and self.trained:
+            probes = np.argsort(self._centroids @ vector)[::-1][:self.nprobe]
+            rows = np.fromiter(
+                (row for c in probes for row in self._lists[int(c)]), dtype=np.int64
+            )
+            if rows.size == 0:
+                return []
+            scores = self._vectors[rows] @ vector
+        else:
+            rows = None
+            scores = self._vectors[:self._size] @ vector
+
+        k = min(k, scores.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        ids = rows[top] if rows is not None else top
+        return [(int(i), float(scores[t])) for i, t in zip(ids, top)]
+
+
+class SemanticRecipeIndex(Generic[T]):
+    """
+    Near-duplicate lookup of previously generated recipes by ingredient set
+
+    Keeps one row per normalized ingredient key; re-adding a key replaces
+    its payload. A stored recipe only matches a request that covers all
+    of its ingredients, so it never asks for something the user lacks.
+    Once `max_size` keys are held, a new key takes over the row of the
+    least recently added or matched one.
+    """
+
+    def __init__(
+        self,
+        embedder: Optional[HashingEmbedder] = None,
+        index: Optional[VectorIndex] = None,
+        max_size: int = SEMANTIC_INDEX_MAX_SIZE
+    ):
+        self.embedder = embedder or HashingEmbedder()
+        # Not `index or ...`: an empty VectorIndex is falsy
+        self.index = index if index is not None else VectorIndex(self.embedder.dim)
+        self.max_size = max_size
+        # key -> row, least recently used first
+        self._rows: "OrderedDict[str, int]" = OrderedDict()
+        self._keys: List[str] = []
+        self._names: List[FrozenSet[str]] = []
+        self._payloads: List[T] = []
+        self.lookups = 0
+        self.matches = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._payloads)
+
+    def add(self, key: str, ingredients: Iterable[str], payload: T) -> None:
+        if self.max_size <= 0:
+            return
+        names = frozenset(normalize_ingredients(ingredients))
+        vector = self.embedder.embed(names)
+        row = self._rows.get(key)
+        if row is None and len(self._rows) >= self.max_size:
+            # Reuse the least recently used key's row
+            _, row = self._rows.popitem(last=False)
+            self._keys[row] = key
+            self._rows[key] = row
+            self.evictions += 1
+        if row is not None:
+            self._rows.move_to_end(key)
+            self.index.replace(row, vector)
+            self._names[row] = names
+            self._payloads[row] = payload
+            return
+        row = self.index.add(vector)
+        self._rows[key] = row
+        self._keys.append(key)
+        self._names.append(names)
+        self._payloads.append(payload)
+
+    @staticmethod
+    def _covers(requested: FrozenSet[str], stored: FrozenSet[str]) -> bool:
+        """Every stored ingredient was requested, as-is or as the last word of a name ("thai basil" covers "basil")"""
+        available = requested | {name.rsplit(" ", 1)[-1] for name in requested}
+        return stored <= available
+
+    def lookup(
+        self,
+        ingredients: Iterable[str],
+        threshold: float,
+        key: Optional[str] = None
+    ) -> Optional[Tuple[T, float]]:
+        """
+        Most similar stored payload if its similarity reaches `threshold`
+        and the request covers all of its ingredients
+
+        Args:
+            ingredients: Ingredient list to match
+            threshold: Minimum cosine similarity
+            key: The request's own key; its stored row is returned as-is (similarity 1.0)
+
+        Returns:
+            (payload, similarity) or None
+        """
+        self.lookups += 1
+        row = self._rows.get(key) if key is not None else None
+        if row is not None:
+            self._rows.move_to_end(key)
+            self.matches += 1
+            return self._payloads[row], 1.0
+        requested = frozenset(normalize_ingredients(ingredients))
+        for row, score in self.index.search(self.embedder.embed(requested), k=SEMANTIC_LOOKUP_CANDIDATES):
+            if score < threshold:
+                break
+            if self._covers(requested, self._names[row]):
+                self._rows.move_to_end(self._keys[row])
+                self.matches += 1
+                return self._payloads[row], score
+        return None
+
+    def clear(self) -> None:
+        self.index = VectorIndex(self.embedder.dim, self.index.mode, self.index.n_lists, self.index.nprobe)
+        self._rows.clear()
+        self._keys.clear()
+        self._names.clear()
+        self._payloads.clear()
+        self.lookups = 0
+        self.matches = 0
+        self.evictions = 0
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "size": len(self._payloads),
+            "max_size": self.max_size,
+            "mode": self.index.mode,
+            "trained": self.index.trained,
+            "lookups": self.lookups,
+            "matches": self.matches,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,71 @@
+"""
+Benchmark: POST /api/agents/broadcast, sequential loop vs concurrent fan-out
+
+"Sequential" is what the broadcast route used to do: post to
+/api/messages for one agent after another. "Fan-out" is
+app.services.agent_broadcast.broadcast with a bounded semaphore. Both
+run against the local stub MCP server (benchmarks.mcp_stub) with a fixed
+per-message latency standing in for auto-submit time, and share the
+pooled MCP client. Reports total time and, for the fan-out, time to the
+first streamed result.
+
+Usage (from backend/):
+    python -m benchmarks.bench_broadcast [--agents 8,32,128] [--message-latency-ms 50] [--concurrency 16]
+"""
+import argparse
+import asyncio
+import time
+
+from app.services import agent_broadcast, mcp_client
+from benchmarks.mcp_stub import MCPStub
+
+
+async def sequential(client, agents, message) -> int:
+    sent = 0
+    for agent in agents:
+        response = await client.post(
+            "/api/messages",
+            json={"agent": agent["agent_name"], "chat_id": agent["worktree_id"], "message": message,
+                  "task_id": "BROADCAST", "task_title": "Broadcast message"},
+            timeout=15,
+        )
+        sent += response.status_code == 200
+    return sent
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    print(f"{'agents':>7} {'sequential ms':>14} {'fan-out ms':>11} {'first result ms':>16} {'speedup':>8}")
+    for count in [int(n) for n in args.agents.split(",")]:
+        async with MCPStub(agents=count, message_latency=args.message_latency_ms / 1000) as mcp:
+            client = mcp_client.create_client(mcp.url)
+            await sequential(client, mcp.agents[:1], "warmup")
+
+            started = time.perf_counter()
+            sent = await sequential(client, mcp.agents, "hello")
+            sequential_ms = (time.perf_counter() - started) * 1000
+            assert sent == count
+
+            started = time.perf_counter()
+            first_ms = None
+            async for event, data in agent_broadcast.broadcast(client, mcp.agents, "hello", concurrency=args.concurrency):
+                if event == "result" and first_ms is None:
+                    first_ms = (time.perf_counter() - started) * 1000
+                elif event == "summary":
+                    assert data["sent_count"] == count
+            fan_out_ms = (time.perf_counter() - started) * 1000
+
+            print(f"{count:>7} {sequential_ms:>14.1f} {fan_out_ms:>11.1f} {first_ms:>16.1f} "
+                  f"{sequential_ms / fan_out_ms:>7.1f}x")
+            await client.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--agents", default="8,32,128")
+    parser.add_argument("--message-latency-ms", type=float, default=50.0)
+    parser.add_argument("--concurrency", type=int, default=agent_broadcast.AGENT_BROADCAST_CONCURRENCY)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
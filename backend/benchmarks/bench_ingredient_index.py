@@ -0,0 +1,105 @@
+"""
+Benchmark: inverted ingredient index vs linear scan for "what can I cook" queries
+
+Builds synthetic recipe collections (6-12 ingredient lines each, drawn
+from a few hundred ingredient names) and times index build, memory held
+by the posting lists and query latency. The linear scan tokenizes every
+recipe up front and then checks each one per query, which is what the
+search would cost without an index.
+
+Usage (from backend/):
+    python -m benchmarks.bench_ingredient_index [--sizes 10000,100000,1000000] [--queries 50]
+"""
+import argparse
+import random
+import statistics
+import time
+from typing import List, Set, Tuple
+
+from app.services.ingredient_index import InvertedIngredientIndex, ingredient_tokens
+
+_BASES = [
+    "chicken", "beef", "pork", "tofu", "shrimp", "salmon", "egg", "rice", "noodle", "potato",
+    "onion", "garlic", "ginger", "tomato", "carrot", "basil", "cilantro", "lime", "lemon", "chili",
+    "mushroom", "spinach", "cabbage", "pepper", "corn", "bean", "pea", "cheese", "butter", "milk",
+    "flour", "sugar", "salt", "honey", "vinegar", "coconut", "peanut", "sesame", "yogurt", "apple",
+]
+_MODIFIERS = ["", "", "", "red", "green", "smoked", "thai", "brown", "sweet", "spring", "black", "white"]
+_QUANTITIES = ["1", "2", "3", "1/2", "200 g", "1 cup", "2 tbsp", "1 tsp", "1 lb", "3 cloves"]
+
+
+def make_names() -> List[str]:
+    return sorted({f"{modifier} {base}".strip() for base in _BASES for modifier in _MODIFIERS})
+
+
+def make_recipes(count: int, names: List[str], rng: random.Random) -> List[List[str]]:
+    return [
+        [f"{rng.choice(_QUANTITIES)} {name}" for name in rng.sample(names, rng.randint(6, 12))]
+        for _ in range(count)
+    ]
+
+
+def linear_scan(recipes: List[List[Set[str]]], query: List[Tuple[str, ...]], min_match: int) -> int:
+    hits = 0
+    for lines in recipes:
+        matched = sum(1 for tokens in query if any(set(tokens) <= line for line in lines))
+        if matched >= min_match:
+            hits += 1
+    return hits
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--scan-limit", type=int, default=100000, help="skip the linear scan above this size")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    names = make_names()
+    queries = [rng.sample(names, rng.randint(3, 6)) for _ in range(args.queries)]
+    print(f"vocabulary: {len(names)} ingredient names, {args.queries} queries of 3-6 ingredients, min_match=2")
+    print(f"{'recipes':>9} {'build s':>8} {'postings MB':>12} {'p50 ms':>8} {'p95 ms':>8} {'scan ms':>9} {'speedup':>8}")
+
+    for size in (int(s) for s in args.sizes.split(",")):
+        recipes = make_recipes(size, names, rng)
+        index = InvertedIngredientIndex()
+        start = time.perf_counter()
+        for recipe_id, lines in enumerate(recipes, 1):
+            index.add(recipe_id, lines)
+        build = time.perf_counter() - start
+        postings_mb = (
+            sum(p.itemsize * len(p) for p in index._postings)
+            + index._line_doc.itemsize * len(index._line_doc)
+        ) / 1e6
+
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            index.search(query, min_match=2, limit=20)
+            latencies.append((time.perf_counter() - start) * 1000)
+        p50 = statistics.median(latencies)
+        p95 = percentile(latencies, 0.95)
+
+        scan = ""
+        speedup = ""
+        if size <= args.scan_limit:
+            tokenized = [[set(ingredient_tokens(line)) for line in lines] for lines in recipes]
+            token_queries = [[ingredient_tokens(name) for name in query] for query in queries[:10]]
+            start = time.perf_counter()
+            for query in token_queries:
+                linear_scan(tokenized, query, 2)
+            scan_ms = (time.perf_counter() - start) * 1000 / len(token_queries)
+            scan = f"{scan_ms:.1f}"
+            speedup = f"{scan_ms / p50:.0f}x"
+        print(f"{size:>9} {build:>8.2f} {postings_mb:>12.1f} {p50:>8.2f} {p95:>8.2f} {scan:>9} {speedup:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark: ingredient line parsing throughput
+
+Parses synthetic recipe lines ("1 ½ cups chopped scallions, divided",
+"200g chicken breasts", "Salt to taste", ...) built from the bundled
+vocabulary plus unknown names, and reports lines/second. The parser has
+no result cache, so every line is parsed in full.
+
+Usage (from backend/):
+    python -m benchmarks.bench_ingredient_parser [--lines 200000] [--repeat 3]
+"""
+import argparse
+import random
+import time
+from typing import List
+
+from app.services.ingredient_parser import get_parser
+
+_QUANTITIES = ["1", "2", "3", "1/2", "1 1/2", "½", "2-3", "200g", "a", "", "4", "0.5"]
+_UNITS = ["", "", "cup", "cups", "tbsp", "tsp", "g", "oz", "lb", "cloves", "pinch of", "can"]
+_PREFIXES = ["", "", "", "fresh", "chopped", "large", "finely diced", "boneless skinless"]
+_SUFFIXES = ["", "", "", ", minced", ", divided", " (optional)", " to taste", ", cut into 2cm pieces"]
+_UNKNOWN = ["dragon fruit", "sumac", "gochujang", "yuzu kosho", "black garlic", "pandan leaves"]
+
+
+def make_lines(count: int, names: List[str], rng: random.Random) -> List[str]:
+    names = names + _UNKNOWN
+    return [
+        " ".join(part for part in (
+            rng.choice(_QUANTITIES), rng.choice(_UNITS), rng.choice(_PREFIXES), rng.choice(names)
+        ) if part) + rng.choice(_SUFFIXES)
+        for _ in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    ingredient_parser = get_parser()
+    load_ms = (time.perf_counter() - start) * 1000
+    print(f"vocabulary: {len(ingredient_parser.canonical_names)} canonical names, "
+          f"{len(ingredient_parser)} aliases, compiled in {load_ms:.1f} ms")
+
+    lines = make_lines(args.lines, list(ingredient_parser.canonical_names), random.Random(args.seed))
+    best = float("inf")
+    known = 0
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        parsed = [ingredient_parser.parse(line) for line in lines]
+        best = min(best, time.perf_counter() - start)
+        known = sum(1 for p in parsed if p.known)
+    print(f"lines: {len(lines)}, resolved to the vocabulary: {known / len(lines):.1%}")
+    print(f"best of {args.repeat}: {best * 1000:.1f} ms, {len(lines) / best:,.0f} lines/s "
+          f"({best / len(lines) * 1e6:.2f} us/line)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Micro-benchmark: incremental JSON parser vs naive re-parse on every chunk
+
+The naive approach repairs the growing buffer (closes open strings and
+containers) and runs json.loads on it after each chunk, which is O(n^2)
+over the stream. The incremental parser examines each byte once.
+
+Usage (from backend/):
+    python -m benchmarks.bench_json_stream [--items 200] [--repeat 5]
+"""
+import argparse
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+from app.services.json_stream import IncrementalJSONParser
+
+
+def naive_parse_partial(text: str) -> Optional[Dict[str, Any]]:
+    """Repair a JSON prefix and parse it from scratch (the pre-parser approach)"""
+    stack: List[str] = []
+    in_string = False
+    escape = False
+    for ch in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append(ch)
+        elif ch in "}]" and stack:
+            stack.pop()
+    candidate = text
+    if in_string:
+        if escape:
+            candidate = candidate[:-1]
+        candidate += '"'
+    candidate = candidate.rstrip().rstrip(",")
+    candidate += "".join("}" if opener == "{" else "]" for opener in reversed(stack))
+    try:
+        return json.loads(candidate)
+    except json.JSONDecodeError:
+        return None
+
+
+def make_recipe(items: int) -> str:
+    return json.dumps({
+        "title": "Benchmark Stir Fry",
+        "description": "A very long recipe used to stress streaming parsers.",
+        "cookTime": "45 mins",
+        "difficulty": "Medium",
+        "calories": 520,
+        "ingredients": [f"{i} tbsp ingredient number {i}, finely chopped" for i in range(items)],
+        "instructions": [f"Step {i}: stir the \"mixture\" gently for {i} minutes." for i in range(items)],
+    })
+
+
+def chunked(text: str, size: int) -> List[str]:
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def run_incremental(chunks: List[str]) -> int:
+    parser = IncrementalJSONParser(max_depth=2)
+    events = 0
+    for chunk in chunks:
+        events += len(parser.feed(chunk))
+    parser.finish()
+    return events
+
+
+def run_naive(chunks: List[str]) -> int:
+    buffer = ""
+    parses = 0
+    for chunk in chunks:
+        buffer += chunk
+        if naive_parse_partial(buffer) is not None:
+            parses += 1
+    json.loads(buffer)
+    return parses
+
+
+def best_of(fn, chunks: List[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(chunks)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=200, help="ingredients/instructions per recipe")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    text = make_recipe(args.items)
+    print(f"document: {len(text)} bytes")
+    print(f"{'chunk':>6} {'chunks':>7} {'naive ms':>10} {'incremental ms':>15} {'speedup':>8}")
+    for size in (8, 32, 128, 512):
+        chunks = chunked(text, size)
+        naive = best_of(run_naive, chunks, args.repeat)
+        incremental = best_of(run_incremental, chunks, args.repeat)
+        print(f"{size:>6} {len(chunks):>7} {naive * 1000:>10.2f} {incremental * 1000:>15.2f} "
+              f"{naive / incremental:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
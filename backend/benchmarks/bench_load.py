@@ -0,0 +1,239 @@
+"""
+Benchmark: HTTP load test of the FastAPI app, in-process, against the fake LLM provider
+
+Boots `app.main:app` with its lifespan inside this process and drives it
+through httpx's ASGI transport with a fixed number of concurrent clients
+(closed loop: each client sends its next request as soon as the last one
+returns). Recipe generation uses LLM_PROVIDER=fake, and the agents routes
+talk to a local stub MCP server (benchmarks.mcp_stub), so nothing leaves
+the machine. Each generate request uses a different seeded ingredient set.
+
+Reports p50/p95/p99 latency and requests/second per scenario, optionally
+writes them as JSON, and exits with status 1 when a scenario regresses by
+more than --threshold against a baseline file written by an earlier run.
+
+Usage (from backend/):
+    python -m benchmarks.bench_load [--concurrency 32] [--requests 2000] [--output out.json]
+    python -m benchmarks.bench_load --baseline benchmarks/baselines/load.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+SCENARIOS = ("generate", "health", "agents_active", "agent_info", "agents_send")
+
+# Lower is better for latencies, higher for throughput
+_LATENCY_METRICS = ("p50_ms", "p95_ms", "p99_ms")
+_THROUGHPUT_METRICS = ("rps",)
+
+# Options that don't affect the measurement, left out of the results' metadata
+_REPORT_ONLY = ("output", "baseline", "threshold", "min_delta_ms")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def summarize(latencies: List[float], statuses: Counter, elapsed: float) -> Dict[str, object]:
+    ms = [latency * 1000 for latency in latencies]
+    return {
+        "requests": len(ms),
+        "elapsed_s": round(elapsed, 3),
+        "rps": round(len(ms) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(ms, 0.50), 2),
+        "p95_ms": round(percentile(ms, 0.95), 2),
+        "p99_ms": round(percentile(ms, 0.99), 2),
+        "max_ms": round(max(ms), 2),
+        "status": {str(code): count for code, count in sorted(statuses.items())},
+    }
+
+
+async def run_load(send: Callable[[int], "asyncio.Future"], requests: int, concurrency: int) -> Dict[str, object]:
+    """Send `requests` requests from `concurrency` clients; `send(i)` returns the response"""
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    counter = iter(range(requests))
+
+    async def client():
+        for i in counter:
+            started = time.perf_counter()
+            try:
+                response = await send(i)
+                statuses[response.status_code] += 1
+            except Exception as e:
+                statuses[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return summarize(latencies, statuses, time.perf_counter() - started)
+
+
+def compare(
+    results: Dict[str, Dict],
+    baseline: Dict[str, Dict],
+    threshold: float,
+    min_delta_ms: float = 1.0
+) -> List[str]:
+    """
+    Human-readable regressions of `results` vs `baseline`
+
+    A latency regresses when it grows by more than `threshold` (relative)
+    and by more than `min_delta_ms`, so sub-millisecond jitter on fast
+    routes doesn't fail the run; throughput by more than `threshold`.
+    """
+    regressions = []
+    for scenario, current in results.items():
+        previous = baseline.get(scenario)
+        if not previous:
+            continue
+        for metric in _LATENCY_METRICS:
+            if (
+                previous.get(metric)
+                and current[metric] > previous[metric] * (1 + threshold)
+                and current[metric] - previous[metric] > min_delta_ms
+            ):
+                regressions.append(
+                    f"{scenario}.{metric}: {current[metric]} ms vs baseline {previous[metric]} ms "
+                    f"(+{current[metric] / previous[metric] - 1:.0%})"
+                )
+        for metric in _THROUGHPUT_METRICS:
+            if previous.get(metric) and current[metric] < previous[metric] * (1 - threshold):
+                regressions.append(
+                    f"{scenario}.{metric}: {current[metric]} vs baseline {previous[metric]} "
+                    f"({current[metric] / previous[metric] - 1:.0%})"
+                )
+    return regressions
+
+
+def ingredient_sets(count: int, seed: int) -> List[List[str]]:
+    from app.services.ingredient_parser import get_parser
+
+    names = list(get_parser().canonical_names)
+    rng = random.Random(seed)
+    return [rng.sample(names, rng.randint(3, 6)) for _ in range(count)]
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Dict]:
+    import httpx
+
+    from app.main import app
+    from app.services import agent_jobs, mcp_client
+    from benchmarks.mcp_stub import MCPStub
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))} (choose from {', '.join(SCENARIOS)})")
+
+    bodies = ingredient_sets(args.requests + args.warmup, args.seed)
+    results: Dict[str, Dict] = {}
+    async with MCPStub(agents=args.agents, latency=args.mcp_latency_ms / 1000) as mcp:
+        mcp_client.MCP_API_URL = mcp.url
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+                senders: Dict[str, Tuple[Callable[[int], object], Callable[[int], object]]] = {
+                    "generate": (
+                        lambda i: client.post("/api/recipes/generate", json={"ingredients": bodies[args.requests + i]}),
+                        lambda i: client.post("/api/recipes/generate", json={"ingredients": bodies[i]}),
+                    ),
+                    "health": (lambda i: client.get("/health"),) * 2,
+                    "agents_active": (lambda i: client.get("/api/agents/active"),) * 2,
+                    "agent_info": (lambda i: client.get(f"/api/agents/Agent{i % args.agents:03d}/info"),) * 2,
+                    "agents_send": (lambda i: client.post(
+                        "/api/agents/send", json={"agent": f"Agent{i % args.agents:03d}", "message": f"load {i}"}
+                    ),) * 2,
+                }
+                for scenario in scenarios:
+                    warm, send = senders[scenario]
+                    if args.warmup:
+                        await run_load(warm, args.warmup, min(args.concurrency, args.warmup))
+                    results[scenario] = await run_load(send, args.requests, args.concurrency)
+                    while agent_jobs.jobs.stats()["queued"] or agent_jobs.jobs.stats()["running"]:
+                        # Let queued deliveries finish so they don't load the next scenario
+                        await asyncio.sleep(0.01)
+                    print(_format_row(scenario, results[scenario]), flush=True)
+    return results
+
+
+def _format_row(scenario: str, result: Dict[str, object]) -> str:
+    return (
+        f"{scenario:<14} {result['requests']:>7} req  {result['rps']:>9.1f} req/s  "
+        f"p50 {result['p50_ms']:>8.2f} ms  p95 {result['p95_ms']:>8.2f} ms  p99 {result['p99_ms']:>8.2f} ms  "
+        f"status {result['status']}"
+    )
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated subset of scenarios")
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent clients")
+    parser.add_argument("--requests", type=int, default=2000, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=100, help="unmeasured requests per scenario")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fake-latency-ms", type=float, default=20.0, help="fake LLM median latency")
+    parser.add_argument("--fake-error-rate", type=float, default=0.0, help="share of fake LLM calls failing")
+    parser.add_argument("--mcp-latency-ms", type=float, default=1.0, help="stub MCP server latency")
+    parser.add_argument("--agents", type=int, default=8, help="agents listed by the stub MCP server")
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--baseline", help="results JSON from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative regression (0.25 = 25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="latency increases below this never fail")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+
+    # Read at import by the app's modules, so set before importing it
+    os.environ["LLM_PROVIDER"] = "fake"
+    os.environ["LLM_FAKE_LATENCY_MS"] = str(args.fake_latency_ms)
+    os.environ["LLM_FAKE_ERROR_RATE"] = str(args.fake_error_rate)
+    os.environ["LLM_FAKE_SEED"] = str(args.seed)
+    os.environ.setdefault("RECIPE_STORE_PATH", ":memory:")
+    os.environ.setdefault("RECIPE_CATALOG_PATH", "")
+    os.environ.setdefault("RECIPE_REQUEST_LOG", "")
+    # Room for every agents_send job, so the scenario measures enqueueing rather than backpressure
+    os.environ.setdefault("AGENT_JOB_QUEUE_SIZE", str(args.requests + args.warmup))
+
+    results = asyncio.run(run(args))
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            **{key: value for key, value in vars(args).items() if key not in _REPORT_ONLY},
+        },
+        "results": results,
+    }
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"wrote {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"REGRESSION (threshold {args.threshold:.0%}):")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"no regressions vs {args.baseline} (threshold {args.threshold:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
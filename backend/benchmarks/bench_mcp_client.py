@@ -0,0 +1,91 @@
+"""
+Benchmark: MCP calls with a new httpx.AsyncClient per request vs the shared pooled client
+
+Runs GET /api/active-agents against the local stub MCP server
+(benchmarks.mcp_stub, real TCP on 127.0.0.1) at several concurrency
+levels. "per-request" is what the agents routes used to do: open an
+AsyncClient (SSL context, connection pool, TCP connect) for every call.
+"pooled" reuses one app-scoped client built by app.services.mcp_client.
+Reports p50/p95/p99 latency, requests/second and TCP connections opened.
+
+The end-to-end effect on /api/agents/active is measured by
+`python -m benchmarks.bench_load --scenarios agents_active`.
+
+Usage (from backend/):
+    python -m benchmarks.bench_mcp_client [--concurrency 1,8,32,128] [--requests 2000]
+"""
+import argparse
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+
+from app.services import mcp_client
+from benchmarks.mcp_stub import MCPStub
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def run_load(call: Callable[[], Awaitable[httpx.Response]], requests: int, concurrency: int) -> Dict[str, float]:
+    latencies: List[float] = []
+    counter = iter(range(requests))
+
+    async def client():
+        for _ in counter:
+            started = time.perf_counter()
+            response = await call()
+            response.raise_for_status()
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": percentile(latencies, 0.50),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+    }
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    async with MCPStub(agents=args.agents, latency=args.mcp_latency_ms / 1000) as mcp:
+        async def per_request() -> httpx.Response:
+            async with httpx.AsyncClient(timeout=5.0) as client:
+                return await client.get(f"{mcp.url}/api/active-agents")
+
+        pooled_client = mcp_client.create_client(mcp.url)
+
+        async def pooled() -> httpx.Response:
+            return await pooled_client.get("/api/active-agents")
+
+        print(f"stub MCP at {mcp.url}, {args.agents} agents, {args.mcp_latency_ms} ms server latency")
+        print(f"{'mode':<12} {'conc':>5} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'conns':>7}")
+        for concurrency in [int(c) for c in args.concurrency.split(",")]:
+            for name, call in (("per-request", per_request), ("pooled", pooled)):
+                requests = min(args.requests, args.per_request_cap) if name == "per-request" else args.requests
+                await run_load(call, min(50, requests), min(concurrency, 50))
+                connections = mcp.connections
+                result = await run_load(call, requests, concurrency)
+                print(f"{name:<12} {concurrency:>5} {result['rps']:>9.1f} {result['p50']:>9.2f} "
+                      f"{result['p95']:>9.2f} {result['p99']:>9.2f} {mcp.connections - connections:>7}")
+        await pooled_client.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", default="1,8,32,128")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--per-request-cap", type=int, default=500,
+                        help="fewer requests for the slow per-request mode")
+    parser.add_argument("--agents", type=int, default=8)
+    parser.add_argument("--mcp-latency-ms", type=float, default=1.0)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
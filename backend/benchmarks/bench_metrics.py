@@ -0,0 +1,76 @@
+"""
+Benchmark: overhead of request/upstream metrics
+
+Measures CPU time of the building blocks (Histogram.observe,
+MetricsRegistry.observe_request) and of a full request through
+MetricsMiddleware around a trivial ASGI app vs the bare app, called
+directly (no HTTP client) so the difference is the middleware alone.
+Also times rendering /metrics for a realistic number of routes.
+
+Usage (from backend/):
+    python -m benchmarks.bench_metrics [--iterations 200000]
+"""
+import argparse
+import asyncio
+import time
+from typing import Callable
+
+from app.services.metrics import Histogram, MetricsMiddleware, MetricsRegistry
+
+
+def cpu_us(fn: Callable[[], object], iterations: int) -> float:
+    fn()
+    started = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - started) / iterations * 1e6
+
+
+async def bare_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": b'{"status":"healthy"}'})
+
+
+async def request_us(app, iterations: int) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/health", "headers": []}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+    started = time.process_time()
+    for _ in range(iterations):
+        await app(dict(scope), receive, send)
+    return (time.process_time() - started) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=200000)
+    parser.add_argument("--routes", type=int, default=40)
+    args = parser.parse_args()
+
+    histogram = Histogram()
+    registry = MetricsRegistry()
+    print(f"Histogram.observe                {cpu_us(lambda: histogram.observe(0.042), args.iterations):8.3f} us")
+    print(f"MetricsRegistry.observe_request  "
+          f"{cpu_us(lambda: registry.observe_request('GET', '/health', 200, 0.042), args.iterations):8.3f} us")
+
+    bare = asyncio.run(request_us(bare_app, args.iterations))
+    wrapped = asyncio.run(request_us(MetricsMiddleware(bare_app, MetricsRegistry()), args.iterations))
+    print(f"ASGI request, bare app           {bare:8.3f} us")
+    print(f"ASGI request, with middleware    {wrapped:8.3f} us   (+{wrapped - bare:.3f} us/request)")
+
+    for route in range(args.routes):
+        for status in (200, 404, 503):
+            registry.observe_request("GET", f"/api/route/{route}", status, 0.01 * status / 100)
+    render_us = cpu_us(registry.render, max(1, args.iterations // 1000))
+    print(f"render /metrics ({args.routes} routes x 3 statuses)  {render_us / 1000:8.3f} ms "
+          f"({len(registry.render())} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark: recipe parse/serialize CPU time, before and after the fast path
+
+"Before" is what /api/recipes/generate used to do: `json.loads` and
+`Recipe(**data)` on the LLM output, then FastAPI's `response_model`
+pass (re-validation + jsonable_encoder) and `JSONResponse` rendering.
+"After" parses with fast_json (orjson when installed) and validates
+once, then serializes the model once with FastJSONResponse.
+
+Measures CPU time (time.process_time) per request for each stage on a
+typical and a large recipe, then end to end through a minimal ASGI app
+serving the same recipe both ways.
+
+Usage (from backend/):
+    python -m benchmarks.bench_serialization [--iterations 20000]
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Callable, Dict
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.models.recipe import Recipe
+from app.services import fast_json
+from app.services.fast_json import FastJSONResponse
+
+
+def make_recipe(ingredients: int, steps: int) -> Dict[str, object]:
+    return {
+        "title": "Slow-Braised Lemongrass Pork Belly with Caramelized Shallots",
+        "description": "A rich, sticky Vietnamese-style braise balanced with fresh herbs and pickles. " * 3,
+        "cookTime": "2 hrs 15 mins",
+        "difficulty": "Hard",
+        "calories": 780,
+        "servings": 4,
+        "ingredients": [f"{i % 5 + 1} tbsp finely chopped ingredient number {i}, divided" for i in range(ingredients)],
+        "instructions": [
+            f"Step {i + 1}: stir gently over medium-low heat, scraping the bottom of the pot, until fragrant. " * 2
+            for i in range(steps)
+        ],
+    }
+
+
+def cpu_us(fn: Callable[[], object], iterations: int) -> float:
+    fn()
+    started = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - started) / iterations * 1e6
+
+
+def stage_report(name: str, data: Dict[str, object], iterations: int) -> None:
+    text = json.dumps(data)
+    recipe = Recipe(**data)
+    field = create_model_field(name="Response_create_recipe", type_=Recipe, mode="serialization")
+    loop = asyncio.new_event_loop()
+
+    def response_before() -> bytes:
+        content = loop.run_until_complete(serialize_response(field=field, response_content=recipe, is_coroutine=True))
+        return JSONResponse(content).body
+
+    rows = [
+        ("parse LLM output", lambda: Recipe(**json.loads(text)), lambda: Recipe.model_validate(fast_json.loads(text))),
+        ("serialize response", response_before, lambda: FastJSONResponse(recipe).body),
+    ]
+    print(f"\n{name}: {len(text)} bytes, {len(recipe.ingredients)} ingredients, {len(recipe.instructions)} steps")
+    total_before = total_after = 0.0
+    for label, before, after in rows:
+        before_us, after_us = cpu_us(before, iterations), cpu_us(after, iterations)
+        total_before += before_us
+        total_after += after_us
+        print(f"  {label:<20} before {before_us:8.1f} us   after {after_us:8.1f} us   {before_us / after_us:5.1f}x")
+    print(f"  {'total':<20} before {total_before:8.1f} us   after {total_after:8.1f} us   "
+          f"{total_before / total_after:5.1f}x")
+    loop.close()
+
+
+async def end_to_end(data: Dict[str, object], requests: int) -> None:
+    import httpx
+
+    recipe = Recipe(**data)
+    app = FastAPI()
+
+    @app.get("/before", response_model=Recipe)
+    async def before():
+        return recipe
+
+    @app.get("/after", response_model=Recipe)
+    async def after():
+        return FastJSONResponse(recipe)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for path in ("/before", "/after"):
+            await client.get(path)
+            started = time.process_time()
+            for _ in range(requests):
+                response = await client.get(path)
+            elapsed = time.process_time() - started
+            assert response.json() == json.loads(recipe.model_dump_json())
+            print(f"  GET {path:<8} {elapsed / requests * 1e6:8.1f} us CPU/request (client + app)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"JSON backend: {'orjson' if fast_json.orjson is not None else 'stdlib json'}")
+    typical = make_recipe(ingredients=10, steps=6)
+    large = make_recipe(ingredients=60, steps=40)
+    stage_report("typical recipe", typical, args.iterations)
+    stage_report("large recipe", large, args.iterations // 4)
+
+    print("\nend to end, large recipe:")
+    asyncio.run(end_to_end(large, args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Stub MCP API server for offline benchmarks
+
+Minimal HTTP/1.1 server on asyncio streams (keep-alive, no dependencies)
+serving the two MCP endpoints the agents router calls:
+
+    GET  /api/active-agents  -> {"active_agents": [...], "count": n}
+    POST /api/messages       -> {"success": true, "auto_submit": {...}}
+
+Each response is delayed by `latency` seconds (`message_latency` for
+POST /api/messages, which auto-submits in the real server) to stand in
+for the real server's work. Connections are counted so benchmarks can show how many
+TCP connections a run opened.
+"""
+import asyncio
+import json
+from typing import Dict, List, Optional, Tuple
+
+
+def make_agents(count: int) -> List[Dict[str, str]]:
+    return [
+        {"agent_name": f"Agent{i:03d}", "worktree_id": f"wt-{i:03d}", "status": "active"}
+        for i in range(count)
+    ]
+
+
+class MCPStub:
+    """In-process stand-in for the MCP API server"""
+
+    def __init__(self, agents: int = 8, latency: float = 0.0, message_latency: Optional[float] = None):
+        self.agents = make_agents(agents)
+        self.latency = latency
+        self.message_latency = latency if message_latency is None else message_latency
+        self.connections = 0
+        self.requests = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> "MCPStub":
+        self._server = await asyncio.start_server(self._serve, host, port, backlog=1024)
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "MCPStub":
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    def _route(self, method: str, path: str, body: bytes) -> Tuple[int, Dict]:
+        if method == "GET" and path == "/api/active-agents":
+            return 200, {"active_agents": self.agents, "count": len(self.agents)}
+        if method == "POST" and path == "/api/messages":
+            message = json.loads(body or b"{}")
+            return 200, {"success": True, "auto_submit": {"agent": message.get("agent"), "submitted": True}}
+        return 404, {"detail": "Not found"}
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", "0") or 0))
+
+                self.requests += 1
+                delay = self.message_latency if path == "/api/messages" else self.latency
+                if delay:
+                    await asyncio.sleep(delay)
+                status, payload = self._route(method, path, body)
+                data = json.dumps(payload).encode("utf-8")
+                close = headers.get("connection", "").lower() == "close"
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Not Found'}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                    f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n".encode("latin-1") + data
+                )
+                await writer.drain()
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
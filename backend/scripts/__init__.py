@@ -0,0 +1 @@
+# Offline maintenance pipelines for CheftAi Backend
@@ -0,0 +1,143 @@
+"""
+Build the pre-generated recipe catalog from request logs
+
+Mines the most requested normalized ingredient sets from JSON-lines
+request logs (RECIPE_REQUEST_LOG), generates recipes for the ones the
+catalog doesn't have yet through `generate_recipe_with_status` in
+rate-limited batches at background priority, and writes a
+memory-mappable catalog that the API serves at startup with no LLM call.
+
+Usage (from backend/):
+    python -m scripts.build_catalog --log data/requests.jsonl [--top 300] [--min-count 2]
+        [--output data/catalog.bin] [--batch-size 20] [--rpm 60] [--refresh] [--dry-run]
+"""
+import argparse
+import asyncio
+import glob
+import logging
+import os
+import sys
+import time
+from typing import Dict, Iterator, List, Optional
+
+from app.models.recipe import Recipe
+from app.services import gemini_service
+from app.services.rate_limiter import GEMINI_RPM, GEMINI_TPM, PRIORITY_BACKGROUND
+from app.services.recipe_cache import ingredient_key
+from app.services.recipe_catalog import RECIPE_CATALOG_PATH, RecipeCatalog, mine_popular_sets, write_catalog
+
+logger = logging.getLogger(__name__)
+
+# Statuses whose recipe was made for exactly this set just now or earlier; a SIMILAR
+# recipe belongs to another set and a STALE one is a fallback for a failed call
+CATALOG_STATUSES = ("MISS", "HIT")
+
+
+def read_lines(patterns: List[str]) -> Iterator[str]:
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)) or [pattern]:
+            with open(path, encoding="utf-8") as f:
+                yield from f
+
+
+def load_existing(path: str) -> Dict[str, Recipe]:
+    if not os.path.exists(path):
+        return {}
+    catalog = RecipeCatalog(path)
+    try:
+        return dict(catalog.items())
+    finally:
+        catalog.close()
+
+
+async def generate_missing(
+    popular: List[List[str]],
+    batch_size: int,
+    pause: float = 0.0,
+) -> Dict[str, Recipe]:
+    """
+    Generate recipes batch by batch
+
+    Within a batch calls run concurrently; the admission controller keeps
+    them within the configured quota. Failed sets, and sets answered with
+    a recipe that wasn't generated for them (SIMILAR, STALE), are logged
+    and skipped.
+    """
+    generated: Dict[str, Recipe] = {}
+    for start in range(0, len(popular), batch_size):
+        batch = popular[start:start + batch_size]
+        results = await asyncio.gather(
+            *(gemini_service.generate_recipe_with_status(ingredients, PRIORITY_BACKGROUND) for ingredients in batch),
+            return_exceptions=True
+        )
+        for ingredients, result in zip(batch, results):
+            if isinstance(result, Exception):
+                logger.warning(f"[build_catalog] {', '.join(ingredients)}: {result}")
+                continue
+            recipe, status = result
+            if status not in CATALOG_STATUSES:
+                logger.warning(f"[build_catalog] {', '.join(ingredients)}: skipped {status} recipe")
+                continue
+            generated[ingredient_key(ingredients)] = recipe
+        logger.info(f"[build_catalog] {min(start + batch_size, len(popular))}/{len(popular)} generated")
+        if pause and start + batch_size < len(popular):
+            await asyncio.sleep(pause)
+    return generated
+
+
+async def run(args: argparse.Namespace) -> Dict[str, int]:
+    """Mine, generate and write; returns counts for reporting"""
+    popular = mine_popular_sets(read_lines(args.log), top=args.top, min_count=args.min_count)
+    existing = {} if args.refresh else load_existing(args.output)
+    missing = [ingredients for ingredients, _ in popular if ingredient_key(ingredients) not in existing]
+    summary = {"popular": len(popular), "existing": len(existing), "to_generate": len(missing)}
+    if args.dry_run:
+        for ingredients, count in popular:
+            print(f"{count:>7}  {', '.join(ingredients)}")
+        return summary
+
+    if args.rpm or args.tpm:
+        gemini_service.admission_controller.configure(args.rpm or GEMINI_RPM, args.tpm or GEMINI_TPM)
+    gemini_service.init_models()
+    if args.use_store:
+        # Reuse recipes already generated by the API instead of calling Gemini again
+        gemini_service.init_store()
+    try:
+        generated = await generate_missing(missing, args.batch_size, args.pause)
+    finally:
+        gemini_service.shutdown()
+
+    summary["generated"] = len(generated)
+    summary["failed"] = len(missing) - len(generated)
+    summary["written"] = write_catalog(args.output, {**existing, **generated})
+    return summary
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--log", action="append", required=True, help="request log file or glob (repeatable)")
+    parser.add_argument("--output", default=RECIPE_CATALOG_PATH or "data/catalog.bin")
+    parser.add_argument("--top", type=int, default=300, help="most requested sets to include")
+    parser.add_argument("--min-count", type=int, default=2, help="ignore sets requested fewer times")
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--pause", type=float, default=0.0, help="seconds to wait between batches")
+    parser.add_argument("--rpm", type=float, default=0, help="request quota per minute (0 = GEMINI_RPM)")
+    parser.add_argument("--tpm", type=float, default=0, help="token quota per minute (0 = GEMINI_TPM)")
+    parser.add_argument("--refresh", action="store_true", help="regenerate recipes already in the catalog")
+    parser.add_argument("--use-store", action="store_true", help="serve sets already in RECIPE_STORE_PATH")
+    parser.add_argument("--dry-run", action="store_true", help="only print the mined sets")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    args = parse_args(argv)
+    started = time.perf_counter()
+    summary = asyncio.run(run(args))
+    print(" ".join(f"{name}={value}" for name, value in summary.items()),
+          f"elapsed={time.perf_counter() - started:.1f}s")
+    return 0 if not summary.get("failed") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,10 +2,102 @@
 Pytest configuration and shared fixtures for CheftAi Backend tests
 """
 
+import os
+import time
 import pytest
 from typing import Dict, Any
 import json
 
+# Generation needs a key; tests never reach the real API
+os.environ.setdefault("GEMINI_API_KEY", "test_key")
+# Keep the recipe store in memory so tests never touch backend/data
+os.environ.setdefault("RECIPE_STORE_PATH", ":memory:")
+# Never serve from a locally built catalog
+os.environ.setdefault("RECIPE_CATALOG_PATH", "")
+# fake_models plugs FakeModel objects into the Gemini provider's call path
+os.environ["LLM_PROVIDER"] = "gemini"
+
+
+FAKE_RECIPE = {
+    "title": "Spicy Basil Chicken",
+    "description": "A flavorful Thai-inspired dish",
+    "cookTime": "25 mins",
+    "difficulty": "Medium",
+    "calories": 450,
+    "ingredients": ["2 chicken breasts", "1 cup fresh basil", "2 tbsp soy sauce"],
+    "instructions": ["Cut chicken into bite-sized pieces", "Heat oil in a pan", "Cook chicken until golden"]
+}
+
+
+class FakeResponse:
+    """Minimal stand-in for a Gemini GenerateContentResponse"""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeModel:
+    """Offline stand-in for genai.GenerativeModel with artificial latency"""
+
+    def __init__(self, model_name, generation_config=None, system_instruction=None, recipe=None, latency=0.0,
+                 chunk_size=16):
+        self.model_name = model_name
+        self.generation_config = generation_config
+        self.system_instruction = system_instruction
+        self.recipe = recipe or FAKE_RECIPE
+        self.latency = latency
+        self.chunk_size = chunk_size
+        self.failures = []
+        self.calls = 0
+
+    def generate_content(self, prompt, stream=False):
+        # Blocking on purpose, like the real SDK's synchronous call
+        self.calls += 1
+        if self.failures:
+            raise self.failures.pop(0)
+        text = json.dumps(self.recipe)
+        if stream:
+            return self._stream(text)
+        if self.latency:
+            time.sleep(self.latency)
+        return FakeResponse(text)
+
+    def _stream(self, text):
+        chunks = [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)]
+        for chunk in chunks:
+            if self.latency:
+                time.sleep(self.latency / len(chunks))
+            yield FakeResponse(chunk)
+
+
+@pytest.fixture
+def fake_models():
+    """Install a fake model factory in the Gemini model registry"""
+    from app.services import gemini_service
+
+    built = []
+
+    def factory(model_name, generation_config, system_instruction):
+        model = FakeModel(model_name, generation_config, system_instruction)
+        built.append(model)
+        return model
+
+    gemini_service.model_registry.set_factory(factory)
+    gemini_service.model_registry.clear()
+    gemini_service.recipe_cache.clear()
+    gemini_service.generation_flight.reset()
+    gemini_service.circuit_breaker.reset()
+    gemini_service.admission_controller.reset()
+    gemini_service.semantic_index.clear()
+    gemini_service.ingredient_index.clear()
+    gemini_service.token_usage.reset()
+    yield built
+    gemini_service.model_registry.set_factory(gemini_service._build_gemini_model)
+    gemini_service.model_registry.clear()
+    gemini_service.recipe_cache.clear()
+    gemini_service.circuit_breaker.reset()
+    gemini_service.semantic_index.clear()
+
 
 @pytest.fixture(scope="session")
 def test_config():
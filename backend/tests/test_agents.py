@@ -0,0 +1,425 @@
+"""
+Tests for the agents routes and the shared MCP client
+"""
+
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services import agent_broadcast, agent_directory, agent_jobs, mcp_client
+from app.services.agent_directory import AgentDirectory
+
+AGENTS = [
+    {"agent_name": "Architect", "worktree_id": "wt-1", "model": "m", "status": "active"},
+    {"agent_name": "Backend_AI_Dev", "worktree_id": "wt-2", "model": "m", "status": "active"},
+]
+
+
+@pytest.fixture
+def mcp_server(monkeypatch):
+    """Route the shared MCP client to an in-memory MCP server; yields the requests it saw"""
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        if request.url.path == "/api/active-agents":
+            return httpx.Response(200, json={"active_agents": AGENTS, "count": len(AGENTS)})
+        if request.url.path == "/api/messages":
+            body = json.loads(request.content)
+            return httpx.Response(200, json={"success": True, "auto_submit": {"agent": body["agent"]}})
+        return httpx.Response(404)
+
+    monkeypatch.setattr(mcp_client, "transport", httpx.MockTransport(handler))
+    yield seen
+
+
+@pytest.fixture
+def client(mcp_server):
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+class TestSharedClient:
+
+    def test_lifespan_creates_and_closes_one_client(self, mcp_server):
+        from app.main import app
+
+        with TestClient(app) as client:
+            shared = mcp_client._client
+            assert client.get("/api/agents/active").status_code == 200
+            assert client.post("/api/agents/send?wait=true", json={"agent": "Architect", "message": "hi"}).status_code == 200
+            assert mcp_client._client is shared
+
+        assert shared.is_closed
+        assert mcp_client._client is None
+        assert len(mcp_server) == 2
+
+    def test_client_from_another_loop_is_closed_when_replaced(self, mcp_server):
+        async def shared():
+            return mcp_client.get_client()
+
+        async def replace():
+            client = mcp_client.get_client()
+            await asyncio.sleep(0)
+            return client
+
+        old = asyncio.run(shared())
+        new = asyncio.run(replace())
+
+        assert new is not old
+        assert old.is_closed
+        asyncio.run(mcp_client.close_client())
+        assert new.is_closed
+
+    def test_client_uses_base_url_and_pool_limits(self, monkeypatch):
+        monkeypatch.setattr(mcp_client, "MCP_MAX_CONNECTIONS", 7)
+        monkeypatch.setattr(mcp_client, "MCP_MAX_KEEPALIVE", 3)
+
+        client = mcp_client.create_client("http://mcp.test:9000")
+        pool = client._transport.transport._pool
+
+        assert str(client.base_url) == "http://mcp.test:9000"
+        assert pool._max_connections == 7
+        assert pool._max_keepalive_connections == 3
+
+
+class TestAgentRoutes:
+
+    def test_active_agents(self, client):
+        response = client.get("/api/agents/active")
+
+        assert response.status_code == 200
+        assert response.json()["count"] == 2
+
+    def test_agent_info(self, client):
+        assert client.get("/api/agents/Architect/info").json()["worktree_id"] == "wt-1"
+        assert client.get("/api/agents/Nobody/info").status_code == 404
+
+    def test_send_message(self, client, mcp_server):
+        response = client.post("/api/agents/send?wait=true", json={"agent": "Backend_AI_Dev", "message": "hi"})
+
+        assert response.status_code == 200
+        assert response.json()["worktree_id"] == "wt-2"
+        sent = json.loads(mcp_server[-1].content)
+        assert sent["chat_id"] == "wt-2"
+        assert sent["task_id"] == "ADHOC"
+
+    def test_broadcast(self, client):
+        response = client.post("/api/agents/broadcast", json={"message": "hello all"})
+
+        assert response.status_code == 200
+        assert response.json()["sent_count"] == 2
+
+    def test_mcp_unreachable_is_503(self, monkeypatch):
+        from app.main import app
+
+        def refuse(request):
+            raise httpx.ConnectError("connection refused", request=request)
+
+        monkeypatch.setattr(mcp_client, "transport", httpx.MockTransport(refuse))
+        with TestClient(app) as client:
+            response = client.get("/api/agents/active")
+
+        assert response.status_code == 503
+
+
+@pytest.fixture
+def slow_agents(monkeypatch):
+    """MCP server where delivering to agent i takes DELAYS[i] seconds"""
+    delays = {"fast": 0.05, "medium": 0.2, "slow": 0.3, "stuck": 5.0}
+    agents = [{"agent_name": name, "worktree_id": f"wt-{name}"} for name in delays]
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/api/active-agents":
+            return httpx.Response(200, json={"active_agents": agents, "count": len(agents)})
+        await asyncio.sleep(delays[json.loads(request.content)["agent"]])
+        return httpx.Response(200, json={"success": True})
+
+    monkeypatch.setattr(mcp_client, "transport", httpx.MockTransport(handler))
+    return delays
+
+
+class TestBroadcastFanOut:
+
+    def test_agents_are_sent_concurrently_with_deadlines(self, slow_agents):
+        from app.main import app
+
+        with TestClient(app) as client:
+            started = time.perf_counter()
+            response = client.post("/api/agents/broadcast", json={"message": "hi", "timeout": 0.5})
+            elapsed = time.perf_counter() - started
+
+        body = response.json()
+        assert response.status_code == 200
+        # Slowest delivered agent (0.3s) + the stuck one's deadline (0.5s), not their sum (5.55s)
+        assert elapsed < 1.5
+        assert [r["agent"] for r in body["results"]] == ["fast", "medium", "slow", "stuck"]
+        assert body["sent_count"] == 3
+        assert body["timed_out_count"] == 1
+        assert body["results"][3]["timed_out"] is True
+        assert body["total_count"] == 4
+
+    def test_stream_reports_results_as_they_complete(self, slow_agents):
+        from app.main import app
+
+        with TestClient(app) as client:
+            response = client.post("/api/agents/broadcast/stream", json={"message": "hi", "timeout": 0.5})
+
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [
+            (block.split("\n")[0][len("event: "):], json.loads(block.split("\n")[1][len("data: "):]))
+            for block in response.text.strip().split("\n\n")
+        ]
+        assert events[0] == ("start", {"total": 4})
+        assert [data["agent"] for event, data in events[1:-1]] == ["fast", "medium", "slow", "stuck"]
+        assert events[-1][0] == "summary"
+        assert events[-1][1]["sent_count"] == 3
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        in_flight = peak = 0
+
+        async def handler(request):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return httpx.Response(200)
+
+        agents = [{"agent_name": f"a{i}", "worktree_id": f"wt-{i}"} for i in range(12)]
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://mcp") as client:
+            events = [e async for e in agent_broadcast.broadcast(client, agents, "hi", concurrency=3)]
+
+        assert peak == 3
+        assert events[-1][0] == "summary"
+        assert events[-1][1]["sent_count"] == 12
+
+    def test_broadcast_without_agents(self, monkeypatch):
+        from app.main import app
+
+        monkeypatch.setattr(mcp_client, "transport", httpx.MockTransport(
+            lambda request: httpx.Response(200, json={"active_agents": [], "count": 0})
+        ))
+        with TestClient(app) as client:
+            response = client.post("/api/agents/broadcast", json={"message": "hi"})
+
+        assert response.json()["sent_count"] == 0
+
+
+class TestAgentDirectory:
+
+    def test_lookups_share_one_fetch_within_ttl(self, client, mcp_server):
+        assert client.get("/api/agents/active").json()["count"] == 2
+        assert client.get("/api/agents/active/simple").json()["count"] == 2
+        assert client.get("/api/agents/Architect/info").json()["worktree_id"] == "wt-1"
+        assert client.post("/api/agents/send?wait=true", json={"agent": "Backend_AI_Dev", "message": "hi"}).status_code == 200
+
+        fetches = [r for r in mcp_server if r.url.path == "/api/active-agents"]
+        assert len(fetches) == 1
+        assert client.get("/api/agents/directory/stats").json()["hits"] == 3
+
+    @pytest.mark.asyncio
+    async def test_expired_snapshot_is_refetched_once(self, mcp_server):
+        now = [0.0]
+        agents = AgentDirectory(ttl=5, clock=lambda: now[0])
+
+        assert (await agents.find("Architect"))["worktree_id"] == "wt-1"
+        assert (await agents.find_by_worktree("wt-2"))["agent_name"] == "Backend_AI_Dev"
+        now[0] = 6.0
+        found = await asyncio.gather(*(agents.find("Architect") for _ in range(10)))
+
+        assert all(agent["worktree_id"] == "wt-1" for agent in found)
+        assert agents.refreshes == 2
+        assert len(mcp_server) == 2
+        await mcp_client.close_client()
+
+    @pytest.mark.asyncio
+    async def test_fetch_in_flight_does_not_overwrite_notification(self, monkeypatch):
+        release = asyncio.Event()
+        fetched = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            fetched.append(request)
+            if len(fetched) == 1:
+                await release.wait()
+            return httpx.Response(200, json={"active_agents": AGENTS, "count": len(AGENTS)})
+
+        monkeypatch.setattr(mcp_client, "transport", httpx.MockTransport(handler))
+        agents = AgentDirectory(ttl=60)
+        slow = asyncio.ensure_future(agents.snapshot())
+        await asyncio.sleep(0.01)
+        agents.update({"active_agents": [{"agent_name": "QA", "worktree_id": "wt-9"}]})
+        release.set()
+        await slow
+
+        assert await agents.find("QA") is not None
+        assert await agents.find("Architect") is None
+
+        # An invalidation mid-fetch makes the next lookup fetch again rather than join the stale one
+        release.clear()
+        fetched.clear()
+        agents.invalidate()
+        slow = asyncio.ensure_future(agents.snapshot())
+        await asyncio.sleep(0.01)
+        agents.invalidate()
+        assert (await agents.find("Architect"))["worktree_id"] == "wt-1"
+        assert len(fetched) == 2
+        release.set()
+        await slow
+        assert agents.refreshes == 3
+        await mcp_client.close_client()
+
+    def test_notify_replaces_or_invalidates(self, client, mcp_server, monkeypatch):
+        monkeypatch.setattr(agent_directory, "AGENT_DIRECTORY_NOTIFY_TOKEN", "secret")
+        headers = {"X-MCP-Token": "secret"}
+        client.get("/api/agents/active")
+        pushed = {"active_agents": [{"agent_name": "QA", "worktree_id": "wt-9"}], "count": 1}
+
+        assert client.post("/api/agents/directory/notify", json=pushed, headers=headers).status_code == 200
+        assert client.get("/api/agents/QA/info").json()["worktree_id"] == "wt-9"
+        assert client.get("/api/agents/Architect/info").status_code == 404
+
+        client.post("/api/agents/directory/notify", headers=headers)
+        assert client.get("/api/agents/Architect/info").status_code == 200
+        assert len(mcp_server) == 2
+
+    def test_notify_without_token_only_invalidates(self, client, mcp_server):
+        client.get("/api/agents/active")
+        pushed = {"active_agents": [{"agent_name": "QA", "worktree_id": "wt-9"}], "count": 1}
+
+        assert client.post("/api/agents/directory/notify", json=pushed).status_code == 403
+        assert client.get("/api/agents/QA/info").status_code == 404
+        assert client.post("/api/agents/directory/notify").status_code == 200
+        assert client.get("/api/agents/Architect/info").status_code == 200
+        assert len(mcp_server) == 2
+
+    def test_notify_checks_token(self, client, monkeypatch):
+        monkeypatch.setattr(agent_directory, "AGENT_DIRECTORY_NOTIFY_TOKEN", "secret")
+
+        assert client.post("/api/agents/directory/notify").status_code == 401
+        assert client.post("/api/agents/directory/notify", headers={"X-MCP-Token": "wrong"}).status_code == 401
+        assert client.post("/api/agents/directory/notify", headers={"X-MCP-Token": "secret"}).status_code == 200
+
+
+@pytest.fixture
+def slow_delivery(monkeypatch):
+    """MCP server whose message delivery blocks until the test releases it"""
+    release = asyncio.Event()
+    delivered = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/api/active-agents":
+            return httpx.Response(200, json={"active_agents": AGENTS, "count": len(AGENTS)})
+        body = json.loads(request.content)
+        if body["message"] == "fail":
+            return httpx.Response(500, text="auto-submit failed")
+        await release.wait()
+        delivered.append(body["message"])
+        return httpx.Response(200, json={"success": True, "auto_submit": {"status": "sent_to_cursor_ok"}})
+
+    monkeypatch.setattr(mcp_client, "transport", httpx.MockTransport(handler))
+    return release, delivered
+
+
+class TestAgentJobs:
+
+    def test_send_returns_job_before_delivery(self, client, mcp_server):
+        response = client.post("/api/agents/send", json={"agent": "Architect", "message": "hi"})
+
+        assert response.status_code == 202
+        job = response.json()
+        assert job["status"] in ("queued", "running", "succeeded")
+        assert job["status_url"] == f"/api/agents/jobs/{job['job_id']}"
+
+        events = client.get(job["events_url"]).text
+        assert events.rstrip().split("\n\n")[-1].startswith("event: succeeded")
+        done = client.get(job["status_url"]).json()
+        assert done["status"] == "succeeded"
+        assert done["auto_submit"] == {"agent": "Architect"}
+        assert "delivery_ms" in done
+
+    def test_unknown_agent_and_job(self, client):
+        assert client.post("/api/agents/send", json={"agent": "Nobody", "message": "hi"}).status_code == 404
+        assert client.get("/api/agents/jobs/missing").status_code == 404
+        assert client.get("/api/agents/jobs/missing/events").status_code == 404
+
+    def test_failed_delivery(self, slow_delivery):
+        from app.main import app
+
+        with TestClient(app) as client:
+            job = client.post("/api/agents/send", json={"agent": "Architect", "message": "fail"}).json()
+            client.get(job["events_url"])
+            status = client.get(job["status_url"]).json()
+            waited = client.post("/api/agents/send?wait=true", json={"agent": "Architect", "message": "fail"})
+
+        assert status["status"] == "failed"
+        assert status["status_code"] == 500
+        assert waited.status_code == 500
+
+    @pytest.mark.asyncio
+    async def test_one_agent_in_order_others_in_parallel(self, slow_delivery):
+        release, delivered = slow_delivery
+        queue = agent_jobs.AgentJobQueue(workers=2)
+        queue.start()
+
+        first = [queue.submit("Architect", "wt-1", {"message": f"a{i}"}) for i in range(3)]
+        other = queue.submit("Backend_AI_Dev", "wt-2", {"message": "b0"})
+        await asyncio.sleep(0.05)
+        # Architect's backlog waits behind a0 without holding the second worker
+        assert [job.status for job in first] == ["running", "queued", "queued"]
+        assert other.status == "running"
+        assert queue.stats()["queued"] == 2
+
+        release.set()
+        await asyncio.gather(*(job.wait() for job in first + [other]))
+        assert [m for m in delivered if m.startswith("a")] == ["a0", "a1", "a2"]
+        assert queue.stats()["succeeded"] == 4
+
+        await queue.stop()
+        await mcp_client.close_client()
+
+    @pytest.mark.asyncio
+    async def test_full_queue_and_shutdown(self, slow_delivery):
+        queue = agent_jobs.AgentJobQueue(workers=1, max_queued=1)
+        queue.start()
+
+        running = queue.submit("Architect", "wt-1", {"message": "a0"})
+        await asyncio.sleep(0.05)
+        queued = queue.submit("Backend_AI_Dev", "wt-2", {"message": "b0"})
+        with pytest.raises(agent_jobs.JobQueueFullError):
+            queue.submit("Backend_AI_Dev", "wt-2", {"message": "b1"})
+
+        await queue.stop()
+        assert {running.status, queued.status} == {"failed"}
+        assert queued.error == "Server shutting down"
+        await mcp_client.close_client()
+
+    @pytest.mark.asyncio
+    async def test_same_agent_backlog_counts_against_queue_size(self, slow_delivery):
+        release, delivered = slow_delivery
+        queue = agent_jobs.AgentJobQueue(workers=2, max_queued=2)
+        queue.start()
+
+        queue.submit("Architect", "wt-1", {"message": "a0"})
+        await asyncio.sleep(0.05)
+        backlog = [queue.submit("Architect", "wt-1", {"message": f"a{i}"}) for i in (1, 2)]
+        await asyncio.sleep(0.05)
+        # Both moved from the queue to the worktree's backlog; the bound still holds
+        with pytest.raises(agent_jobs.JobQueueFullError):
+            queue.submit("Architect", "wt-1", {"message": "a3"})
+        assert queue.stats()["queued"] == 2
+
+        release.set()
+        await asyncio.gather(*(job.wait() for job in backlog))
+        assert queue.stats()["queued"] == 0
+        queue.submit("Architect", "wt-1", {"message": "a3"})
+
+        await queue.stop()
+        await mcp_client.close_client()
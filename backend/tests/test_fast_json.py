@@ -0,0 +1,66 @@
+"""
+Tests for the orjson fast path and its stdlib fallback
+"""
+
+import json
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+
+from app.models.recipe import Recipe
+from app.services import fast_json
+from app.services.fast_json import FastJSONResponse
+from tests.conftest import FAKE_RECIPE
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def backend(request, monkeypatch):
+    """Run each test with orjson (when installed) and with the stdlib fallback"""
+    if request.param == "stdlib":
+        monkeypatch.setattr(fast_json, "orjson", None)
+    elif fast_json.orjson is None:
+        pytest.skip("orjson not installed")
+    return request.param
+
+
+class TestFastJson:
+
+    def test_round_trip(self, backend):
+        data = {"title": "Phở bò", "calories": 450, "ingredients": ["200 g bánh phở"], "servings": None}
+
+        encoded = fast_json.dumps(data)
+
+        assert encoded == json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        assert fast_json.loads(encoded) == data
+        assert fast_json.loads(encoded.decode("utf-8")) == data
+
+    def test_invalid_json_raises_json_decode_error(self, backend):
+        with pytest.raises(json.JSONDecodeError):
+            fast_json.loads('{"title": ')
+
+    def test_response_matches_fastapi_encoding(self, backend):
+        recipe = Recipe(**FAKE_RECIPE, servings=2)
+
+        body = FastJSONResponse(recipe).body
+
+        assert json.loads(body) == jsonable_encoder(recipe)
+        assert FastJSONResponse(body).body == body
+        assert json.loads(FastJSONResponse({"ok": True}).body) == {"ok": True}
+
+
+class TestGenerateFastPath:
+
+    def test_generate_returns_recipe_with_cache_headers(self, fake_models):
+        from app.main import app
+
+        with TestClient(app) as client:
+            first = client.post("/api/recipes/generate", json={"ingredients": ["chicken", "basil"]})
+            second = client.post("/api/recipes/generate", json={"ingredients": ["basil", "chicken"]})
+
+        assert first.status_code == 200
+        assert first.headers["content-type"] == "application/json"
+        assert first.json() == {**FAKE_RECIPE, "servings": None}
+        assert first.headers["X-Cache"] == "MISS"
+        assert second.headers["X-Cache"] == "HIT"
+        assert second.content == first.content
@@ -0,0 +1,67 @@
+"""
+Load tests for non-blocking Gemini calls
+Uses a local fake model with artificial (blocking) latency
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.services import gemini_service
+
+LATENCY = 0.2
+
+
+@pytest.fixture
+def slow_model(fake_models):
+    """Pooled fake model that blocks for LATENCY seconds per call"""
+    model = gemini_service.get_model()
+    model.latency = LATENCY
+    return model
+
+
+class TestGeminiConcurrency:
+    """N concurrent generations should take ~1x latency, not Nx"""
+
+    @pytest.mark.performance
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_complete_in_single_latency(self, slow_model):
+        n = 10
+        start = time.perf_counter()
+        recipes = await asyncio.gather(*(
+            gemini_service.generate_recipe([f"ingredient{i}"]) for i in range(n)
+        ))
+        elapsed = time.perf_counter() - start
+
+        assert len(recipes) == n
+        assert slow_model.calls == n
+        assert elapsed < LATENCY * 2.5, f"{n} requests took {elapsed:.2f}s"
+
+    @pytest.mark.performance
+    @pytest.mark.asyncio
+    async def test_event_loop_stays_responsive(self, slow_model):
+        task = asyncio.create_task(gemini_service.generate_recipe(["chicken"]))
+        await asyncio.sleep(0)
+
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        tick = time.perf_counter() - start
+
+        await task
+        assert tick < LATENCY / 2
+
+    @pytest.mark.performance
+    @pytest.mark.asyncio
+    async def test_concurrency_limiter_caps_in_flight_calls(self, slow_model, monkeypatch):
+        monkeypatch.setattr(gemini_service, "GEMINI_MAX_CONCURRENCY", 2)
+        monkeypatch.setattr(gemini_service, "_limiter", None)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            gemini_service.generate_recipe([f"ingredient{i}"]) for i in range(4)
+        ))
+        elapsed = time.perf_counter() - start
+
+        # 4 calls through 2 slots -> two waves
+        assert elapsed >= LATENCY * 2 * 0.9
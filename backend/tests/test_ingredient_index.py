@@ -0,0 +1,153 @@
+"""
+Tests for the inverted ingredient index and /api/recipes/search
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models.recipe import Recipe
+from app.services import gemini_service
+from app.services.ingredient_index import InvertedIngredientIndex, ingredient_tokens
+from app.services.recipe_store import RecipeStore
+from tests.conftest import FAKE_RECIPE
+
+
+@pytest.mark.parametrize("line,tokens", [
+    ("2 chicken breasts", ("chicken", "breast")),
+    ("1 cup fresh basil", ("basil",)),
+    ("2 tbsp soy sauce", ("soy", "sauce")),
+    ("3 cloves garlic (minced)", ("garlic",)),
+    ("Salt to taste", ("salt",)),
+])
+def test_ingredient_tokens(line, tokens):
+    assert ingredient_tokens(line) == tokens
+
+
+@pytest.fixture
+def index():
+    index = InvertedIngredientIndex()
+    index.add(1, ["2 chicken breasts", "1 cup basil", "2 tbsp soy sauce"])
+    index.add(2, ["1 lb chicken thighs", "2 cups rice"])
+    index.add(3, ["200 g tofu", "1 tbsp soy sauce", "2 cups rice", "1 onion"])
+    return index
+
+
+class TestInvertedIngredientIndex:
+    """Ranking, thresholds and multi-word ingredients"""
+
+    def test_ranks_by_matched_then_missing(self, index):
+        hits = index.search(["chicken", "rice"])
+
+        assert [h.recipe_id for h in hits] == [2, 1, 3]
+        assert (hits[0].matched, hits[0].missing, hits[0].coverage) == (2, 0, 1.0)
+        assert (hits[1].matched, hits[1].missing) == (1, 2)
+
+    def test_min_match(self, index):
+        assert [h.recipe_id for h in index.search(["chicken", "rice"], min_match=2)] == [2]
+
+    def test_max_missing(self, index):
+        hits = index.search(["tofu", "soy sauce", "rice"], max_missing=1)
+
+        assert [(h.recipe_id, h.missing) for h in hits] == [(3, 1), (2, 1)]
+
+    def test_multi_word_ingredient_needs_all_words_on_one_line(self, index):
+        assert [h.recipe_id for h in index.search(["soy sauce"])] == [1, 3]
+        assert index.search(["chicken rice"]) == []
+
+    def test_query_is_normalized(self, index):
+        assert [h.recipe_id for h in index.search([" Onions "])] == [3]
+
+    def test_unknown_and_empty(self, index):
+        assert index.search(["durian"]) == []
+        assert index.search([]) == []
+        assert InvertedIngredientIndex().search(["chicken"]) == []
+
+    def test_readding_a_recipe_is_ignored(self, index):
+        index.add(2, ["tofu"])
+
+        assert index.stats()["recipes"] == 3
+        assert [h.recipe_id for h in index.search(["tofu"])] == [3]
+
+    def test_adds_while_searching_in_threads(self, index):
+        import threading
+
+        stop = threading.Event()
+        errors = []
+
+        def search():
+            while not stop.is_set():
+                try:
+                    index.search(["chicken", "rice", "soy sauce"])
+                except Exception as e:
+                    errors.append(e)
+
+        threads = [threading.Thread(target=search) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        try:
+            for recipe_id in range(100, 3100):
+                index.add(recipe_id, ["1 lb chicken thighs", "2 cups rice", f"{recipe_id} g spice"])
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+        assert errors == []
+        assert index.stats()["recipes"] == 3003
+        assert len(index.search(["chicken"], limit=5000)) == 3002
+
+    def test_failed_add_leaves_index_unchanged(self, index):
+        before = (index.stats(), index.search(["soy sauce", "rice"]))
+        # A live buffer export makes the last append fail, after the postings grew
+        held = memoryview(index._doc_lines)
+        with pytest.raises(BufferError):
+            index.add(9, ["1 new ingredient", "1 cup rice", "1 other thing"])
+        held.release()
+
+        assert (index.stats(), index.search(["soy sauce", "rice"])) == before
+        index.add(9, ["1 cup rice"])
+        assert index.stats()["recipes"] == 4
+
+    def test_limit(self, index):
+        assert len(index.search(["chicken", "rice", "tofu"], limit=2)) == 2
+
+
+class TestSearchEndpoint:
+    """Generated and stored recipes are searchable without the LLM"""
+
+    def test_generated_recipe_is_searchable(self, fake_models):
+        from app.main import app
+
+        with TestClient(app) as client:
+            client.post("/api/recipes/generate", json={"ingredients": ["chicken", "basil"]})
+            response = client.get("/api/recipes/search", params={"ingredient": ["chicken", "basil", "rice"]})
+            none = client.get("/api/recipes/search", params={"ingredient": "durian"})
+
+        assert response.status_code == 200
+        [result] = response.json()
+        assert result["recipe"]["title"] == FAKE_RECIPE["title"]
+        assert (result["matched"], result["missing"]) == (2, 1)
+        assert none.json() == []
+
+    def test_startup_indexes_existing_recipes(self, fake_models, tmp_path, monkeypatch):
+        from app.main import app
+
+        path = str(tmp_path / "recipes.db")
+        store = RecipeStore(path)
+        store.save("k1", ["tofu"], Recipe(**{**FAKE_RECIPE, "ingredients": ["200 g tofu", "1 onion"]}))
+        store.close()
+        monkeypatch.setattr(gemini_service, "RECIPE_STORE_PATH", path)
+
+        with TestClient(app) as client:
+            response = client.get("/api/recipes/search", params={"ingredient": ["tofu", "onion"]})
+
+        assert response.json()[0]["coverage"] == 1.0
+        assert fake_models[0].calls == 0
+
+    def test_requires_ingredient(self, fake_models):
+        from app.main import app
+
+        with TestClient(app) as client:
+            response = client.get("/api/recipes/search")
+
+        assert response.status_code == 422
@@ -0,0 +1,76 @@
+"""
+Tests for the ingredient parser and canonical vocabulary
+"""
+
+import pytest
+
+from app.services.ingredient_parser import IngredientParser, canonical_name, get_parser, parse_ingredient
+from app.services.recipe_cache import ingredient_key, normalize_ingredients
+
+
+@pytest.mark.parametrize("line,expected", [
+    ("2 tbsp soy sauce", (2.0, "tbsp", "soy sauce", True)),
+    ("1 ½ cups chopped scallions, divided", (1.5, "cup", "green onion", True)),
+    ("1 1/2 lb ground beef", (1.5, "lb", "ground beef", True)),
+    ("3 cloves garlic (minced)", (3.0, "clove", "garlic", True)),
+    ("200g chicken breasts", (200.0, "g", "chicken breast", True)),
+    ("2-3 Thai chilies", (2.5, None, "chili", True)),
+    ("2 to 3 cups water", (2.5, "cup", "water", True)),
+    ("a pinch of salt", (1.0, "pinch", "salt", True)),
+    ("1 (14 oz) can coconut milk", (1.0, "can", "coconut milk", True)),
+    ("2 large eggs", (2.0, None, "egg", True)),
+    ("Salt to taste", (None, None, "salt", True)),
+    ("butter or oil", (None, None, "butter", True)),
+    ("Nước mắm", (None, None, "fish sauce", True)),
+    ("1 cup dragon fruit, cubed", (1.0, "cup", "dragon fruit", False)),
+])
+def test_parse(line, expected):
+    assert tuple(parse_ingredient(line)) == expected
+
+
+class TestCanonicalName:
+    """Aliases, descriptors and unknown names"""
+
+    def test_aliases_resolve(self):
+        assert canonical_name("Scallions") == "green onion"
+        assert canonical_name("prawns") == "shrimp"
+        assert canonical_name("đậu hũ") == "tofu"
+
+    def test_specific_names_are_kept(self):
+        assert canonical_name("ground beef") == "ground beef"
+        assert canonical_name("thai basil") == "thai basil"
+        assert canonical_name("garlic powder") == "garlic powder"
+
+    def test_unknown_names_are_cleaned_not_guessed(self):
+        assert canonical_name("  Fresh  Yuzu Peels ") == "yuzu peel"
+        assert canonical_name("gochujang") == "gochujang"
+
+    def test_unit_word_alone_is_a_name(self):
+        assert canonical_name("can") == "can"
+
+    def test_cache_key_uses_canonical_names(self):
+        assert normalize_ingredients(["2 chicken breasts", "Scallions, garlic"]) == [
+            "chicken breast", "garlic", "green onion"
+        ]
+        assert ingredient_key(["spring onions", "prawns"]) == ingredient_key(["shrimp", "scallion"])
+
+
+class TestVocabulary:
+    """Compiling the alias table"""
+
+    def test_bundled_vocabulary_loads_once(self):
+        parser = get_parser()
+
+        assert parser is get_parser()
+        assert "chicken" in parser.canonical_names
+        assert parser.is_known("green onion")
+
+    def test_conflicting_alias_is_rejected(self):
+        with pytest.raises(ValueError, match="maps to both"):
+            IngredientParser({"lime": ["chanh"], "lemon": ["chanh"]})
+
+    def test_aliases_are_normalized(self):
+        parser = IngredientParser({"tomato": ["Roma Tomatoes"]})
+
+        assert parser.canonical_name("2 roma tomato") == "tomato"
+        assert parser.canonical_names == ("tomato",)
@@ -0,0 +1,75 @@
+"""
+Tests for the incremental JSON parser
+"""
+
+import json
+
+import pytest
+
+from app.services.json_stream import IncrementalJSONParser, JSONStreamError
+from tests.conftest import FAKE_RECIPE
+
+DOCUMENTS = [
+    FAKE_RECIPE,
+    {"a": [], "b": {}, "c": [[1, 2], {"d": None}], "e": True, "f": -1.5e3},
+    {"text": 'quote " backslash \\ tab \t unicode é ☃ emoji \U0001f373'},
+    [1, "two", [3], {"four": 4}],
+    "just a string",
+    42,
+]
+
+
+def _feed_in_chunks(text, size, parser=None):
+    parser = parser or IncrementalJSONParser()
+    events = []
+    for i in range(0, len(text), size):
+        events.extend(parser.feed(text[i:i + size]))
+    return parser, events
+
+
+class TestIncrementalJSONParser:
+    """Result matches json.loads for any chunking"""
+
+    @pytest.mark.parametrize("document", DOCUMENTS)
+    @pytest.mark.parametrize("size", [1, 2, 7, 64, 10_000])
+    def test_matches_json_loads(self, document, size):
+        text = json.dumps(document, indent=1 if size == 7 else None)
+        parser, events = _feed_in_chunks(text, size)
+
+        assert parser.finish() == document
+        if isinstance(document, (dict, list)):
+            assert events[-1] == ((), document)
+
+    def test_paths_and_emission_order(self):
+        text = json.dumps({"title": "T", "ingredients": ["a", "b"], "meta": {"n": 1}})
+        _, events = _feed_in_chunks(text, 1)
+
+        assert [path for path, _ in events] == [
+            ("title",), ("ingredients", 0), ("ingredients", 1), ("ingredients",),
+            ("meta", "n"), ("meta",), (),
+        ]
+
+    def test_value_reported_as_soon_as_it_closes(self):
+        parser = IncrementalJSONParser(max_depth=1)
+        assert parser.feed('{"title": "Spicy') == []
+        assert parser.feed(' Chicken", "calo') == [(("title",), "Spicy Chicken")]
+        # Numbers only close on the following delimiter
+        assert parser.feed('ries": 450') == []
+        assert parser.feed('}') == [(("calories",), 450), ((), {"title": "Spicy Chicken", "calories": 450})]
+
+    def test_max_depth_filters_events(self):
+        _, events = _feed_in_chunks(json.dumps({"a": {"b": [1]}}), 3, IncrementalJSONParser(max_depth=1))
+        assert [path for path, _ in events] == [("a",), ()]
+
+    @pytest.mark.parametrize("text", ['{"a" 1}', '{"a": 1,,}', '[1 2]', '{"a": tru}', '{1: 2}', '[1]]'])
+    def test_invalid_json_raises(self, text):
+        parser = IncrementalJSONParser()
+        with pytest.raises(JSONStreamError):
+            parser.feed(text)
+            parser.finish()
+
+    def test_incomplete_document_raises_on_finish(self):
+        parser = IncrementalJSONParser()
+        parser.feed('{"a": [1, 2')
+        with pytest.raises(JSONStreamError):
+            parser.finish()
@@ -0,0 +1,124 @@
+"""
+Tests for the pluggable LLM providers and the offline fake
+"""
+
+import json
+
+import pytest
+
+from app.models.recipe import Recipe
+from app.services import gemini_service
+from app.services.llm_provider import (
+    FakeProvider,
+    FakeProviderError,
+    GeminiProvider,
+    create_provider,
+)
+from app.services.resilience import ProviderNotConfiguredError, is_transient
+
+
+PROMPT = gemini_service._build_prompt(["chicken", "basil", "fish sauce"])
+
+
+class TestFakeProvider:
+    """Deterministic, schema-valid output with configurable latency and errors"""
+
+    @pytest.mark.asyncio
+    async def test_returns_schema_valid_recipe_for_prompt(self):
+        provider = FakeProvider(latency_ms=0)
+
+        completion = await provider.generate("model", PROMPT)
+        recipe = Recipe(**json.loads(completion.text))
+
+        assert recipe.title.startswith("Chicken ")
+        assert recipe.ingredients[-1].endswith(" fish sauce")
+        assert len(recipe.ingredients) == 3
+        assert recipe.servings >= 1
+        assert completion.prompt_tokens == len(PROMPT) // 4
+        assert completion.output_tokens == len(completion.text) // 4
+
+    @pytest.mark.asyncio
+    async def test_output_is_deterministic(self):
+        first = await FakeProvider(latency_ms=0).generate("model", PROMPT)
+        second = await FakeProvider(latency_ms=0, seed=7).generate("model", PROMPT)
+        other = await FakeProvider(latency_ms=0).generate("model", gemini_service._build_prompt(["tofu"]))
+
+        assert first == second
+        assert first != other
+
+    @pytest.mark.asyncio
+    async def test_stream_reassembles_to_full_response(self):
+        provider = FakeProvider(latency_ms=0, chunk_size=10)
+
+        chunks = [chunk async for chunk in provider.generate_stream("model", PROMPT)]
+
+        assert len(chunks) > 1
+        assert "".join(chunks) == provider.recipe_json(PROMPT)
+
+    def test_latency_distribution(self):
+        fixed = FakeProvider(latency_ms=40, latency_sigma=0)
+        spread = FakeProvider(latency_ms=40, latency_sigma=0.5, seed=1)
+
+        samples = sorted(spread.sample_latency() for _ in range(2000))
+
+        assert fixed.sample_latency() == pytest.approx(0.04)
+        assert samples[1000] == pytest.approx(0.04, rel=0.1)
+        assert samples[1980] > 0.08
+
+    @pytest.mark.asyncio
+    async def test_injected_errors_are_transient(self):
+        provider = FakeProvider(latency_ms=0, error_rate=1.0)
+
+        with pytest.raises(FakeProviderError) as excinfo:
+            await provider.generate("model", PROMPT)
+
+        assert is_transient(excinfo.value)
+        assert provider.stats() == {"name": "fake", "configured": True, "calls": 1, "errors": 1}
+
+    @pytest.mark.asyncio
+    async def test_error_rate_is_seeded(self):
+        async def failures(seed):
+            provider = FakeProvider(latency_ms=0, error_rate=0.3, seed=seed)
+            outcome = []
+            for _ in range(200):
+                try:
+                    await provider.generate("model", PROMPT)
+                    outcome.append(False)
+                except FakeProviderError:
+                    outcome.append(True)
+            return outcome
+
+        first = await failures(3)
+
+        assert first == await failures(3)
+        assert 30 < sum(first) < 90
+
+
+class TestProviderSelection:
+
+    def test_create_provider(self):
+        assert isinstance(create_provider("fake"), FakeProvider)
+        assert isinstance(create_provider("gemini", api_key="k", executor=lambda: None), GeminiProvider)
+        with pytest.raises(ValueError):
+            create_provider("openai")
+
+    def test_gemini_without_key_is_not_configured(self):
+        provider = GeminiProvider(None, executor=lambda: None)
+
+        assert provider.configured is False
+        with pytest.raises(ProviderNotConfiguredError):
+            provider.build_model("gemini-2.0-flash-exp", {}, None)
+
+    @pytest.mark.asyncio
+    async def test_service_generates_through_fake_provider(self, fake_models, monkeypatch):
+        fake = FakeProvider(latency_ms=0)
+        monkeypatch.setattr(gemini_service, "provider", fake)
+
+        recipe, status = await gemini_service.generate_recipe_with_status(["tofu", "scallion"])
+        cached, cached_status = await gemini_service.generate_recipe_with_status(["scallion", "tofu"])
+
+        assert status == "MISS"
+        assert cached_status == "HIT"
+        assert cached == recipe
+        assert recipe.title.startswith("Tofu ")
+        assert fake.calls == 1
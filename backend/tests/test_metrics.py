@@ -0,0 +1,106 @@
+"""
+Tests for the request/latency metrics and the /metrics endpoint
+"""
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services import mcp_client
+from app.services.metrics import Histogram, MetricsRegistry, metrics
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def samples(text: str) -> dict:
+    """Metric lines of an exposition as {"name{labels}": value}"""
+    return {
+        line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1])
+        for line in text.splitlines()
+        if line and not line.startswith("#")
+    }
+
+
+class TestHistogram:
+
+    def test_buckets_are_upper_inclusive_and_cumulative(self):
+        histogram = Histogram((0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value)
+
+        assert histogram.cumulative() == [("0.1", 2), ("1.0", 3), ("+Inf", 4)]
+        assert histogram.count == 4
+        assert histogram.sum == pytest.approx(2.65)
+
+
+class TestRegistry:
+
+    def test_render_exposition_format(self):
+        registry = MetricsRegistry(buckets=(0.1, 1.0))
+        registry.observe_request("GET", "/api/recipes/{recipe_id}", 200, 0.05)
+        registry.observe_request("GET", "/api/recipes/{recipe_id}", 404, 0.5)
+        registry.observe_upstream("mcp", "/api/messages", 2.0, "error")
+        registry.add_collector(lambda: [("cheftai_queue", "gauge", "Queue depth.", [((("state", 'a"b'),), 3)])])
+
+        text = registry.render()
+        values = samples(text)
+
+        assert "# TYPE cheftai_http_requests_total counter" in text
+        assert "# TYPE cheftai_http_request_duration_seconds histogram" in text
+        assert values['cheftai_http_requests_total{method="GET",route="/api/recipes/{recipe_id}",status="200"}'] == 1
+        assert values['cheftai_http_request_duration_seconds_bucket{method="GET",route="/api/recipes/{recipe_id}",le="0.1"}'] == 1
+        assert values['cheftai_http_request_duration_seconds_bucket{method="GET",route="/api/recipes/{recipe_id}",le="+Inf"}'] == 2
+        assert values['cheftai_http_request_duration_seconds_count{method="GET",route="/api/recipes/{recipe_id}"}'] == 2
+        assert values['cheftai_upstream_calls_total{upstream="mcp",operation="/api/messages",outcome="error"}'] == 1
+        assert values['cheftai_queue{state="a\\"b"}'] == 3
+        assert text.endswith("\n")
+
+
+class TestMiddleware:
+
+    def test_requests_are_labelled_by_route_template(self):
+        from app.main import app
+
+        with TestClient(app) as client:
+            client.get("/health")
+            client.get("/health")
+            client.get("/api/recipes/search", params={"ingredient": "chicken"})
+            client.get("/no/such/path")
+            response = client.get("/metrics")
+
+        values = samples(response.text)
+        assert response.headers["content-type"] == "text/plain; version=0.0.4; charset=utf-8"
+        assert values['cheftai_http_requests_total{method="GET",route="/health",status="200"}'] == 2
+        assert values['cheftai_http_requests_total{method="GET",route="/api/recipes/search",status="200"}'] == 1
+        assert values['cheftai_http_requests_total{method="GET",route="unmatched",status="404"}'] == 1
+        assert values['cheftai_http_request_duration_seconds_count{method="GET",route="/health"}'] == 2
+        assert 'cheftai_agent_jobs{state="queued"}' in values
+
+    def test_gemini_calls_are_timed(self, fake_models):
+        from app.main import app
+
+        with TestClient(app) as client:
+            client.post("/api/recipes/generate", json={"ingredients": ["chicken", "basil"]})
+            values = samples(client.get("/metrics").text)
+
+        assert values['cheftai_upstream_calls_total{upstream="gemini",operation="generate",outcome="ok"}'] == 1
+        assert values['cheftai_upstream_call_duration_seconds_count{upstream="gemini",operation="generate"}'] == 1
+        assert values['cheftai_llm_tokens_total{kind="prompt"}'] > 0
+
+    def test_mcp_calls_are_timed(self, monkeypatch):
+        from app.main import app
+
+        monkeypatch.setattr(mcp_client, "transport", httpx.MockTransport(
+            lambda request: httpx.Response(200, json={"active_agents": [], "count": 0})
+        ))
+        with TestClient(app) as client:
+            client.get("/api/agents/active")
+            values = samples(client.get("/metrics").text)
+
+        assert values['cheftai_upstream_calls_total{upstream="mcp",operation="/api/active-agents",outcome="ok"}'] == 1
+        assert values['cheftai_upstream_call_duration_seconds_count{upstream="mcp",operation="/api/active-agents"}'] == 1
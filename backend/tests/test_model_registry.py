@@ -0,0 +1,80 @@
+"""
+Tests for the pooled Gemini model registry
+"""
+
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services.model_registry import ModelRegistry
+from app.services import gemini_service
+
+
+class TestModelRegistry:
+    """Registry reuse behaviour with a fake factory"""
+
+    @pytest.fixture
+    def registry(self):
+        built = []
+
+        def factory(model_name, generation_config, system_instruction):
+            built.append((model_name, generation_config, system_instruction))
+            return object()
+
+        registry = ModelRegistry(factory=factory)
+        registry.built = built
+        return registry
+
+    def test_same_config_reuses_model(self, registry):
+        config = {"temperature": 0.7, "response_schema": {"type": "object", "required": ["a"]}}
+        first = registry.get("model-a", config, "system")
+        second = registry.get("model-a", dict(config), "system")
+
+        assert first is second
+        assert len(registry.built) == 1
+        assert registry.stats() == {"models": 1, "hits": 1, "misses": 1, "hit_rate": 0.5}
+
+    def test_different_config_builds_new_model(self, registry):
+        first = registry.get("model-a", {"temperature": 0.7})
+        second = registry.get("model-a", {"temperature": 0.2})
+        third = registry.get("model-b", {"temperature": 0.7})
+
+        assert len({id(first), id(second), id(third)}) == 3
+        assert registry.stats()["models"] == 3
+
+    def test_set_factory_drops_pooled_models(self, registry):
+        first = registry.get("model-a")
+        registry.set_factory(lambda *args: "fake")
+
+        assert registry.get("model-a") == "fake"
+        assert registry.get("model-a") is not first
+
+
+class TestGeminiServiceRegistry:
+    """generate_recipe must reuse one pooled model across calls"""
+
+    @pytest.mark.asyncio
+    async def test_generate_recipe_reuses_model(self, fake_models):
+        first = await gemini_service.generate_recipe(["chicken", "basil"])
+        second = await gemini_service.generate_recipe(["tofu"])
+
+        assert first.title == "Spicy Basil Chicken"
+        assert second.difficulty == "Medium"
+        assert len(fake_models) == 1
+        assert fake_models[0].calls == 2
+        assert gemini_service.model_registry.stats()["hits"] == 1
+
+    def test_lifespan_warms_registry_and_exposes_stats(self, fake_models):
+        from app.main import app
+
+        with TestClient(app) as client:
+            # Warm-up runs in the background so startup doesn't wait for the SDK
+            deadline = time.monotonic() + 2
+            while not fake_models and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert len(fake_models) == 1
+            response = client.get("/api/recipes/stats")
+
+        assert response.status_code == 200
+        assert response.json()["model_registry"]["models"] == 1
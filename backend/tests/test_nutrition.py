@@ -0,0 +1,177 @@
+"""
+Tests for the local nutrition calculator
+"""
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models.recipe import Recipe
+from app.services.ingredient_parser import get_parser
+from app.services.nutrition import NutrientTable, NutritionCalculator, get_nutrition_calculator
+from tests.conftest import FAKE_RECIPE
+
+
+def make_recipe(ingredients, calories=500, servings=None):
+    return Recipe(**{**FAKE_RECIPE, "ingredients": ingredients, "calories": calories, "servings": servings})
+
+
+@pytest.fixture
+def calculator():
+    return NutritionCalculator(get_nutrition_calculator().table, get_parser(), default_servings=2)
+
+
+class TestNutrientTable:
+    """Bundled table"""
+
+    def test_covers_the_ingredient_vocabulary(self):
+        table = get_nutrition_calculator().table
+
+        assert set(table.names) == set(get_parser().canonical_names)
+        assert table.values.shape == (len(table), 4)
+
+
+class TestNutritionCalculator:
+    """Unit conversion, per-serving totals and coverage"""
+
+    def test_mass_units(self, calculator):
+        facts = calculator.compute(make_recipe(["200 g chicken breast"], servings=1))
+
+        assert facts.calories == 240
+        assert facts.protein == 45.0
+
+    def test_volume_units_use_density(self, calculator):
+        facts = calculator.compute(make_recipe(["1 tbsp olive oil"], servings=1))
+
+        # 14.79 ml * 0.92 g/ml * 8.84 kcal/g
+        assert facts.calories == 120
+
+    def test_counted_items_use_piece_weight(self, calculator):
+        facts = calculator.compute(make_recipe(["2 large eggs"], servings=1))
+
+        assert facts.calories == 143
+
+    def test_per_serving_and_default_servings(self, calculator):
+        explicit = calculator.compute(make_recipe(["400 g chicken breast"], servings=4))
+        default = calculator.compute(make_recipe(["400 g chicken breast"]))
+
+        assert (explicit.servings, explicit.calories, explicit.totalCalories) == (4, 120, 480)
+        assert (default.servings, default.calories) == (2, 240)
+
+    @pytest.mark.parametrize("servings", [0, -2, "4-6", None])
+    def test_invalid_servings_fall_back_to_default(self, calculator, servings):
+        recipe = make_recipe(["400 g chicken breast"], servings=servings)
+
+        assert recipe.servings is None
+        assert calculator.compute(recipe).servings == 2
+
+    def test_unmatched_lines_reduce_coverage(self, calculator):
+        facts = calculator.compute(make_recipe(["1 cup dragon fruit", "100 g tofu", "salt to taste"]))
+
+        assert facts.unmatched == ["1 cup dragon fruit"]
+        assert facts.coverage == pytest.approx(2 / 3, abs=1e-4)
+        assert facts.totalCalories == 76
+
+    def test_amountless_lines_are_pieces_unless_a_trace(self, calculator):
+        facts = calculator.compute(make_recipe(["Chicken breast", "Rice", "Salt to taste"], calories=600))
+
+        # One 200 g breast; rice has no piece weight; salt is a trace
+        assert facts.unmatched == ["Rice"]
+        assert facts.coverage == pytest.approx(2 / 3, abs=1e-4)
+        assert facts.totalCalories == 240
+
+    def test_batch_matches_single(self, calculator):
+        recipes = [
+            make_recipe(["1 lb ground beef", "1 onion"]),
+            make_recipe([]),
+            make_recipe(FAKE_RECIPE["ingredients"], servings=3),
+        ]
+
+        batch = calculator.compute_batch(recipes)
+
+        assert batch == [calculator.compute(r) for r in recipes]
+        assert batch[1].coverage == 0.0
+        assert calculator.compute_batch([]) == []
+
+    def test_custom_table(self):
+        table = NutrientTable(["egg"], np.array([[100.0, 10.0, 5.0, 1.0]]), np.array([50.0]), np.array([1.0]))
+        facts = NutritionCalculator(table, get_parser(), default_servings=1).compute(make_recipe(["4 eggs"]))
+
+        assert facts.calories == 200
+
+
+class TestReconcile:
+    """Validating and overriding the model's calories"""
+
+    def test_validate_counts_disagreements(self, calculator):
+        recipe = make_recipe(["200 g chicken breast"], calories=900, servings=1)
+
+        assert calculator.reconcile(recipe, mode="validate") is recipe
+        assert (calculator.checked, calculator.disagreements, calculator.overridden) == (1, 1, 0)
+
+    def test_override_replaces_calories(self, calculator):
+        recipe = make_recipe(["200 g chicken breast"], calories=900, servings=1)
+
+        assert calculator.reconcile(recipe, mode="override").calories == 240
+        assert calculator.overridden == 1
+
+    def test_low_coverage_is_left_alone(self, calculator):
+        recipe = make_recipe(["1 cup dragon fruit", "100 g tofu"], calories=900)
+
+        assert calculator.reconcile(recipe, mode="override").calories == 900
+        assert calculator.checked == 0
+
+    def test_off(self, calculator):
+        recipe = make_recipe(["200 g chicken breast"], calories=900)
+
+        assert calculator.reconcile(recipe, mode="off") is recipe
+
+
+class TestNutritionEndpoint:
+    """POST /api/recipes/nutrition and the generation pipeline"""
+
+    def test_batch_endpoint(self, fake_models):
+        from app.main import app
+
+        with TestClient(app) as client:
+            response = client.post("/api/recipes/nutrition", json={"recipes": [
+                {**FAKE_RECIPE, "servings": 2},
+                {**FAKE_RECIPE, "ingredients": ["1 cup dragon fruit"]},
+            ]})
+
+        assert response.status_code == 200
+        first, second = response.json()
+        assert first["servings"] == 2 and first["coverage"] == 1.0
+        assert second["unmatched"] == ["1 cup dragon fruit"]
+
+    def test_empty_batch_is_rejected(self, fake_models):
+        from app.main import app
+
+        with TestClient(app) as client:
+            response = client.post("/api/recipes/nutrition", json={"recipes": []})
+
+        assert response.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_zero_servings_from_the_model_do_not_fail_generation(self, fake_models):
+        from app.services import gemini_service
+
+        gemini_service.get_model().recipe = {**FAKE_RECIPE, "servings": 0}
+
+        recipe = await gemini_service.generate_recipe(["chicken", "basil"])
+        assert recipe.title == FAKE_RECIPE["title"]
+        assert recipe.servings is None
+
+    def test_generated_calories_can_be_overridden(self, fake_models, monkeypatch):
+        from app.main import app
+
+        calculator = get_nutrition_calculator()
+        monkeypatch.setattr(
+            calculator, "reconcile", lambda recipe: NutritionCalculator.reconcile(calculator, recipe, mode="override")
+        )
+        expected = calculator.compute(Recipe(**FAKE_RECIPE)).calories
+
+        with TestClient(app) as client:
+            response = client.post("/api/recipes/generate", json={"ingredients": ["chicken", "basil"]})
+
+        assert response.json()["calories"] == expected != FAKE_RECIPE["calories"]
@@ -0,0 +1,216 @@
+"""
+Tests for the outbound token-bucket admission controller
+"""
+
+import asyncio
+
+import pytest
+
+from app.services import gemini_service
+from app.services.rate_limiter import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_BATCH,
+    PRIORITY_INTERACTIVE,
+    AdmissionController,
+    QuotaWindow,
+    RateLimitedError,
+    TokenBucket,
+)
+
+
+class TestTokenBucket:
+
+    def test_refill_and_wait_time(self):
+        now = [0.0]
+        bucket = TokenBucket(rate=2, capacity=4, clock=lambda: now[0])
+        bucket.consume(4)
+
+        assert bucket.wait_time(1) == 0.5
+        now[0] += 1
+        assert bucket.available() == 2
+        now[0] += 10
+        assert bucket.available() == 4  # capped at capacity
+
+    def test_calls_larger_than_a_second_of_quota_stay_within_tpm(self):
+        now = [0.0]
+        tpm = 32_000
+        bucket = TokenBucket(rate=tpm / 60, capacity=tpm / 60, clock=lambda: now[0])
+        admitted = {}
+        # 900-token calls (prompt + output reservation) sent back to back for 10 minutes
+        while True:
+            now[0] += bucket.wait_time(900)
+            if now[0] >= 600:
+                break
+            bucket.consume(900)
+            minute = int(now[0] // 60)
+            admitted[minute] = admitted.get(minute, 0) + 900
+
+        assert len(admitted) == 10
+        # Only the bucket's initial one-second burst comes on top of the quota
+        assert sum(admitted.values()) <= 10 * tpm + bucket.capacity
+        assert all(tokens <= tpm + 900 for tokens in admitted.values())
+        assert sum(admitted.values()) / 10 >= 0.95 * tpm
+
+    def test_zero_rate_is_unlimited(self):
+        bucket = TokenBucket(rate=0)
+        bucket.consume(1_000_000)
+        assert bucket.wait_time(1_000_000) == 0
+
+
+class TestAdmissionController:
+
+    @pytest.mark.asyncio
+    async def test_unlimited_admits_immediately(self):
+        controller = AdmissionController(requests_per_minute=0, tokens_per_minute=0)
+        waits = await asyncio.gather(*(controller.acquire(1000) for _ in range(50)))
+        assert waits == [0.0] * 50
+
+    @pytest.mark.asyncio
+    async def test_interactive_jumps_ahead_of_batch(self):
+        controller = AdmissionController(requests_per_minute=600, tokens_per_minute=0)
+        for _ in range(10):
+            await controller.acquire()  # drain the 1-second burst
+
+        order = []
+
+        async def call(name, priority):
+            await controller.acquire(priority=priority)
+            order.append(name)
+
+        tasks = [asyncio.ensure_future(call("background", PRIORITY_BACKGROUND)),
+                 asyncio.ensure_future(call("batch", PRIORITY_BATCH))]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.ensure_future(call("interactive", PRIORITY_INTERACTIVE)))
+        await asyncio.sleep(0)
+
+        assert controller.stats()["queue_depth"] == 3
+        await asyncio.gather(*tasks)
+
+        assert order == ["interactive", "batch", "background"]
+        stats = controller.stats()["priorities"]
+        assert stats["background"]["max_wait_ms"] > stats["interactive"]["max_wait_ms"]
+
+    @pytest.mark.asyncio
+    async def test_token_quota_limits_admission(self):
+        controller = AdmissionController(requests_per_minute=0, tokens_per_minute=60_000)
+        await controller.acquire(1000)  # whole 1-second token budget
+
+        waited = await controller.acquire(500)
+        assert 0.4 <= waited < 0.7
+
+    @pytest.mark.asyncio
+    async def test_admitted_tokens_per_minute_stay_within_tpm(self):
+        now = [0.0]
+        tpm = 32_000
+        controller = AdmissionController(requests_per_minute=0, tokens_per_minute=tpm, clock=lambda: now[0])
+        admitted = {}
+        # 900-token calls (more than a second of quota) sent back to back for 10 minutes
+        while True:
+            now[0] += controller._next_wait(900)
+            if now[0] >= 600:
+                break
+            assert await controller.acquire(900) == 0
+            minute = int(now[0] // 60)
+            admitted[minute] = admitted.get(minute, 0) + 900
+        assert len(admitted) == 10
+        assert all(tokens <= tpm for tokens in admitted.values())
+        assert sum(admitted.values()) / 10 >= 0.9 * tpm
+
+    def test_quota_window_waits_for_oldest_entries(self):
+        now = [0.0]
+        window = QuotaWindow(limit=1000, window=60, clock=lambda: now[0])
+        window.consume(600)
+        now[0] = 10
+        window.consume(400)
+        assert window.wait_time(500) == 50  # the 600 admitted at t=0 must expire
+        now[0] = 60
+        assert window.wait_time(500) == 0
+        assert window.wait_time(700) == 10
+        assert QuotaWindow(limit=0).wait_time(10**6) == 0
+
+    @pytest.mark.asyncio
+    async def test_promote_moves_group_ahead(self):
+        controller = AdmissionController(requests_per_minute=600, tokens_per_minute=0)
+        for _ in range(10):
+            await controller.acquire()  # drain the 1-second burst
+
+        order = []
+
+        async def call(name, priority, group=None):
+            await controller.acquire(priority=priority, group=group)
+            order.append(name)
+
+        tasks = [asyncio.ensure_future(call("other", PRIORITY_BATCH)),
+                 asyncio.ensure_future(call("joined", PRIORITY_BATCH, group="k"))]
+        await asyncio.sleep(0)
+        controller.promote("k", PRIORITY_INTERACTIVE)
+        controller.promote("k", PRIORITY_BACKGROUND)  # never demoted
+        await asyncio.gather(*tasks)
+
+        assert order == ["joined", "other"]
+        assert controller.stats()["priorities"]["batch"]["admitted"] == 1
+
+    @pytest.mark.asyncio
+    async def test_queue_timeout_raises(self):
+        controller = AdmissionController(requests_per_minute=6, tokens_per_minute=0, queue_timeout=0.05)
+        await controller.acquire()
+
+        with pytest.raises(RateLimitedError) as info:
+            await controller.acquire()
+        assert info.value.retry_after > 0
+        assert controller.stats()["queue_depth"] == 0
+        assert controller.stats()["priorities"]["interactive"]["timeouts"] == 1
+
+
+class TestGeminiAdmission:
+
+    @pytest.mark.asyncio
+    async def test_batch_generation_uses_batch_priority(self, fake_models):
+        await gemini_service.generate_recipes_batch([["rice"], ["egg"]])
+        await gemini_service.generate_recipe(["tofu"])
+
+        priorities = gemini_service.admission_controller.stats()["priorities"]
+        assert priorities["batch"]["admitted"] == 2
+        assert priorities["interactive"]["admitted"] == 1
+
+    @pytest.mark.asyncio
+    async def test_interactive_caller_promotes_joined_batch_generation(self, fake_models, monkeypatch):
+        controller = AdmissionController(requests_per_minute=600, tokens_per_minute=0)
+        monkeypatch.setattr(gemini_service, "admission_controller", controller)
+        for _ in range(10):
+            await controller.acquire()  # drain the 1-second burst
+        order = []
+
+        async def other_batch_call():
+            await controller.acquire(priority=PRIORITY_BATCH)
+            order.append("other")
+
+        async def generate(priority):
+            await gemini_service.generate_recipe(["rice"], priority)
+            order.append(priority)
+
+        other = asyncio.ensure_future(other_batch_call())
+        await asyncio.sleep(0)
+        batch = asyncio.ensure_future(generate(PRIORITY_BATCH))
+        await asyncio.sleep(0.01)
+        interactive = asyncio.ensure_future(generate(PRIORITY_INTERACTIVE))
+        await asyncio.gather(other, batch, interactive)
+
+        assert order.index(PRIORITY_INTERACTIVE) < order.index("other")
+        assert controller.stats()["priorities"]["batch"]["admitted"] == 1
+        assert fake_models[0].calls == 1
+        assert gemini_service._flight_priorities == {}
+
+    @pytest.mark.asyncio
+    async def test_quota_wait_does_not_eat_the_deadline(self, fake_models, monkeypatch):
+        from app.services.resilience import RetryPolicy
+
+        monkeypatch.setattr(gemini_service, "retry_policy", RetryPolicy(max_attempts=1, deadline=0.1))
+        controller = AdmissionController(requests_per_minute=300, tokens_per_minute=0, queue_timeout=1)
+        monkeypatch.setattr(gemini_service, "admission_controller", controller)
+        for _ in range(5):
+            await controller.acquire()  # drain the 1-second burst
+
+        recipe = await gemini_service.generate_recipe(["tofu"])
+        assert recipe.title
+        assert controller.stats()["priorities"]["interactive"]["max_wait_ms"] >= 150
@@ -0,0 +1,95 @@
+"""
+Tests for the content-addressed recipe cache
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models.recipe import Recipe
+from app.services import recipe_cache as cache_module
+from app.services.ingredient_parser import singularize
+from app.services.recipe_cache import RecipeCache, ingredient_key, normalize_ingredients
+from tests.conftest import FAKE_RECIPE
+
+
+class TestNormalization:
+    """Ingredient lists that mean the same fridge must share a key"""
+
+    def test_order_casing_and_whitespace_ignored(self):
+        assert ingredient_key(["Chicken, basil"]) == ingredient_key(["basil,chicken "])
+        assert normalize_ingredients(["  Green   Beans", "garlic", "GARLIC"]) == ["garlic", "green bean"]
+
+    @pytest.mark.parametrize("plural,singular", [
+        ("tomatoes", "tomato"),
+        ("berries", "berry"),
+        ("eggs", "egg"),
+        ("peaches", "peach"),
+        ("asparagus", "asparagus"),
+        ("hummus", "hummus"),
+        ("peas", "pea"),
+    ])
+    def test_singularize(self, plural, singular):
+        assert singularize(plural) == singular
+
+    def test_different_sets_have_different_keys(self):
+        assert ingredient_key(["chicken"]) != ingredient_key(["chicken", "basil"])
+
+
+class TestRecipeCache:
+    """TTL + LRU behaviour"""
+
+    @pytest.fixture
+    def recipe(self):
+        return Recipe(**FAKE_RECIPE)
+
+    def test_hit_and_miss_counters(self, recipe):
+        cache = RecipeCache(max_size=4, ttl=60)
+        assert cache.get("a") is None
+        cache.put("a", recipe)
+        assert cache.get("a") is recipe
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+
+    def test_lru_eviction(self, recipe):
+        cache = RecipeCache(max_size=2, ttl=60)
+        cache.put("a", recipe)
+        cache.put("b", recipe)
+        cache.get("a")
+        cache.put("c", recipe)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is recipe
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiry(self, recipe, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+        cache = RecipeCache(max_size=4, ttl=10)
+        cache.put("a", recipe)
+
+        now[0] += 9
+        assert cache.get("a") is recipe
+        now[0] += 2
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+
+class TestGenerateEndpointCache:
+    """/api/recipes/generate serves repeated fridges from the cache"""
+
+    def test_second_request_is_cache_hit(self, fake_models):
+        from app.main import app
+
+        with TestClient(app) as client:
+            first = client.post("/api/recipes/generate", json={"ingredients": ["Chicken", "basil"]})
+            second = client.post("/api/recipes/generate", json={"ingredients": ["basil ", "chicken"]})
+            stats = client.get("/api/recipes/stats").json()
+
+        assert first.status_code == 200
+        assert first.headers["X-Cache"] == "MISS"
+        assert second.headers["X-Cache"] == "HIT"
+        assert "max-age=" in second.headers["Cache-Control"]
+        assert second.json() == first.json()
+        assert fake_models[0].calls == 1
+        assert stats["recipe_cache"]["hits"] == 1
@@ -0,0 +1,165 @@
+"""
+Tests for the pre-generated recipe catalog and its build pipeline
+"""
+
+import json
+import logging.handlers
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models.recipe import Recipe
+from app.services import gemini_service
+from app.services.recipe_cache import ingredient_key
+from app.services.recipe_catalog import (
+    RecipeCatalog,
+    close_request_log,
+    configure_request_log,
+    log_ingredient_request,
+    mine_popular_sets,
+    request_log,
+    write_catalog,
+)
+from scripts import build_catalog
+from tests.conftest import FAKE_RECIPE
+
+
+def make_recipe(title):
+    return Recipe(**{**FAKE_RECIPE, "title": title})
+
+
+class TestRecipeCatalog:
+    """File format and lookups"""
+
+    def test_round_trip(self, tmp_path):
+        path = str(tmp_path / "catalog.bin")
+        entries = {ingredient_key([name]): make_recipe(name) for name in ("tofu", "egg", "chicken", "rice")}
+
+        assert write_catalog(path, entries) == 4
+        catalog = RecipeCatalog(path)
+
+        assert len(catalog) == 4
+        assert catalog.get(ingredient_key(["Eggs"])).title == "egg"
+        assert catalog.get(ingredient_key(["durian"])) is None
+        assert ingredient_key(["rice"]) in catalog
+        assert dict(catalog.items()) == entries
+        assert catalog.stats() == {"recipes": 4, "hits": 1, "misses": 1}
+        catalog.close()
+
+    def test_empty_catalog(self, tmp_path):
+        path = str(tmp_path / "catalog.bin")
+        write_catalog(path, {})
+
+        assert RecipeCatalog(path).get(ingredient_key(["egg"])) is None
+
+    def test_rejects_other_files(self, tmp_path):
+        path = tmp_path / "catalog.bin"
+        path.write_bytes(b"not a catalog at all")
+
+        with pytest.raises(ValueError):
+            RecipeCatalog(str(path))
+
+
+class TestMining:
+    """Popular ingredient sets from request logs"""
+
+    def test_counts_normalized_sets(self):
+        lines = [
+            json.dumps({"ingredients": ["Chicken", "basil"]}),
+            json.dumps({"ingredients": ["basil", "chickens"]}),
+            json.dumps({"ingredients": ["egg"]}),
+            json.dumps({"ingredients": ["egg"]}),
+            json.dumps({"ingredients": ["egg"]}),
+            json.dumps({"ingredients": ["tofu"]}),
+            "garbage",
+            json.dumps({"other": 1}),
+            json.dumps({"ingredients": []}),
+        ]
+
+        assert mine_popular_sets(lines, top=10, min_count=2) == [(["egg"], 3), (["basil", "chicken"], 2)]
+        assert mine_popular_sets(lines, top=1, min_count=1) == [(["egg"], 3)]
+
+    def test_request_log_feeds_mining(self, tmp_path):
+        path = tmp_path / "logs" / "requests.jsonl"
+        configure_request_log(str(path))
+        try:
+            # The caller only enqueues; a listener thread writes the file
+            assert isinstance(request_log.handlers[0], logging.handlers.QueueHandler)
+            log_ingredient_request(["Scallions", "egg"])
+            log_ingredient_request(["eggs, spring onion"])
+        finally:
+            close_request_log()
+
+        assert mine_popular_sets(path.read_text().splitlines()) == [(["egg", "green onion"], 2)]
+
+
+class TestCatalogServing:
+    """The API serves catalog recipes without calling the model"""
+
+    def test_catalog_hit(self, fake_models, tmp_path, monkeypatch):
+        from app.main import app
+
+        path = str(tmp_path / "catalog.bin")
+        write_catalog(path, {ingredient_key(["tofu", "rice"]): make_recipe("Catalog Tofu")})
+        monkeypatch.setattr(gemini_service, "RECIPE_CATALOG_PATH", path)
+
+        with TestClient(app) as client:
+            first = client.post("/api/recipes/generate", json={"ingredients": ["Rice", "tofu"]})
+            second = client.post("/api/recipes/generate", json={"ingredients": ["rice", "tofu"]})
+            stream = client.post("/api/recipes/generate/stream", json={"ingredients": ["tofu", "rice"]})
+            stats = client.get("/api/recipes/stats").json()
+
+        assert first.headers["X-Cache"] == "CATALOG"
+        assert first.json()["title"] == "Catalog Tofu"
+        assert second.headers["X-Cache"] == "HIT"
+        assert "Catalog Tofu" in stream.text
+        assert stats["recipe_catalog"]["recipes"] == 1
+        assert fake_models[0].calls == 0
+        assert gemini_service.recipe_catalog is None
+
+
+class TestBuildCatalog:
+    """scripts.build_catalog end to end with the fake model"""
+
+    @pytest.mark.asyncio
+    async def test_builds_incrementally(self, fake_models, tmp_path, monkeypatch):
+        monkeypatch.setattr(gemini_service, "RECIPE_STORE_PATH", "")
+        log = tmp_path / "requests.jsonl"
+        log.write_text("\n".join(
+            json.dumps({"ingredients": ingredients})
+            for ingredients in [["egg"], ["egg"], ["tofu", "rice"], ["rice", "tofu"], ["durian"]]
+        ))
+        output = str(tmp_path / "catalog.bin")
+        args = build_catalog.parse_args(["--log", str(log), "--output", output, "--batch-size", "1"])
+
+        first = await build_catalog.run(args)
+        second = await build_catalog.run(args)
+
+        assert first == {"popular": 2, "existing": 0, "to_generate": 2, "generated": 2, "failed": 0, "written": 2}
+        assert second["to_generate"] == 0 and second["written"] == 2
+        catalog = RecipeCatalog(output)
+        assert catalog.get(ingredient_key(["tofu", "rice"])).title == FAKE_RECIPE["title"]
+        catalog.close()
+
+    @pytest.mark.asyncio
+    async def test_skips_recipes_not_generated_for_the_set(self, fake_models, monkeypatch):
+        monkeypatch.setattr(gemini_service, "RECIPE_SIMILARITY_THRESHOLD", 0.1)
+        gemini_service.semantic_index.add(ingredient_key(["egg"]), ["egg"], make_recipe("Plain Egg"))
+
+        generated = await build_catalog.generate_missing([["egg", "rice"], ["tofu"]], batch_size=2)
+
+        assert list(generated) == [ingredient_key(["tofu"])]
+        assert fake_models[0].calls == 1
+
+    @pytest.mark.asyncio
+    async def test_dry_run_generates_nothing(self, fake_models, tmp_path, capsys):
+        log = tmp_path / "requests.jsonl"
+        log.write_text(json.dumps({"ingredients": ["egg"]}) + "\n")
+        args = build_catalog.parse_args(["--log", str(log), "--output", str(tmp_path / "c.bin"),
+                                         "--min-count", "1", "--dry-run"])
+
+        summary = await build_catalog.run(args)
+
+        assert summary == {"popular": 1, "existing": 0, "to_generate": 1}
+        assert "egg" in capsys.readouterr().out
+        assert not (tmp_path / "c.bin").exists()
@@ -0,0 +1,86 @@
+"""
+Tests for the SQLite recipe store
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models.recipe import Recipe
+from app.services import gemini_service
+from app.services.recipe_cache import ingredient_key
+from app.services.recipe_store import RecipeStore
+from tests.conftest import FAKE_RECIPE
+
+
+@pytest.fixture
+def recipe():
+    return Recipe(**FAKE_RECIPE)
+
+
+class TestRecipeStore:
+    """Persistence and queries"""
+
+    def test_save_and_get(self, tmp_path, recipe):
+        store = RecipeStore(str(tmp_path / "recipes.db"))
+        recipe_id = store.save("k1", ["basil", "chicken"], recipe, "model-a", 12.5)
+
+        stored = store.get(recipe_id)
+        assert stored.title == recipe.title
+        assert stored.sourceIngredients == ["basil", "chicken"]
+        assert stored.model == "model-a"
+        assert stored.latencyMs == 12.5
+        assert store.get(recipe_id + 1) is None
+
+    def test_wal_mode_and_survives_reopen(self, tmp_path, recipe):
+        path = str(tmp_path / "recipes.db")
+        store = RecipeStore(path)
+        mode = store._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        store.save("k1", ["chicken"], recipe)
+        store.close()
+
+        assert mode == "wal"
+        assert RecipeStore(path).count() == 1
+
+    def test_search_requires_all_ingredients(self, recipe):
+        store = RecipeStore(":memory:")
+        first = store.save("k1", ["basil", "chicken"], recipe)
+        second = store.save("k2", ["chicken", "rice"], recipe)
+
+        assert [r.id for r in store.search(["chicken"])] == [second, first]
+        assert [r.id for r in store.search(["chicken", "basil"])] == [first]
+        assert store.search(["tofu"]) == []
+
+
+class TestRecipeStoreIntegration:
+    """Generated recipes are persisted, queryable and warm the cache"""
+
+    def test_generated_recipe_is_persisted_and_queryable(self, fake_models):
+        from app.main import app
+
+        with TestClient(app) as client:
+            client.post("/api/recipes/generate", json={"ingredients": ["Chicken", "basil"]})
+            listing = client.get("/api/recipes", params={"ingredient": "chickens"})
+            recipe_id = listing.json()[0]["id"]
+            single = client.get(f"/api/recipes/{recipe_id}")
+            missing = client.get("/api/recipes/9999")
+
+        assert listing.status_code == 200
+        assert len(listing.json()) == 1
+        assert single.json()["sourceIngredients"] == ["basil", "chicken"]
+        assert single.json()["title"] == FAKE_RECIPE["title"]
+        assert missing.status_code == 404
+
+    def test_startup_warms_cache_from_store(self, fake_models, tmp_path, recipe, monkeypatch):
+        from app.main import app
+
+        path = str(tmp_path / "recipes.db")
+        store = RecipeStore(path)
+        store.save(ingredient_key(["tofu"]), ["tofu"], recipe)
+        store.close()
+        monkeypatch.setattr(gemini_service, "RECIPE_STORE_PATH", path)
+
+        with TestClient(app) as client:
+            response = client.post("/api/recipes/generate", json={"ingredients": ["Tofu"]})
+
+        assert response.headers["X-Cache"] == "HIT"
+        assert fake_models[0].calls == 0
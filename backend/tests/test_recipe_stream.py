@@ -0,0 +1,93 @@
+"""
+Tests for streamed recipe generation (/api/recipes/generate/stream)
+"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services.recipe_stream import RecipeStreamAssembler
+from tests.conftest import FAKE_RECIPE
+
+
+def _parse_sse(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class TestRecipeStreamAssembler:
+    """Fields and list items are emitted once, as soon as they complete"""
+
+    def test_char_by_char_emits_in_order(self):
+        text = json.dumps(FAKE_RECIPE)
+        assembler = RecipeStreamAssembler()
+        events = []
+        title_at = None
+        for i, ch in enumerate(text):
+            events.extend(assembler.feed(ch))
+            if title_at is None and events:
+                title_at = i
+        tail, recipe = assembler.finish()
+        events.extend(tail)
+
+        assert title_at is not None and title_at < text.index('"cookTime"')
+        assert events[0] == ("field", {"name": "title", "value": FAKE_RECIPE["title"]})
+        assert [e[1]["value"] for e in events if e[0] == "ingredient"] == FAKE_RECIPE["ingredients"]
+        assert [e[1]["index"] for e in events if e[0] == "instruction"] == [0, 1, 2]
+        assert len(events) == 5 + 3 + 3
+        assert recipe.title == FAKE_RECIPE["title"]
+
+    def test_invalid_field_is_not_emitted(self):
+        bad = dict(FAKE_RECIPE, difficulty="Impossible")
+        assembler = RecipeStreamAssembler()
+        events = assembler.feed(json.dumps(bad))
+
+        assert all(e[1].get("name") != "difficulty" for e in events)
+        with pytest.raises(ValueError):
+            assembler.finish()
+
+    def test_escaped_quotes_inside_strings(self):
+        recipe = dict(FAKE_RECIPE, title='The "Best" Chicken')
+        text = json.dumps(recipe)
+        assembler = RecipeStreamAssembler()
+        events = []
+        for i in range(0, len(text), 3):
+            events.extend(assembler.feed(text[i:i + 3]))
+
+        assert ("field", {"name": "title", "value": 'The "Best" Chicken'}) in events
+
+
+class TestStreamEndpoint:
+    """SSE endpoint end to end with a chunked fake model"""
+
+    def test_stream_miss_then_hit(self, fake_models):
+        from app.main import app
+
+        with TestClient(app) as client:
+            first = client.post("/api/recipes/generate/stream", json={"ingredients": ["chicken"]})
+            second = client.post("/api/recipes/generate/stream", json={"ingredients": ["Chicken"]})
+
+        assert first.headers["content-type"].startswith("text/event-stream")
+        miss, hit = _parse_sse(first.text), _parse_sse(second.text)
+
+        assert miss[0] == ("start", {"cache": "MISS"})
+        assert miss[-1] == ("recipe", {**FAKE_RECIPE, "servings": None})
+        assert hit[0] == ("start", {"cache": "HIT"})
+        assert hit[1:] == miss[1:]
+        assert fake_models[0].calls == 1
+
+    def test_stream_reports_errors_as_events(self, fake_models):
+        from app.main import app
+        from app.services import gemini_service
+
+        gemini_service.get_model().recipe = {"title": "Only a title"}
+        with TestClient(app) as client:
+            response = client.post("/api/recipes/generate/stream", json={"ingredients": ["egg"]})
+
+        events = _parse_sse(response.text)
+        assert events[-1][0] == "error"
+        assert "Invalid recipe" in events[-1][1]["detail"]
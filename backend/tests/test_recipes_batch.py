@@ -0,0 +1,75 @@
+"""
+Tests for POST /api/recipes/generate-batch
+"""
+
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services import gemini_service
+
+
+class TestGenerateRecipesBatch:
+    """Batch fan-out, dedupe and per-item results"""
+
+    @pytest.mark.asyncio
+    async def test_dedupes_and_preserves_order(self, fake_models):
+        model = gemini_service.get_model()
+        batch = await gemini_service.generate_recipes_batch([
+            ["chicken", "basil"],
+            ["tofu"],
+            ["Basil", "chicken"],
+            [],
+        ])
+
+        assert [r.index for r in batch.results] == [0, 1, 2, 3]
+        assert (batch.total, batch.unique, batch.succeeded, batch.failed) == (4, 2, 3, 1)
+        assert batch.results[3].error == "At least one ingredient is required"
+        assert model.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_per_item_errors_do_not_fail_batch(self, fake_models, monkeypatch):
+        real = gemini_service._generate_uncached
+
+        async def flaky(ingredients, *args):
+            if "poison" in ingredients:
+                raise ValueError("Error generating recipe: boom")
+            return await real(ingredients, *args)
+
+        monkeypatch.setattr(gemini_service, "_generate_uncached", flaky)
+        batch = await gemini_service.generate_recipes_batch([["poison"], ["rice"]])
+
+        assert batch.results[0].success is False
+        assert "boom" in batch.results[0].error
+        assert batch.results[1].success is True
+
+    @pytest.mark.performance
+    @pytest.mark.asyncio
+    async def test_runs_at_concurrency_limit(self, fake_models):
+        model = gemini_service.get_model()
+        model.latency = 0.1
+
+        start = time.perf_counter()
+        batch = await gemini_service.generate_recipes_batch(
+            [[f"ingredient{i}"] for i in range(8)], concurrency=4
+        )
+        elapsed = time.perf_counter() - start
+
+        assert batch.succeeded == 8
+        # 8 items through 4 slots -> two waves, not eight
+        assert 0.18 <= elapsed < 0.5
+
+    def test_endpoint_reuses_cache(self, fake_models):
+        from app.main import app
+
+        with TestClient(app) as client:
+            client.post("/api/recipes/generate", json={"ingredients": ["rice"]})
+            response = client.post("/api/recipes/generate-batch", json={
+                "requests": [{"ingredients": ["Rice"]}, {"ingredients": ["egg"]}]
+            })
+
+        body = response.json()
+        assert response.status_code == 200
+        assert [r["cache"] for r in body["results"]] == ["HIT", "MISS"]
+        assert body["succeeded"] == 2
@@ -0,0 +1,258 @@
+"""
+Tests for retry/backoff and the Gemini circuit breaker
+"""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services import gemini_service
+from app.services.recipe_cache import ingredient_key
+from app.services.recipe_store import RecipeStore
+from app.services.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    UpstreamUnavailableError,
+    is_transient,
+    retry_async,
+)
+from app.models.recipe import Recipe
+from tests.conftest import FAKE_RECIPE
+
+
+class ApiError(Exception):
+    """Looks like a google.api_core exception (HTTP status in `.code`)"""
+
+    def __init__(self, code):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+async def _no_sleep(delay):
+    return None
+
+
+class TestClassification:
+
+    @pytest.mark.parametrize("exc,transient", [
+        (ApiError(429), True),
+        (ApiError(503), True),
+        (ApiError(400), False),
+        (ApiError(403), False),
+        (asyncio.TimeoutError(), True),
+        (ConnectionResetError(), True),
+        (ValueError("bad json"), False),
+        (CircuitOpenError("open"), False),
+    ])
+    def test_is_transient(self, exc, transient):
+        assert is_transient(exc) is transient
+
+
+class TestRetry:
+
+    @pytest.mark.asyncio
+    async def test_retries_transient_then_succeeds(self):
+        attempts = []
+
+        async def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise ApiError(429)
+            return "ok"
+
+        assert await retry_async(flaky, RetryPolicy(max_attempts=3), sleep=_no_sleep) == "ok"
+        assert len(attempts) == 3
+
+    @pytest.mark.asyncio
+    async def test_permanent_error_is_not_retried(self):
+        attempts = []
+
+        async def bad():
+            attempts.append(1)
+            raise ApiError(400)
+
+        with pytest.raises(ApiError):
+            await retry_async(bad, RetryPolicy(max_attempts=5), sleep=_no_sleep)
+        assert len(attempts) == 1
+
+    @pytest.mark.asyncio
+    async def test_exhausted_attempts_raise_upstream_unavailable(self):
+        async def down():
+            raise ApiError(503)
+
+        with pytest.raises(UpstreamUnavailableError):
+            await retry_async(down, RetryPolicy(max_attempts=2), sleep=_no_sleep)
+
+    @pytest.mark.asyncio
+    async def test_deadline_bounds_slow_attempts(self):
+        async def hang():
+            await asyncio.sleep(10)
+
+        with pytest.raises(UpstreamUnavailableError):
+            await retry_async(hang, RetryPolicy(max_attempts=3, deadline=0.05), sleep=_no_sleep)
+
+    @pytest.mark.asyncio
+    async def test_admission_wait_is_not_charged_to_deadline(self):
+        admitted = []
+
+        async def slow_admit():
+            admitted.append(1)
+            await asyncio.sleep(0.1)
+
+        async def flaky():
+            if len(admitted) < 2:
+                raise ApiError(503)
+            await asyncio.sleep(0.02)
+            return "ok"
+
+        policy = RetryPolicy(max_attempts=3, base_delay=0.001, deadline=0.08)
+        assert await retry_async(flaky, policy, sleep=_no_sleep, admit=slow_admit) == "ok"
+        assert len(admitted) == 2
+
+    def test_backoff_is_jittered_and_capped(self):
+        policy = RetryPolicy(base_delay=1, max_delay=4)
+        delays = [policy.backoff(10) for _ in range(50)]
+        assert all(0 <= d <= 4 for d in delays)
+        assert len(set(delays)) > 1
+
+
+class TestCircuitBreaker:
+
+    @pytest.fixture
+    def clock(self):
+        return [0.0]
+
+    @pytest.fixture
+    def breaker(self, clock):
+        return CircuitBreaker(failure_rate=0.5, window=4, min_calls=4, open_seconds=10, clock=lambda: clock[0])
+
+    def test_opens_at_failure_rate(self, breaker):
+        for ok in (True, False, True):
+            breaker.record_success() if ok else breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.allow() is False
+        assert breaker.stats()["rejected"] == 1
+
+    def test_half_open_probe(self, breaker, clock):
+        for _ in range(4):
+            breaker.record_failure()
+        clock[0] += 10
+
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow() is True
+        assert breaker.allow() is False  # only one probe at a time
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_failed_probe_reopens(self, breaker, clock):
+        for _ in range(4):
+            breaker.record_failure()
+        clock[0] += 10
+        breaker.allow()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.retry_after() == 10
+
+
+class TestGeminiResilience:
+    """generate_recipe with a flaky fake Gemini"""
+
+    @pytest.fixture(autouse=True)
+    def fast_retries(self, monkeypatch):
+        monkeypatch.setattr(gemini_service, "retry_policy", RetryPolicy(max_attempts=3, base_delay=0.001))
+
+    @pytest.mark.asyncio
+    async def test_transient_errors_are_retried(self, fake_models):
+        model = gemini_service.get_model()
+        model.failures = [ApiError(429), ApiError(503)]
+
+        recipe = await gemini_service.generate_recipe(["chicken"])
+        assert recipe.title == FAKE_RECIPE["title"]
+        assert model.calls == 3
+
+    @pytest.mark.asyncio
+    async def test_stream_closed_early_ends_half_open_probe(self, fake_models, monkeypatch):
+        clock = [0.0]
+        breaker = CircuitBreaker(min_calls=1, open_seconds=10, clock=lambda: clock[0])
+        monkeypatch.setattr(gemini_service, "circuit_breaker", breaker)
+        breaker.record_failure()
+        clock[0] += 10
+        model = gemini_service.get_model()
+
+        # Client goes away after the first chunk: the upstream answered, the probe succeeded
+        stream = gemini_service._stream_content(model, "prompt")
+        await stream.__anext__()
+        await stream.aclose()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+        # Cancelled before the upstream sent anything: the probe failed
+        breaker.record_failure()
+        clock[0] += 10
+        model.latency = 5.0
+        task = asyncio.ensure_future(gemini_service._stream_content(model, "prompt").__anext__())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.stats()["rejected"] == 0
+
+    @pytest.mark.asyncio
+    async def test_timeout_while_queued_locally_is_not_a_failure(self, fake_models, monkeypatch):
+        breaker = CircuitBreaker(min_calls=1)
+        monkeypatch.setattr(gemini_service, "circuit_breaker", breaker)
+        # Every concurrency slot is taken
+        monkeypatch.setattr(gemini_service, "_get_limiter", lambda: asyncio.Semaphore(0))
+        model = gemini_service.get_model()
+
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(
+                gemini_service._call_upstream(lambda: gemini_service._generate_content(model, "prompt")), 0.05
+            )
+        assert model.calls == 0
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.stats()["window_calls"] == 0
+
+    def test_open_circuit_fast_fails_with_503(self, fake_models, monkeypatch):
+        from app.main import app
+
+        monkeypatch.setattr(gemini_service.circuit_breaker, "min_calls", 2)
+        with TestClient(app) as client:
+            model = gemini_service.get_model()
+            model.failures = [ApiError(503)] * 10
+            first = client.post("/api/recipes/generate", json={"ingredients": ["egg"]})
+            calls = model.calls
+            second = client.post("/api/recipes/generate", json={"ingredients": ["rice"]})
+            health = client.get("/api/recipes/health").json()
+
+        assert first.status_code == 503
+        assert second.status_code == 503
+        assert "Retry-After" in second.headers
+        assert model.calls == calls  # fast-failed without calling Gemini
+        assert health["status"] == "degraded"
+        assert health["circuit_breaker"]["state"] == "open"
+
+    def test_open_circuit_serves_stored_recipe(self, fake_models, monkeypatch, tmp_path):
+        from app.main import app
+
+        path = str(tmp_path / "recipes.db")
+        store = RecipeStore(path)
+        store.save(ingredient_key(["tofu"]), ["tofu"], Recipe(**FAKE_RECIPE))
+        store.close()
+        monkeypatch.setattr(gemini_service, "RECIPE_STORE_PATH", path)
+
+        with TestClient(app) as client:
+            gemini_service.recipe_cache.clear()
+            for _ in range(gemini_service.circuit_breaker.min_calls):
+                gemini_service.circuit_breaker.record_failure()
+            response = client.post("/api/recipes/generate", json={"ingredients": ["tofu"]})
+
+        assert response.status_code == 200
+        assert response.headers["X-Cache"] == "STALE"
+        assert response.headers["Cache-Control"] == "no-cache"
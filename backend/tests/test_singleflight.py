@@ -0,0 +1,80 @@
+"""
+Tests for single-flight request coalescing
+"""
+
+import asyncio
+
+import pytest
+
+from app.services import gemini_service
+from app.services.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    """Concurrent identical keys share one execution"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_result(self):
+        flight = SingleFlight()
+        runs = []
+
+        async def work():
+            runs.append(1)
+            await asyncio.sleep(0.05)
+            return "done"
+
+        results = await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+
+        assert results == ["done"] * 5
+        assert len(runs) == 1
+        assert flight.stats() == {"in_flight": 0, "calls": 1, "coalesced": 4}
+
+    @pytest.mark.asyncio
+    async def test_exception_is_shared_and_key_released(self):
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(flight.do("k", fail), flight.do("k", fail), return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+
+        async def ok():
+            return 42
+
+        assert await flight.do("k", ok) == 42
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        first = asyncio.ensure_future(flight.do("k", work))
+        second = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await second == "done"
+
+
+class TestGenerateRecipeCoalescing:
+    """Identical concurrent generations hit Gemini once"""
+
+    @pytest.mark.asyncio
+    async def test_identical_requests_coalesce(self, fake_models):
+        model = gemini_service.get_model()
+        model.latency = 0.1
+
+        recipes = await asyncio.gather(
+            gemini_service.generate_recipe(["Chicken", "basil"]),
+            gemini_service.generate_recipe(["basil", "chicken"]),
+            gemini_service.generate_recipe(["chickens ", "Basil"]),
+        )
+
+        assert model.calls == 1
+        assert recipes[0] is recipes[1] is recipes[2]
+        assert gemini_service.generation_flight.stats()["coalesced"] == 2
@@ -0,0 +1,68 @@
+"""
+Tests for app startup: import cost and running without a Gemini API key
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seconds `import app.main` may take in a fresh interpreter
+STARTUP_IMPORT_BUDGET = float(os.getenv("STARTUP_IMPORT_BUDGET", "3.0"))
+
+
+def _run(code: str) -> dict:
+    """Run `code` in a fresh interpreter without GEMINI_API_KEY; it prints one JSON object"""
+    env = {k: v for k, v in os.environ.items() if k != "GEMINI_API_KEY"}
+    env.update(RECIPE_STORE_PATH=":memory:", RECIPE_CATALOG_PATH="", MCP_API_URL="http://127.0.0.1:9")
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestStartup:
+    """The app must import quickly and serve non-LLM routes without a key"""
+
+    def test_import_within_budget_without_sdk(self):
+        out = _run(
+            "import json, sys, time\n"
+            "started = time.perf_counter()\n"
+            "import app.main\n"
+            "elapsed = time.perf_counter() - started\n"
+            "print(json.dumps({'seconds': elapsed, 'sdk': 'google.generativeai' in sys.modules}))\n"
+        )
+
+        assert out["sdk"] is False
+        assert out["seconds"] < STARTUP_IMPORT_BUDGET
+
+    def test_serves_without_api_key(self):
+        out = _run(
+            "import json, sys\n"
+            "from fastapi.testclient import TestClient\n"
+            "from app.main import app\n"
+            "with TestClient(app) as client:\n"
+            "    health = client.get('/health')\n"
+            "    recipes_health = client.get('/api/recipes/health')\n"
+            "    agents = client.get('/api/agents/active')\n"
+            "    generate = client.post('/api/recipes/generate', json={'ingredients': ['egg']})\n"
+            "print(json.dumps({\n"
+            "    'health': health.status_code,\n"
+            "    'recipes_health': recipes_health.status_code,\n"
+            "    'agents': agents.status_code,\n"
+            "    'generate': generate.status_code,\n"
+            "    'detail': generate.json()['detail'],\n"
+            "    'sdk': 'google.generativeai' in sys.modules,\n"
+            "}))\n"
+        )
+
+        assert out["health"] == 200
+        assert out["recipes_health"] == 200
+        # The agents router answers on its own; 503 only because no MCP server is running
+        assert out["agents"] == 503
+        assert out["generate"] == 503
+        assert "GEMINI_API_KEY" in out["detail"]
+        assert out["sdk"] is False
@@ -0,0 +1,160 @@
+"""
+Tests for LLM token accounting and request size caps
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models.recipe import RECIPE_MAX_INGREDIENT_LENGTH, RECIPE_MAX_INGREDIENTS
+from app.services import gemini_service
+from app.services.llm_provider import GeminiProvider
+from app.services.token_usage import TokenUsageTracker
+from tests.conftest import FakeModel
+
+
+class FakeClock:
+    def __init__(self, now=600.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenUsageTracker:
+
+    def test_buckets_per_minute_and_fills_idle_minutes(self):
+        clock = FakeClock()
+        tracker = TokenUsageTracker(window_minutes=5, clock=clock)
+
+        tracker.record(100, 400, 50.0)
+        tracker.record(120, 380, 70.0)
+        clock.now += 120
+        tracker.record(90, 500, 30.0)
+        tracker.record_error()
+
+        series = tracker.per_minute(3)
+
+        assert [m["minute"] for m in series] == ["1970-01-01T00:10:00Z", "1970-01-01T00:11:00Z", "1970-01-01T00:12:00Z"]
+        assert [m["calls"] for m in series] == [2, 0, 1]
+        assert series[0]["total_tokens"] == 1000
+        assert series[0]["avg_latency_ms"] == 60.0
+        assert series[2]["errors"] == 1
+        assert tracker.stats() == {
+            "calls": 3,
+            "errors": 1,
+            "prompt_tokens": 310,
+            "output_tokens": 1280,
+            "avg_prompt_tokens": 103.3,
+            "avg_output_tokens": 426.7,
+            "avg_latency_ms": 50.0,
+        }
+
+    def test_summary_and_window(self):
+        clock = FakeClock()
+        tracker = TokenUsageTracker(window_minutes=3, clock=clock)
+        for tokens in (300, 600, 900, 1200):
+            tracker.record(tokens, 0, 1.0)
+            clock.now += 60
+        clock.now -= 60
+
+        summary = tracker.summary(10)
+
+        assert summary["window_minutes"] == 3
+        assert [m["prompt_tokens"] for m in summary["minutes"]] == [600, 900, 1200]
+        assert summary["tokens_per_minute"] == {"avg": 900.0, "peak": 1200}
+        assert summary["requests_per_minute"] == {"avg": 1.0, "peak": 1}
+
+
+class TestServiceAccounting:
+
+    @pytest.mark.asyncio
+    async def test_generate_records_estimated_tokens(self, fake_models):
+        await gemini_service.generate_recipe(["chicken", "basil"])
+
+        prompt = gemini_service._build_prompt(["chicken", "basil"])
+        stats = gemini_service.token_usage.stats()
+        assert stats["calls"] == 1
+        assert stats["prompt_tokens"] == len(prompt) // 4
+        assert stats["output_tokens"] > 0
+
+    @pytest.mark.asyncio
+    async def test_failed_call_counts_as_error(self, fake_models):
+        model = gemini_service.get_model()
+        model.failures.append(ValueError("bad request"))
+
+        with pytest.raises(ValueError):
+            await gemini_service.generate_recipe(["tofu"])
+
+        assert gemini_service.token_usage.stats()["errors"] == 1
+        assert gemini_service.token_usage.stats()["calls"] == 0
+
+    @pytest.mark.asyncio
+    async def test_disconnected_stream_counts_as_error(self, fake_models):
+        stream = gemini_service._stream_content(gemini_service.get_model(), "prompt")
+        await stream.__anext__()
+        await stream.aclose()
+
+        assert gemini_service.token_usage.stats()["errors"] == 1
+        assert gemini_service.token_usage.stats()["calls"] == 0
+
+    @pytest.mark.asyncio
+    async def test_gemini_reported_usage_wins_over_estimate(self):
+        class Usage:
+            prompt_token_count = 321
+            candidates_token_count = 654
+
+        class ModelWithUsage(FakeModel):
+            def generate_content(self, prompt, stream=False):
+                response = super().generate_content(prompt, stream)
+                response.usage_metadata = Usage()
+                return response
+
+        provider = GeminiProvider("key", executor=lambda: None)
+
+        completion = await provider.generate(ModelWithUsage("m"), "prompt")
+
+        assert (completion.prompt_tokens, completion.output_tokens) == (321, 654)
+        assert (await provider.generate(FakeModel("m"), "prompt")).prompt_tokens is None
+
+
+class TestTokenEndpointAndCaps:
+
+    def test_tokens_endpoint(self, fake_models):
+        from app.main import app
+
+        with TestClient(app) as client:
+            client.post("/api/recipes/generate", json={"ingredients": ["egg", "rice"]})
+            response = client.get("/api/recipes/tokens", params={"minutes": 5})
+
+        body = response.json()
+        assert response.status_code == 200
+        assert len(body["minutes"]) == 5
+        assert body["minutes"][-1]["calls"] == 1
+        assert body["totals"]["calls"] == 1
+        assert body["quota"] == {"rpm": 0.0, "tpm": 0.0}
+        assert body["estimated_output_tokens"] == gemini_service.ESTIMATED_OUTPUT_TOKENS
+        assert body["observed_output_tokens"] == body["totals"]["avg_output_tokens"]
+
+    def test_ingredient_caps(self, fake_models):
+        from app.main import app
+
+        with TestClient(app) as client:
+            too_many = client.post(
+                "/api/recipes/generate", json={"ingredients": [f"item {i}" for i in range(RECIPE_MAX_INGREDIENTS + 1)]}
+            )
+            too_long = client.post(
+                "/api/recipes/generate", json={"ingredients": ["x" * (RECIPE_MAX_INGREDIENT_LENGTH + 1)]}
+            )
+            batch = client.post(
+                "/api/recipes/generate-batch",
+                json={"requests": [{"ingredients": ["egg"]}, {"ingredients": ["y" * 500]}]}
+            )
+            at_limit = client.post(
+                "/api/recipes/generate", json={"ingredients": [f"item {i}" for i in range(RECIPE_MAX_INGREDIENTS)]}
+            )
+
+        assert too_many.status_code == 422
+        assert too_long.status_code == 422
+        assert batch.status_code == 422
+        assert at_limit.status_code == 200
+        assert fake_models[0].calls == 1
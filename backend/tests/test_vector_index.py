@@ -0,0 +1,156 @@
+"""
+Tests for the ingredient embedding index and near-duplicate recipe lookup
+"""
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models.recipe import Recipe
+from app.services import gemini_service
+from app.services.recipe_cache import ingredient_key
+from app.services.recipe_store import RecipeStore
+from app.services.vector_index import HashingEmbedder, SemanticRecipeIndex, VectorIndex
+from tests.conftest import FAKE_RECIPE
+
+
+class TestHashingEmbedder:
+
+    def test_embedding_is_stable_and_normalized(self):
+        embedder = HashingEmbedder(dim=128)
+        first = embedder.embed(["Chicken", "basil"])
+        second = HashingEmbedder(dim=128).embed(["basil ", "chickens"])
+
+        assert np.allclose(first, second)
+        assert np.isclose(np.linalg.norm(first), 1.0)
+
+    def test_feature_cache_is_bounded(self):
+        embedder = HashingEmbedder(dim=128, cache_size=4)
+        expected = embedder.embed(["chicken", "thai basil", "garlic"])
+        embedder.embed(["beef", "potato", "onion"])
+
+        assert len(embedder._feature_cache) == 4
+        assert np.allclose(embedder.embed(["chicken", "thai basil", "garlic"]), expected)
+
+    def test_near_duplicates_score_higher_than_unrelated(self):
+        embedder = HashingEmbedder()
+        base = embedder.embed(["chicken", "basil", "garlic"])
+        near = embedder.embed(["chicken", "thai basil", "garlic", "chili"])
+        far = embedder.embed(["chocolate", "flour", "sugar"])
+
+        assert float(base @ near) >= 0.7
+        assert float(base @ far) < 0.3
+
+
+class TestVectorIndex:
+
+    @pytest.fixture
+    def vectors(self):
+        rng = np.random.default_rng(1)
+        data = rng.normal(size=(600, 32)).astype(np.float32)
+        return data / np.linalg.norm(data, axis=1, keepdims=True)
+
+    def test_flat_search_finds_exact_vector(self, vectors):
+        index = VectorIndex(32, mode="flat")
+        for v in vectors:
+            index.add(v)
+
+        hits = index.search(vectors[123], k=3)
+        assert hits[0][0] == 123
+        assert hits[0][1] == pytest.approx(1.0, abs=1e-5)
+        assert hits[0][1] >= hits[1][1] >= hits[2][1]
+
+    def test_ivf_trains_and_finds_exact_vector(self, vectors):
+        index = VectorIndex(32, mode="ivf", n_lists=8, nprobe=2)
+        for v in vectors:
+            index.add(v)
+
+        assert index.trained
+        for row in (0, 250, 599):
+            assert index.search(vectors[row], k=1)[0][0] == row
+
+    def test_unknown_mode_rejected(self):
+        with pytest.raises(ValueError):
+            VectorIndex(8, mode="hnsw")
+
+
+class TestSemanticRecipeIndex:
+
+    def test_lookup_threshold_and_exact_key(self):
+        index = SemanticRecipeIndex(HashingEmbedder(dim=256))
+        index.add("k1", ["chicken", "basil", "garlic"], "thai stir fry")
+
+        assert index.lookup(["chicken", "thai basil", "garlic", "chili"], threshold=0.7)[0] == "thai stir fry"
+        assert index.lookup(["beef", "potato"], threshold=0.7) is None
+        assert index.lookup(["chicken", "basil", "garlic"], threshold=0.7, key="k1") == ("thai stir fry", 1.0)
+        assert index.stats()["matches"] == 2
+
+    def test_size_is_bounded_least_recently_used_first(self):
+        index = SemanticRecipeIndex(HashingEmbedder(dim=256), max_size=2)
+        index.add("k1", ["chicken", "basil"], "basil chicken")
+        index.add("k2", ["beef", "potato"], "beef stew")
+        assert index.lookup(["chicken", "basil"], threshold=0.9)[0] == "basil chicken"
+        index.add("k3", ["flour", "sugar"], "cake")
+
+        assert len(index) == 2
+        assert len(index.index) == 2
+        assert index.stats()["evictions"] == 1
+        assert index.lookup(["beef", "potato"], threshold=0.9) is None
+        assert index.lookup(["flour", "sugar"], threshold=0.9)[0] == "cake"
+        assert index.lookup(["chicken", "basil"], threshold=0.9)[0] == "basil chicken"
+
+    def test_ivf_replace_moves_row_to_new_bucket(self):
+        index = SemanticRecipeIndex(
+            HashingEmbedder(dim=64), VectorIndex(64, mode="ivf", n_lists=2, nprobe=1), max_size=16
+        )
+        for i in range(16):
+            index.add(f"k{i}", [f"ingredient{i}", "salt"], i)
+        index.add("new", ["chocolate", "cream"], "ganache")
+
+        assert index.index.trained
+        assert sum(len(bucket) for bucket in index.index._lists) == 16
+        assert index.lookup(["chocolate", "cream"], threshold=0.9)[0] == "ganache"
+
+    def test_never_matches_recipe_needing_unrequested_ingredients(self):
+        index = SemanticRecipeIndex(HashingEmbedder(dim=256))
+        index.add("k1", ["chicken", "basil", "garlic", "fish sauce"], "with fish sauce")
+
+        assert index.lookup(["chicken", "basil", "garlic"], threshold=0.1) is None
+        index.add("k2", ["chicken", "basil"], "without fish sauce")
+        assert index.lookup(["chicken", "basil", "garlic"], threshold=0.1)[0] == "without fish sauce"
+
+    def test_generate_endpoint_reuses_similar_recipe(self, fake_models, monkeypatch):
+        from app.main import app
+
+        monkeypatch.setattr(gemini_service, "RECIPE_SIMILARITY_THRESHOLD", 0.7)
+
+        with TestClient(app) as client:
+            first = client.post("/api/recipes/generate", json={"ingredients": ["chicken", "basil", "garlic"]})
+            second = client.post("/api/recipes/generate", json={
+                "ingredients": ["chicken", "thai basil", "garlic", "chili"]
+            })
+            unrelated = client.post("/api/recipes/generate", json={"ingredients": ["flour", "sugar"]})
+
+        assert first.headers["X-Cache"] == "MISS"
+        assert second.headers["X-Cache"] == "SIMILAR"
+        assert second.json() == first.json()
+        assert unrelated.headers["X-Cache"] == "MISS"
+        assert fake_models[0].calls == 2
+
+    def test_index_stays_empty_while_similarity_is_off(self, fake_models, tmp_path, monkeypatch):
+        from app.main import app
+
+        path = str(tmp_path / "recipes.db")
+        store = RecipeStore(path)
+        store.save(ingredient_key(["tofu"]), ["tofu"], Recipe(**FAKE_RECIPE))
+        store.close()
+        monkeypatch.setattr(gemini_service, "RECIPE_STORE_PATH", path)
+        monkeypatch.setattr(gemini_service, "RECIPE_SIMILARITY_THRESHOLD", 0)
+
+        with TestClient(app) as client:
+            warmed = len(gemini_service.semantic_index)
+            client.post("/api/recipes/generate", json={"ingredients": ["chicken", "basil"]})
+            generated = len(gemini_service.semantic_index)
+
+        assert (warmed, generated) == (0, 0)
+        assert fake_models[0].calls == 1